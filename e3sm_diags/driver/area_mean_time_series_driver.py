@@ -4,8 +4,9 @@ import os
 
 import cdms2
 import cdutil
+import numpy as np
+import numpy.ma as ma
 
-import e3sm_diags
 from e3sm_diags.driver import utils
 from e3sm_diags.logger import custom_logger
 from e3sm_diags.metrics import mean
@@ -49,87 +50,55 @@ def run_diag(parameter):
         # [ 6 ]   [ 7 ]
         # [   ]   [   ]
         regions_to_data = collections.OrderedDict()
-        save_data = {}
         logger.info("Variable: {}".format(var))
 
         # Get land/ocean fraction for masking.
         # For now, we're only using the climo data that we saved below.
         # So no time-series LANDFRAC or OCNFRAC from the user is used.
-        mask_path = os.path.join(
-            e3sm_diags.INSTALL_PATH, "acme_ne30_ocean_land_mask.nc"
-        )
-        with cdms2.open(mask_path) as f:
-            land_frac = f("LANDFRAC")
-            ocean_frac = f("OCNFRAC")
+        land_frac, ocean_frac = utils.general.get_default_land_ocean_frac()
 
-        for region in regions:
-            # The regions that are supported are in e3sm_diags/derivations/default_regions.py
-            # You can add your own if it's not in there.
-            logger.info("Selected region: {}".format(region))
-            test_data = utils.dataset.Dataset(parameter, test=True)
-            test = test_data.get_timeseries_variable(var)
-            logger.info(
-                "Start and end time for selected time slices for test data: "
-                f"{test.getTime().asComponentTime()[0]} "
-                f"{test.getTime().asComponentTime()[-1]}",
-            )
+        # The timeseries of each dataset is read once, and the annual means of
+        # all of the regions are computed from it.
+        # The regions that are supported are in e3sm_diags/derivations/default_regions.py
+        # You can add your own if it's not in there.
+        logger.info("Selected regions: {}".format(regions))
+        test_data = utils.dataset.Dataset(parameter, test=True)
+        test_years = get_stored_annual_regional_means(
+            test_data, var, regions, land_frac, ocean_frac, parameter
+        )
+        test_year = test_years[regions[0]]
 
-            parameter.viewer_descr[var] = getattr(test, "long_name", var)
-            # Get the name of the data, appended with the years averaged.
-            parameter.test_name_yrs = utils.general.get_name_and_yrs(
-                parameter, test_data
-            )
-            test_domain = utils.general.select_region(
-                region, test, land_frac, ocean_frac, parameter
-            )
+        parameter.viewer_descr[var] = getattr(test_year, "long_name", var)
+        # Get the name of the data, appended with the years averaged.
+        parameter.test_name_yrs = utils.general.get_name_and_yrs(parameter, test_data)
 
-            # Average over selected region, and average
-            # over months to get the yearly mean.
-            test_domain = cdutil.averager(test_domain, axis="xy")
-            cdutil.setTimeBoundsMonthly(test_domain)
-            test_domain_year = cdutil.YEAR(test_domain)
-            # add back attributes since they got lost after applying cdutil.YEAR
-            test_domain_year.long_name = test.long_name
-            test_domain_year.units = test.units
+        refs_years = collections.OrderedDict()
+        for ref_name in ref_names:
+            setattr(parameter, "ref_name", ref_name)
+            ref_data = utils.dataset.Dataset(parameter, ref=True)
 
-            save_data[parameter.test_name_yrs] = test_domain_year.asma().tolist()
+            parameter.ref_name_yrs = utils.general.get_name_and_yrs(parameter, ref_data)
 
-            refs = []
+            try:
+                refs_years[ref_name] = get_stored_annual_regional_means(
+                    ref_data, var, regions, land_frac, ocean_frac, parameter
+                )
+            except Exception:
+                logger.exception(
+                    "No valid value for reference datasets available for the specified time range"
+                )
 
-            for ref_name in ref_names:
-                setattr(parameter, "ref_name", ref_name)
-                ref_data = utils.dataset.Dataset(parameter, ref=True)
+        for region in regions:
+            test_domain_year = test_years[region]
+            save_data = {parameter.test_name_yrs: test_domain_year.asma().tolist()}
 
-                parameter.ref_name_yrs = utils.general.get_name_and_yrs(
-                    parameter, ref_data
-                )
+            refs = []
+            for ref_name, ref_years in refs_years.items():
+                ref_domain_year = ref_years[region]
+                ref_domain_year.ref_name = ref_name
+                save_data[ref_name] = ref_domain_year.asma().tolist()
 
-                try:
-                    ref = ref_data.get_timeseries_variable(var)
-
-                    ref_domain = utils.general.select_region(
-                        region, ref, land_frac, ocean_frac, parameter
-                    )
-
-                    ref_domain = cdutil.averager(ref_domain, axis="xy")
-                    cdutil.setTimeBoundsMonthly(ref_domain)
-                    logger.info(
-                        (
-                            "Start and end time for selected time slices for ref data: "
-                            f"{ref_domain.getTime().asComponentTime()[0]} "
-                            f"{ref_domain.getTime().asComponentTime()[-1]}"
-                        )
-                    )
-
-                    ref_domain_year = cdutil.YEAR(ref_domain)
-                    ref_domain_year.ref_name = ref_name
-                    save_data[ref_name] = ref_domain_year.asma().tolist()
-
-                    refs.append(ref_domain_year)
-                except Exception:
-                    logger.exception(
-                        "No valid value for reference datasets available for the specified time range"
-                    )
+                refs.append(ref_domain_year)
 
             # save data for potential later use
             parameter.output_file = "-".join([var, region])
@@ -148,3 +117,220 @@ def run_diag(parameter):
         area_mean_time_series_plot.plot(var, regions_to_data, parameter)
 
     return parameter
+
+
+def get_stored_annual_regional_means(
+    dataset, var, regions, land_frac, ocean_frac, parameter
+):
+    """
+    Get the annual means of the area averages of var over each region. With
+    incremental_timeseries, only the years after the annual means stored by a
+    previous run are read.
+    """
+
+    def reduce(data):
+        return get_annual_regional_means(
+            data, var, regions, land_frac, ocean_frac, parameter
+        )
+
+    return utils.incremental.get_series(dataset, var, regions, reduce)
+
+
+def get_annual_regional_means(dataset, var, regions, land_frac, ocean_frac, parameter):
+    """
+    Get the annual means of the area averages of var over each region, reading
+    the timeseries of the dataset once, time_chunk_size timesteps at a time.
+
+    The area averages of all of the regions are a single matrix product of each
+    chunk with the area weights of the regions. The annual means are weighted
+    by the length of the months, like cdutil.YEAR() after
+    cdutil.setTimeBoundsMonthly(). Masked values don't contribute to either
+    average, and averages without any valid values are masked.
+
+    Returns a dict of the annual means for each region.
+    """
+    chunk_size = getattr(parameter, "time_chunk_size", 0)
+    first_chunk = None
+    annual_means = AnnualMeans()
+
+    for chunk in dataset.get_timeseries_variable_chunks(var, chunk_size):
+        chunk = chunk(order="tyx")
+        if first_chunk is None:
+            region_weights = get_region_weights(
+                chunk[0], regions, land_frac, ocean_frac, parameter
+            )
+            first_chunk = chunk
+            logger.info(
+                "Start time for selected time slices for {} data: {}".format(
+                    "ref" if dataset.ref else "test",
+                    chunk.getTime().asComponentTime()[0],
+                )
+            )
+
+        # Average over each region, and weight the months by their length to
+        # get the yearly mean.
+        area_means = get_area_means(chunk, region_weights)
+        cdutil.setTimeBoundsMonthly(chunk)
+        chunk_time = chunk.getTime()
+        years = [t.year for t in chunk_time.asComponentTime()]
+        annual_means.add(area_means, chunk_time.getBounds(), years)
+
+    if first_chunk is None:
+        raise RuntimeError(
+            "No timesteps of {} in the {} data.".format(
+                var, "ref" if dataset.ref else "test"
+            )
+        )
+
+    logger.info(
+        "End time for selected time slices for {} data: {}".format(
+            "ref" if dataset.ref else "test",
+            chunk.getTime().asComponentTime()[-1],
+        )
+    )
+
+    # years x regions
+    year_means, bounds = annual_means.get()
+
+    first_time = first_chunk.getTime()
+    year_time = cdms2.createAxis(bounds.mean(axis=1))
+    year_time.designateTime()
+    year_time.units = first_time.units
+    year_time.calendar = first_time.calendar
+    year_time.setBounds(bounds)
+    year_time.id = "time"
+
+    regional_means = collections.OrderedDict()
+    for i, region in enumerate(regions):
+        region_year = cdms2.createVariable(
+            year_means[:, i], axes=[year_time], id=first_chunk.id
+        )
+        region_year.long_name = getattr(first_chunk, "long_name", var)
+        region_year.units = first_chunk.units
+        regional_means[region] = region_year
+
+    return regional_means
+
+
+def get_area_means(var, region_weights):
+    """
+    Get the area averages of the time x lat x lon var over each region, with
+    the region weights of get_region_weights(), as a time x regions masked
+    array. Masked values of var aren't averaged, and the averages without any
+    valid values are masked.
+    """
+    data = ma.getdata(var).reshape(var.shape[0], -1).astype(np.float64)
+    valid = ~ma.getmaskarray(var).reshape(var.shape[0], -1)
+    region_sums = np.where(valid, data, 0.0) @ region_weights.T
+    region_areas = valid.astype(np.float64) @ region_weights.T
+
+    area_valid = region_areas > 0
+    area_means = region_sums / np.where(area_valid, region_areas, 1.0)
+
+    return ma.masked_where(~area_valid, area_means)
+
+
+class AnnualMeans(object):
+    """
+    The annual means of time x regions monthly series added a chunk at a time,
+    weighted by the length of the months from their time bounds, like
+    cdutil.YEAR() after cdutil.setTimeBoundsMonthly().
+
+    Masked months don't contribute to the annual means, and the years without
+    any valid months are masked. The years at the ends of the series that
+    aren't complete are the means of the months they have.
+    """
+
+    def __init__(self):
+        # The bounds-weighted sums of the means and the sums of the weights of
+        # each year, and the time bounds of the years.
+        self.year_sums = collections.OrderedDict()
+        self.year_weights = collections.OrderedDict()
+        self.year_bounds = collections.OrderedDict()
+
+    def add(self, means, tbounds, years):
+        """
+        Add the time x regions means of the months with the time bounds
+        tbounds and the years. A year can be split between the chunks.
+        """
+        valid = ~ma.getmaskarray(means)
+        tbounds = np.asarray(tbounds)
+        years = np.asarray(years)
+        dt = np.where(valid, (tbounds[:, 1] - tbounds[:, 0])[:, np.newaxis], 0.0)
+        weighted_means = np.where(valid, ma.getdata(means), 0.0) * dt
+
+        for year in np.unique(years):
+            in_year = years == year
+            bounds = [tbounds[in_year, 0].min(), tbounds[in_year, 1].max()]
+            if year in self.year_sums:
+                self.year_sums[year] += weighted_means[in_year].sum(axis=0)
+                self.year_weights[year] += dt[in_year].sum(axis=0)
+                self.year_bounds[year][1] = bounds[1]
+            else:
+                self.year_sums[year] = weighted_means[in_year].sum(axis=0)
+                self.year_weights[year] = dt[in_year].sum(axis=0)
+                self.year_bounds[year] = bounds
+
+    def get(self):
+        """
+        Get the years x regions annual means, and the years x 2 time bounds
+        of the years.
+        """
+        sums = np.array(list(self.year_sums.values()))
+        weights = np.array(list(self.year_weights.values()))
+        year_means = ma.masked_where(
+            weights == 0, sums / np.where(weights == 0, 1.0, weights)
+        )
+
+        return year_means, np.array(list(self.year_bounds.values()))
+
+
+def get_region_weights(var, regions, land_frac, ocean_frac, parameter):
+    """
+    Get the area weights of each region on the grid of the 2D variable var,
+    stacked into a regions x (lat * lon) matrix.
+
+    The weights of a region are the ones cdutil.averager() uses to average var
+    over the region selected by utils.general.select_region(), and are 0
+    outside of the region.
+    """
+    ones = cdms2.createVariable(
+        np.ones(var.shape),
+        axes=var.getAxisList(),
+        grid=var.getGrid(),
+        id=var.id,
+    )
+    ones.units = getattr(var, "units", "")
+    lat = var.getLatitude()[:]
+    lon = var.getLongitude()[:]
+
+    region_weights = np.zeros((len(regions), len(lat), len(lon)))
+    for i, region in enumerate(regions):
+        domain = utils.general.select_region(
+            region, ones, land_frac, ocean_frac, parameter
+        )
+        weights = ma.filled(cdutil.area_weights(domain), 0.0)
+
+        # Place the weights of the selected domain on the grid of var.
+        y = get_axis_indices(lat, domain.getLatitude()[:])
+        x = get_axis_indices(lon, domain.getLongitude()[:], period=360.0)
+        region_weights[i][np.ix_(y, x)] = weights
+
+    return region_weights.reshape(len(regions), -1)
+
+
+def get_axis_indices(axis, values, period=None):
+    """
+    Get the index of each value in the axis. If period is set, the values can be
+    shifted by a multiple of the period from the axis, e.g. for longitudes.
+    """
+    diff = np.asarray(values)[:, np.newaxis] - np.asarray(axis)[np.newaxis, :]
+    if period:
+        diff = (diff + period / 2) % period - period / 2
+    diff = np.abs(diff)
+
+    indices = np.argmin(diff, axis=1)
+    if not np.all(np.take_along_axis(diff, indices[:, np.newaxis], 1) < 1e-6):
+        raise RuntimeError("The selected region isn't on the grid of the variable.")
+
+    return indices
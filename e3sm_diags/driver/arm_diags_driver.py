@@ -50,7 +50,107 @@ def create_metrics(test, ref):
     }
 
 
-def run_diag_diurnal_cycle(parameter):
+class SiteData:
+    """
+    The timeseries of the variables of the test or reference data at the site,
+    and the coordinates of the site. Each of them is read once, and all of the
+    seasons and diagnostics of the site are derived from them.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self._coords = {}
+        self._series = {}
+
+    def get_coords(self, var):
+        """
+        Get the latitude and longitude of the site from the file of var.
+        """
+        if var not in self._coords:
+            self._coords[var] = self.dataset.get_static_variables(["lat", "lon"], var)
+
+        return self._coords[var]
+
+    def get_series(self, var, coords=None):
+        """
+        Get the timeseries of var at the site. If coords is set, they're the
+        latitude and longitude of the site, which are set as lat and lon.
+        """
+        if var not in self._series:
+            self._series[var] = self.dataset.get_timeseries_variable(
+                var, single_point=True
+            )
+
+        series = self._series[var]
+        if coords:
+            series.lat, series.lon = coords
+
+        return series
+
+    def get_diurnal_cycles(self, var, seasons, coords):
+        """
+        Get the composite diurnal cycles of var at the site for each of the
+        seasons, with the latitude and longitude of the site in coords. If
+        climo_time_chunk_size is set, the timeseries is read that many
+        timesteps at a time, instead of being kept in memory.
+
+        Also return the timeseries, or its last chunk, for its attributes.
+        """
+        chunk_size = getattr(self.dataset.parameters, "climo_time_chunk_size", 0)
+        if not chunk_size:
+            series = self.get_series(var, coords)
+            return series, utils.diurnal_cycle.composite_diurnal_cycles(
+                series, seasons, fft=False
+            )
+
+        accumulator = None
+        for series in self.dataset.get_timeseries_variable_chunks(
+            var, chunk_size, single_point=True
+        ):
+            series.lat, series.lon = coords
+            if accumulator is None:
+                accumulator = utils.diurnal_cycle.DiurnalCycleAccumulator(
+                    series, seasons
+                )
+            accumulator.add(series)
+
+        return series, accumulator.get_diurnal_cycles(fft=False)
+
+
+class RefFiles:
+    """
+    A pool of the open ARM reference files of a run. Each file is opened once,
+    and all of them are closed by close(), or at the end of a with block.
+    """
+
+    def __init__(self):
+        self._files = collections.OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self, path):
+        """
+        Get the open file at path.
+        """
+        if path not in self._files:
+            self._files[path] = cdms2.open(path)
+
+        return self._files[path]
+
+    def close(self):
+        """
+        Close all of the files.
+        """
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+def run_diag_diurnal_cycle(parameter, ref_files):
     variables = parameter.variables
     regions = parameter.regions
     ref_name = parameter.ref_name
@@ -61,66 +161,62 @@ def run_diag_diurnal_cycle(parameter):
     for region in regions:
         logger.info("Selected region: {}".format(region))
         vars_to_data = collections.OrderedDict()
+        test_data = utils.dataset.Dataset(parameter, test=True)
+        test_site = SiteData(test_data)
+        ref_site = SiteData(utils.dataset.Dataset(parameter, ref=True))
+
+        for var in variables:
+            logger.info("Variable: {}".format(var))
+            # The composite diurnal cycles of all of the seasons are computed
+            # at once, so each timeseries is only read and decoded once.
+            test, test_diurnals = test_site.get_diurnal_cycles(
+                var, seasons, test_site.get_coords(var)
+            )
 
-        for season in seasons:
-            logger.info("Season: {}".format(season))
-            for var in variables:
-                logger.info("Variable: {}".format(var))
-                test_data = utils.dataset.Dataset(parameter, test=True)
-                test = test_data.get_timeseries_variable(var, single_point=True)
-                test.lat = test_data.get_static_variable("lat", var)
-                test.lon = test_data.get_static_variable("lon", var)
-                test_diurnal, lst = utils.diurnal_cycle.composite_diurnal_cycle(
-                    test, season, fft=False
-                )
-
-                parameter.viewer_descr[var] = getattr(test, "long_name", var)
-                # Get the name of the data, appended with the years averaged.
-                parameter.test_name_yrs = utils.general.get_name_and_yrs(
-                    parameter, test_data
-                )
-                parameter.var_name = getattr(test, "long_name", var)
-                parameter.var_units = getattr(test, "units", var)
+            parameter.viewer_descr[var] = getattr(test, "long_name", var)
+            # Get the name of the data, appended with the years averaged.
+            parameter.test_name_yrs = utils.general.get_name_and_yrs(
+                parameter, test_data
+            )
+            parameter.var_name = getattr(test, "long_name", var)
+            parameter.var_units = getattr(test, "units", var)
+
+            ref_diurnals = None
+            if "armdiags" in ref_name:
+                if region != "sgp":
+                    msg = "Diurnal cycle of {} at Site: {} is not supported yet".format(
+                        region, var
+                    )
+                    raise RuntimeError(msg)
+                else:
+                    ref_file_name = "sgparmdiagsmondiurnalC1.c1.nc"
 
-                refs = []
+                    ref_file = os.path.join(ref_path, ref_file_name)
+                    ref_data = ref_files.open(ref_file)
 
-                if "armdiags" in ref_name:
-                    if region != "sgp":
-                        msg = "Diurnal cycle of {} at Site: {} is not supported yet".format(
-                            region, var
+                    if var == "PRECT":
+                        ref = (
+                            ref_data("pr") * 3600.0 * 24
+                        )  # Converting mm/second to mm/day"
+                        ref.lat = test.lat
+                        ref.lon = test.lon
+                        ref_diurnals = utils.diurnal_cycle.composite_diurnal_cycles(
+                            ref, seasons, fft=False
                         )
-                        raise RuntimeError(msg)
-                    else:
-                        ref_file_name = "sgparmdiagsmondiurnalC1.c1.nc"
-
-                        ref_file = os.path.join(ref_path, ref_file_name)
-                        ref_data = cdms2.open(ref_file)
-
-                        if var == "PRECT":
-                            ref = (
-                                ref_data("pr") * 3600.0 * 24
-                            )  # Converting mm/second to mm/day"
-                            ref.lat = test.lat
-                            ref.lon = test.lon
-                            (
-                                ref_diurnal,
-                                lst,
-                            ) = utils.diurnal_cycle.composite_diurnal_cycle(
-                                ref, season, fft=False
-                            )
-                            ref.long_name = ref.standard_name
-                            ref = ref_diurnal
+                        ref.long_name = ref.standard_name
 
-                else:
-                    ref_data = utils.dataset.Dataset(parameter, ref=True)
-                    ref = ref_data.get_timeseries_variable(var, single_point=True)
-                    ref.lat = test_data.get_static_variable("lat", var)
-                    ref.lon = test_data.get_static_variable("lon", var)
-                    ref_diurnal, lst = utils.diurnal_cycle.composite_diurnal_cycle(
-                        ref, season, fft=False
-                    )
-                    ref = ref_diurnal
+            else:
+                ref, ref_diurnals = ref_site.get_diurnal_cycles(
+                    var, seasons, test_site.get_coords(var)
+                )
 
+            for season in seasons:
+                logger.info("Season: {}".format(season))
+                test_diurnal, lst = test_diurnals[season]
+
+                refs = []
+                if ref_diurnals is not None:
+                    ref, lst = ref_diurnals[season]
                 refs.append(ref)
 
                 metrics_dict = {}
@@ -149,7 +245,7 @@ def run_diag_diurnal_cycle(parameter):
     return parameter
 
 
-def run_diag_diurnal_cycle_zt(parameter):
+def run_diag_diurnal_cycle_zt(parameter, ref_files):
     variables = parameter.variables
     regions = parameter.regions
     ref_name = parameter.ref_name
@@ -161,15 +257,16 @@ def run_diag_diurnal_cycle_zt(parameter):
     for region in regions:
         logger.info("Selected region: {}".format(region))
         vars_to_data = collections.OrderedDict()
+        test_data = utils.dataset.Dataset(parameter, test=True)
+        ref_data = utils.dataset.Dataset(parameter, ref=True)
+        test_site = SiteData(test_data)
+        ref_site = SiteData(ref_data)
 
         for season in seasons:
             logger.info("Season: {}".format(season))
             for var in variables:
                 logger.info("Variable: {}".format(var))
-                test_data = utils.dataset.Dataset(parameter, test=True)
-                test = test_data.get_timeseries_variable(var, single_point=True)
-                test.lat = test_data.get_static_variable("lat", var)
-                test.lon = test_data.get_static_variable("lon", var)
+                test = test_site.get_series(var, test_site.get_coords(var))
                 if test.getLevel():
                     test_p = utils.general.convert_to_pressure_levels(
                         test, plevs, test_data, var, season
@@ -204,9 +301,8 @@ def run_diag_diurnal_cycle_zt(parameter):
                         )
 
                     ref_file = os.path.join(ref_path, ref_file_name)
-                    ref_data = cdms2.open(ref_file)
                     if var == "CLOUD":
-                        ref_var = ref_data("cl_p")
+                        ref_var = ref_files.open(ref_file)("cl_p")
                         ref_var.long_name = "Cloud Fraction"
                         ref = ref_var
                         ref = np.reshape(ref, (12, 24, ref.shape[1]))
@@ -215,10 +311,7 @@ def run_diag_diurnal_cycle_zt(parameter):
                         ref.lon = test.lon
 
                 else:
-                    ref_data = utils.dataset.Dataset(parameter, ref=True)
-                    ref = ref_data.get_timeseries_variable(var, single_point=True)
-                    ref.lat = ref_data.get_static_variable("lat", var)
-                    ref.lon = ref_data.get_static_variable("lon", var)
+                    ref = ref_site.get_series(var, ref_site.get_coords(var))
                     if ref.getLevel():
                         ref_p = utils.general.convert_to_pressure_levels(
                             ref, plevs, ref_data, var, season
@@ -259,7 +352,7 @@ def run_diag_diurnal_cycle_zt(parameter):
     return parameter
 
 
-def run_diag_annual_cycle(parameter):
+def run_diag_annual_cycle(parameter, ref_files):
     variables = parameter.variables
     regions = parameter.regions
     ref_name = parameter.ref_name
@@ -273,12 +366,13 @@ def run_diag_annual_cycle(parameter):
         # You can add your own if it's not in there.
         logger.info("Selected region: {}".format(region))
         vars_to_data = collections.OrderedDict()
+        test_data = utils.dataset.Dataset(parameter, test=True)
+        ref_data = utils.dataset.Dataset(parameter, ref=True)
 
         for season in seasons:
             logger.info("Season: {}".format(season))
             for var in variables:
                 logger.info("Variable: {}".format(var))
-                test_data = utils.dataset.Dataset(parameter, test=True)
                 test = test_data.get_climo_variable(var, season)
                 if test.getLevel():
                     test_p = utils.general.convert_to_pressure_levels(
@@ -311,15 +405,14 @@ def run_diag_annual_cycle(parameter):
                             + region[3:5].upper()
                             + ".c1.nc",
                         )
-                    ref_data = cdms2.open(ref_file)
-                    vars_funcs = get_vars_funcs_for_derived_var(ref_data, var)
+                    ref_file_data = ref_files.open(ref_file)
+                    vars_funcs = get_vars_funcs_for_derived_var(ref_file_data, var)
                     target_var = list(vars_funcs.keys())[0][0]
-                    ref_var = ref_data(target_var)
+                    ref_var = ref_file_data(target_var)
                     ref_var.long_name = ref_var.standard_name
                     ref = vars_funcs[(target_var,)](utils.climo.climo(ref_var, season))
 
                 else:
-                    ref_data = utils.dataset.Dataset(parameter, ref=True)
                     ref = ref_data.get_climo_variable(var, season)
                     if ref.getLevel():
                         ref_p = utils.general.convert_to_pressure_levels(
@@ -360,7 +453,7 @@ def run_diag_annual_cycle(parameter):
     return parameter
 
 
-def run_diag_convection_onset(parameter):
+def run_diag_convection_onset(parameter, ref_files):
     regions = parameter.regions
     ref_name = parameter.ref_name
     ref_path = parameter.reference_data_path
@@ -372,9 +465,10 @@ def run_diag_convection_onset(parameter):
         logger.info("Selected region: {}".format(region))
 
         test_data = utils.dataset.Dataset(parameter, test=True)
+        test_site = SiteData(test_data)
 
-        test_pr = test_data.get_timeseries_variable("PRECT", single_point=True) / 24.0
-        test_prw = test_data.get_timeseries_variable("TMQ", single_point=True)
+        test_pr = test_site.get_series("PRECT") / 24.0
+        test_prw = test_site.get_series("TMQ")
 
         # Get the name of the data, appended with the years averaged.
         parameter.test_name_yrs = utils.general.get_name_and_yrs(parameter, test_data)
@@ -387,17 +481,14 @@ def run_diag_convection_onset(parameter):
                     region[:3] + "armdiags1hr" + region[3:5].upper() + ".c1.nc"
                 )
             ref_file = os.path.join(ref_path, ref_file_name)
-            ref_data = cdms2.open(ref_file)
+            ref_data = ref_files.open(ref_file)
             ref_pr = ref_data("pr")  # mm/hr
             ref_pr[ref_pr < -900] = np.nan
             ref_prw = ref_data("prw")  # mm
             ref_prw[ref_prw < -900] = np.nan
         else:
-            ref_data = utils.dataset.Dataset(parameter, ref=True)
-            ref_pr = (
-                test_data.get_timeseries_variable("PRECT", single_point=True) / 24.0
-            )
-            ref_prw = test_data.get_timeseries_variable("TMQ", single_point=True)
+            ref_pr = test_site.get_series("PRECT") / 24.0
+            ref_prw = test_site.get_series("TMQ")
         parameter.output_file = "-".join([ref_name, "convection-onset", region])
 
         arm_diags_plot.plot_convection_onset_statistics(
@@ -407,21 +498,21 @@ def run_diag_convection_onset(parameter):
     return parameter
 
 
-def run_diag_pdf_daily(parameter):
+def run_diag_pdf_daily(parameter, ref_files):
     logger.info("'run_diag_pdf_daily' is not yet implemented.")
 
 
 def run_diag(parameter):
-
-    if parameter.diags_set == "annual_cycle":
-        return run_diag_annual_cycle(parameter)
-    elif parameter.diags_set == "diurnal_cycle":
-        return run_diag_diurnal_cycle(parameter)
-    elif parameter.diags_set == "diurnal_cycle_zt":
-        return run_diag_diurnal_cycle_zt(parameter)
-    elif parameter.diags_set == "pdf_daily":
-        return run_diag_pdf_daily(parameter)
-    elif parameter.diags_set == "convection_onset":
-        return run_diag_convection_onset(parameter)
-    else:
-        raise Exception("Invalid diags_set={}".format(parameter.diags_set))
+    with RefFiles() as ref_files:
+        if parameter.diags_set == "annual_cycle":
+            return run_diag_annual_cycle(parameter, ref_files)
+        elif parameter.diags_set == "diurnal_cycle":
+            return run_diag_diurnal_cycle(parameter, ref_files)
+        elif parameter.diags_set == "diurnal_cycle_zt":
+            return run_diag_diurnal_cycle_zt(parameter, ref_files)
+        elif parameter.diags_set == "pdf_daily":
+            return run_diag_pdf_daily(parameter, ref_files)
+        elif parameter.diags_set == "convection_onset":
+            return run_diag_convection_onset(parameter, ref_files)
+        else:
+            raise Exception("Invalid diags_set={}".format(parameter.diags_set))
@@ -1,10 +1,5 @@
 from __future__ import print_function
 
-import os
-
-import cdms2
-
-import e3sm_diags
 from e3sm_diags.driver import utils
 from e3sm_diags.logger import custom_logger
 from e3sm_diags.metrics import corr, max_cdms, mean, min_cdms, rmse
@@ -59,16 +54,7 @@ def run_diag(parameter):
         )
 
         # Get land/ocean fraction for masking.
-        try:
-            land_frac = test_data.get_climo_variable("LANDFRAC", season)
-            ocean_frac = test_data.get_climo_variable("OCNFRAC", season)
-        except Exception:
-            mask_path = os.path.join(
-                e3sm_diags.INSTALL_PATH, "acme_ne30_ocean_land_mask.nc"
-            )
-            with cdms2.open(mask_path) as f:
-                land_frac = f("LANDFRAC")
-                ocean_frac = f("OCNFRAC")
+        land_frac, ocean_frac = utils.general.get_land_ocean_frac(test_data, season)
 
         for var in variables:
             logger.info("Variable: {}".format(var))
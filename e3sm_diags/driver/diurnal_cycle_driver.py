@@ -1,10 +1,10 @@
 from __future__ import print_function
 
-import os
+import collections
 
 import cdms2
+import numpy
 
-import e3sm_diags
 from e3sm_diags.driver import utils
 from e3sm_diags.logger import custom_logger
 from e3sm_diags.plot import plot
@@ -12,6 +12,46 @@ from e3sm_diags.plot import plot
 logger = custom_logger(__name__)
 
 
+def get_diurnal_climos(dataset, var, seasons):
+    """
+    Get the composite diurnal cycle of the sub-daily timeseries of var for each
+    of the seasons, like the diurnal climo files: the time_freq timesteps of a
+    day of the season. The timeseries is read climo_time_chunk_size timesteps
+    at a time, or at once if it's 0.
+    """
+    chunk_size = getattr(dataset.parameters, "climo_time_chunk_size", 0)
+    accumulator = None
+    for chunk in dataset.get_timeseries_variable_chunks(var, chunk_size):
+        if accumulator is None:
+            accumulator = utils.diurnal_cycle.DiurnalCycleAccumulator(chunk, seasons)
+        accumulator.add(chunk)
+
+    time_freq = accumulator.time_freq
+    climos = collections.OrderedDict()
+    for season, composite in zip(
+        accumulator.cycle_seasons, accumulator.get_composites()
+    ):
+        # The times of day of the composite, on the first day of the first
+        # month of the season.
+        month = utils.diurnal_cycle.SEASON_IDX[season].index(1) + 1
+        time = cdms2.createAxis(
+            accumulator.start_time + numpy.arange(time_freq) * 24.0 / time_freq
+        )
+        time.designateTime()
+        time.id = "time"
+        time.units = "hours since 2000-{:02d}-01 00:00:00".format(month)
+        time.calendar = chunk.getTime().calendar
+
+        climos[season] = cdms2.createVariable(
+            composite,
+            axes=[time] + chunk.getAxisList()[1:],
+            id=chunk.id,
+            attributes=dict(chunk.attributes),
+        )
+
+    return climos
+
+
 def run_diag(parameter):
     variables = parameter.variables
     seasons = parameter.seasons
@@ -21,6 +61,18 @@ def run_diag(parameter):
     test_data = utils.dataset.Dataset(parameter, test=True)
     ref_data = utils.dataset.Dataset(parameter, ref=True)
 
+    # The diurnal climos of the variables of timeseries data, which are
+    # computed for all of the seasons at once.
+    diurnal_climos = {}
+
+    def get_climo_variable(data, var, season):
+        if not data.is_timeseries():
+            return data.get_climo_variable(var, season)
+
+        if (data.ref, var) not in diurnal_climos:
+            diurnal_climos[(data.ref, var)] = get_diurnal_climos(data, var, seasons)
+        return diurnal_climos[(data.ref, var)][season]
+
     for season in seasons:
         # Get the name of the data, appended with the years averaged.
         parameter.test_name_yrs = utils.general.get_name_and_yrs(
@@ -31,21 +83,12 @@ def run_diag(parameter):
         )
 
         # Get land/ocean fraction for masking.
-        try:
-            land_frac = test_data.get_climo_variable("LANDFRAC", season)
-            ocean_frac = test_data.get_climo_variable("OCNFRAC", season)
-        except Exception:
-            mask_path = os.path.join(
-                e3sm_diags.INSTALL_PATH, "acme_ne30_ocean_land_mask.nc"
-            )
-            with cdms2.open(mask_path) as f:
-                land_frac = f("LANDFRAC")
-                ocean_frac = f("OCNFRAC")
+        land_frac, ocean_frac = utils.general.get_land_ocean_frac(test_data, season)
 
         for var in variables:
             logger.info("Variable: {}".format(var))
-            test = test_data.get_climo_variable(var, season)
-            ref = ref_data.get_climo_variable(var, season)
+            test = get_climo_variable(test_data, var, season)
+            ref = get_climo_variable(ref_data, var, season)
 
             parameter.var_id = var
             parameter.viewer_descr[var] = (
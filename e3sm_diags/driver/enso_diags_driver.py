@@ -4,7 +4,6 @@ import json
 import math
 import os
 
-import cdms2
 import cdutil
 import numpy
 import scipy.stats
@@ -13,11 +12,17 @@ import e3sm_diags
 from e3sm_diags.derivations import default_regions
 from e3sm_diags.driver import utils
 from e3sm_diags.logger import custom_logger
-from e3sm_diags.metrics import corr, max_cdms, mean, min_cdms, rmse, std
+from e3sm_diags.metrics import get_pair_stats, get_stats
 from e3sm_diags.plot.cartopy.enso_diags_plot import plot_map, plot_scatter
 
 logger = custom_logger(__name__)
 
+# The number of grid points regressed at once in perform_regression().
+REGRESSION_CHUNK_SIZE = 4096
+# The constant used by scipy.stats.linregress to avoid a division by zero
+# when computing the t-statistic of a perfect correlation.
+LINREGRESS_TINY = 1.0e-20
+
 
 def calculate_nino_index(nino_region_str, parameter, test=False, ref=False):
     """
@@ -69,26 +74,8 @@ def calculate_nino_index_model(data, nino_region_str, parameter):
     """
 
     try:
-        try:
-            # Try sea surface temperature first.
-            sst = data.get_timeseries_variable("SST")
-        except RuntimeError as e1:
-            if str(e1).startswith("Neither does SST nor the variables in"):
-                logger.info(
-                    "Handling the following exception by looking for surface "
-                    f"temperature: {e1}",
-                )
-                # Try surface temperature.
-                sst = data.get_timeseries_variable("TS")
-                logger.info(
-                    "Simulated sea surface temperature not found, using surface temperature instead."
-                )
-            else:
-                raise e1
-        nino_region = default_regions.regions_specs[nino_region_str]["domain"]  # type: ignore
-        sst_nino = sst(nino_region)
         # Domain average
-        sst_avg = cdutil.averager(sst_nino, axis="xy")
+        sst_avg = get_nino_region_average(data, nino_region_str)
         # Get anomaly from annual cycle climatology
         sst_avg_anomaly = cdutil.ANNUALCYCLE.departures(sst_avg)
         nino_index = sst_avg_anomaly
@@ -112,6 +99,54 @@ def calculate_nino_index_model(data, nino_region_str, parameter):
     return nino_index
 
 
+def get_nino_region_average(data, nino_region_str):
+    """
+    Get the domain average of the model SST, or TS if there's no SST, over
+    the nino region. With incremental_timeseries, only the years after the
+    average stored by a previous run are read.
+    """
+
+    def reduce(data):
+        try:
+            # Try sea surface temperature first.
+            sst = data.get_timeseries_variable("SST")
+        except RuntimeError as e1:
+            if str(e1).startswith("Neither does SST nor the variables in"):
+                logger.info(
+                    "Handling the following exception by looking for surface "
+                    f"temperature: {e1}",
+                )
+                # Try surface temperature.
+                sst = data.get_timeseries_variable("TS")
+                logger.info(
+                    "Simulated sea surface temperature not found, using surface temperature instead."
+                )
+            else:
+                raise e1
+        nino_region = default_regions.regions_specs[nino_region_str]["domain"]  # type: ignore
+        sst_nino = sst(nino_region)
+        return {nino_region_str: cdutil.averager(sst_nino, axis="xy")}
+
+    return utils.incremental.get_series(data, "SST", [nino_region_str], reduce)[
+        nino_region_str
+    ]
+
+
+def get_region_average(data, var, region):
+    """
+    Get the domain average of var over the region. With
+    incremental_timeseries, only the years after the average stored by a
+    previous run are read.
+    """
+
+    def reduce(data):
+        data_ts = data.get_timeseries_variable(var)
+        domain = default_regions.regions_specs[region]["domain"]  # type: ignore
+        return {region: cdutil.averager(data_ts(domain), axis="xy")}
+
+    return utils.incremental.get_series(data, var, [region], reduce)[region]
+
+
 def perform_regression(data, parameter, var, region, land_frac, ocean_frac, nino_index):
     ts_var = data.get_timeseries_variable(var)
     domain = utils.general.select_region(
@@ -124,34 +159,14 @@ def perform_regression(data, parameter, var, region, land_frac, ocean_frac, nino
     if parameter.print_statements:
         logger.info("domain.shape: {}".format(domain.shape))
     anomaly = cdutil.ANNUALCYCLE.departures(domain)
-    nlat = len(anomaly.getLatitude())
-    nlon = len(anomaly.getLongitude())
     reg_coe = anomaly[0, :, :](squeeze=1)
     confidence_levels = cdutil.ANNUALCYCLE.departures(domain)[0, :, :](squeeze=1)
-    # Neither of the following methods work, so we just set values in confidence_levels
-    # to be explicitly 0 or 1.
-    # confidence_levels = anomaly[0, :, :](squeeze=1).fill(0)
-    # confidence_levels = numpy.zeros_like(reg_coe)
-    for ilat in range(nlat):
-        if parameter.print_statements:
-            logger.info("ilat: {}".format(ilat))
-        for ilon in range(nlon):
-            dependent_var = anomaly[:, ilat, ilon]
-            independent_var = nino_index
-            # Uncomment the following line to use CDAT/genutil instead
-            # (You'll also need to set pvalue)
-            # slope, intercept = genutil.statistics.linearregression(dependent_var, x=independent_var)
-            slope, _, _, pvalue, _ = scipy.stats.linregress(
-                independent_var, dependent_var
-            )
-            reg_coe[ilat, ilon] = slope
-            # Set confidence level to 1 if significant and 0 if not
-            if pvalue < 0.05:
-                # p-value < 5%
-                # This implies significance at 95% confidence level
-                confidence_levels[ilat, ilon] = 1
-            else:
-                confidence_levels[ilat, ilon] = 0
+    # Regress the anomaly at every grid point on the nino index at once.
+    slope, pvalue = _linregress_grid(nino_index, anomaly)
+    reg_coe[:] = slope
+    # Set confidence level to 1 if significant and 0 if not.
+    # p-value < 5% implies significance at 95% confidence level.
+    confidence_levels[:] = numpy.ma.where(pvalue < 0.05, 1, 0)
     if parameter.print_statements:
         logger.info(f"confidence in fn: {confidence_levels.shape}")
     sst_units = "degC"
@@ -161,12 +176,77 @@ def perform_regression(data, parameter, var, region, land_frac, ocean_frac, nino
     return domain, reg_coe, confidence_levels
 
 
+def _linregress_grid(x, y, chunk_size=REGRESSION_CHUNK_SIZE):
+    """
+    Perform the linear regression of y on x, like ``scipy.stats.linregress``,
+    for every grid point at once.
+
+    x has the shape (time,) and y has the shape (time, ...). The grid points
+    are processed in chunks of ``chunk_size`` points to bound the memory used.
+    Masked values of y are excluded from the regression of their grid point,
+    and grid points with fewer than three valid values are masked.
+
+    Returns the slope and the two-sided p-value of the t-test of the
+    correlation, both with the shape of y without the time axis.
+    """
+    x = numpy.ma.getdata(x).astype(numpy.float64).ravel()
+    num_times = y.shape[0]
+    grid_shape = y.shape[1:]
+
+    y_data = numpy.ma.getdata(y).reshape(num_times, -1)
+    y_mask = numpy.ma.getmaskarray(y).reshape(num_times, -1)
+    num_points = y_data.shape[1]
+
+    slope = numpy.empty(num_points)
+    pvalue = numpy.empty(num_points)
+    num_valid = numpy.empty(num_points)
+
+    for start in range(0, num_points, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        valid = ~y_mask[:, chunk]
+        y_chunk = numpy.where(valid, y_data[:, chunk], 0.0)
+
+        n = valid.sum(axis=0)
+        n_safe = numpy.maximum(n, 1)
+        x_mean = (valid * x[:, numpy.newaxis]).sum(axis=0) / n_safe
+        y_mean = y_chunk.sum(axis=0) / n_safe
+
+        x_dev = numpy.where(valid, x[:, numpy.newaxis] - x_mean, 0.0)
+        y_dev = numpy.where(valid, y_chunk - y_mean, 0.0)
+        ssxm = (x_dev * x_dev).sum(axis=0) / n_safe
+        ssym = (y_dev * y_dev).sum(axis=0) / n_safe
+        ssxym = (x_dev * y_dev).sum(axis=0) / n_safe
+
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            slope[chunk] = ssxym / ssxm
+
+            r_den = numpy.sqrt(ssxm * ssym)
+            r = numpy.where(r_den == 0.0, 0.0, ssxym / r_den)
+            # Test for numerical error propagation.
+            r = numpy.clip(r, -1.0, 1.0)
+
+            df = n - 2
+            t = r * numpy.sqrt(
+                df / ((1.0 - r + LINREGRESS_TINY) * (1.0 + r + LINREGRESS_TINY))
+            )
+            pvalue[chunk] = 2 * scipy.stats.t.sf(numpy.abs(t), df)
+
+        num_valid[chunk] = n
+
+    invalid = num_valid < 3
+    slope = numpy.ma.masked_where(invalid, slope).reshape(grid_shape)
+    pvalue = numpy.ma.masked_where(invalid, pvalue).reshape(grid_shape)
+
+    return slope, pvalue
+
+
 def create_single_metrics_dict(values):
+    stats = get_stats(values)
     d = {
-        "min": float(min_cdms(values)),
-        "max": float(max_cdms(values)),
-        "mean": float(mean(values)),
-        "std": float(std(values)),
+        "min": float(stats["min"]),
+        "max": float(stats["max"]),
+        "mean": float(stats["mean"]),
+        "std": float(stats["std"]),
     }
     return d
 
@@ -180,8 +260,9 @@ def create_metrics(ref, test, ref_regrid, test_regrid, diff):
     metrics_dict["test_regrid"] = create_single_metrics_dict(test_regrid)
     metrics_dict["diff"] = create_single_metrics_dict(diff)
     d = metrics_dict["diff"]
-    d["rmse"] = float(rmse(test_regrid, ref_regrid))
-    d["corr"] = float(corr(test_regrid, ref_regrid))
+    pair_stats = get_pair_stats(test_regrid, ref_regrid)
+    d["rmse"] = float(pair_stats["rmse"])
+    d["corr"] = float(pair_stats["corr"])
     return metrics_dict
 
 
@@ -223,16 +304,7 @@ def run_diag_map(parameter):
         )
 
         # Get land/ocean fraction for masking.
-        try:
-            land_frac = test_data.get_climo_variable("LANDFRAC", season)
-            ocean_frac = test_data.get_climo_variable("OCNFRAC", season)
-        except Exception:
-            mask_path = os.path.join(
-                e3sm_diags.INSTALL_PATH, "acme_ne30_ocean_land_mask.nc"
-            )
-            with cdms2.open(mask_path) as f:
-                land_frac = f("LANDFRAC")
-                ocean_frac = f("OCNFRAC")
+        land_frac, ocean_frac = utils.general.get_land_ocean_frac(test_data, season)
 
         for var in variables:
             if parameter.print_statements:
@@ -406,14 +478,9 @@ def run_diag_scatter(parameter):
             regions = ["NINO3"]
         for region in regions:
             y = {"var": y_var, "region": region}
-            test_data_ts = test_data.get_timeseries_variable(y_var)
-            ref_data_ts = ref_data.get_timeseries_variable(y_var)
-            y_region = default_regions.regions_specs[region]["domain"]  # type: ignore
-            test_data_ts_regional = test_data_ts(y_region)
-            ref_data_ts_regional = ref_data_ts(y_region)
             # Domain average
-            test_avg = cdutil.averager(test_data_ts_regional, axis="xy")
-            ref_avg = cdutil.averager(ref_data_ts_regional, axis="xy")
+            test_avg = get_region_average(test_data, y_var, region)
+            ref_avg = get_region_average(ref_data, y_var, region)
             # Get anomaly from annual cycle climatology
             y["test"] = cdutil.ANNUALCYCLE.departures(test_avg)
             y["ref"] = cdutil.ANNUALCYCLE.departures(ref_avg)
@@ -3,12 +3,9 @@ from __future__ import print_function
 import json
 import os
 
-import cdms2
-
-import e3sm_diags
 from e3sm_diags.driver import utils
 from e3sm_diags.logger import custom_logger
-from e3sm_diags.metrics import corr, mean, rmse, std
+from e3sm_diags.metrics import get_pair_stats, get_stats
 from e3sm_diags.plot import plot
 
 logger = custom_logger(__name__)
@@ -68,41 +65,57 @@ def create_metrics(ref, test, ref_regrid, test_regrid, diff):
     # For input None, metrics are instantiated to 999.999.
     # Apply float() to make sure the elements in metrics_dict are JSON serializable, i.e. np.float64 type is JSON serializable, but not np.float32.
     missing_value = 999.999
+    missing_stats = {
+        "min": missing_value,
+        "max": missing_value,
+        "mean": missing_value,
+        "std": missing_value,
+    }
+    # The statistics of each variable are computed together, reusing the
+    # area weights of the grid.
+    ref_stats = get_stats(ref) if ref is not None else missing_stats
+    ref_regrid_stats = (
+        get_stats(ref_regrid) if ref_regrid is not None else missing_stats
+    )
+    test_stats = get_stats(test)
+    test_regrid_stats = get_stats(test_regrid)
+    diff_stats = get_stats(diff) if diff is not None else missing_stats
+    if ref_regrid is not None:
+        pair_stats = get_pair_stats(test_regrid, ref_regrid)
+    else:
+        pair_stats = {"rmse": missing_value, "corr": missing_value}
+
     metrics_dict = {}
     metrics_dict["ref"] = {
-        "min": float(ref.min()) if ref is not None else missing_value,
-        "max": float(ref.max()) if ref is not None else missing_value,
-        "mean": float(mean(ref)) if ref is not None else missing_value,
+        "min": float(ref_stats["min"]),
+        "max": float(ref_stats["max"]),
+        "mean": float(ref_stats["mean"]),
     }
     metrics_dict["ref_regrid"] = {
-        "min": float(ref_regrid.min()) if ref_regrid is not None else missing_value,
-        "max": float(ref_regrid.max()) if ref_regrid is not None else missing_value,
-        "mean": float(mean(ref_regrid)) if ref_regrid is not None else missing_value,
-        "std": float(std(ref_regrid)) if ref_regrid is not None else missing_value,
+        "min": float(ref_regrid_stats["min"]),
+        "max": float(ref_regrid_stats["max"]),
+        "mean": float(ref_regrid_stats["mean"]),
+        "std": float(ref_regrid_stats["std"]),
     }
     metrics_dict["test"] = {
-        "min": float(test.min()),
-        "max": float(test.max()),
-        "mean": float(mean(test)),
+        "min": float(test_stats["min"]),
+        "max": float(test_stats["max"]),
+        "mean": float(test_stats["mean"]),
     }
     metrics_dict["test_regrid"] = {
-        "min": float(test_regrid.min()),
-        "max": float(test_regrid.max()),
-        "mean": float(mean(test_regrid)),
-        "std": float(std(test_regrid)),
+        "min": float(test_regrid_stats["min"]),
+        "max": float(test_regrid_stats["max"]),
+        "mean": float(test_regrid_stats["mean"]),
+        "std": float(test_regrid_stats["std"]),
     }
     metrics_dict["diff"] = {
-        "min": float(diff.min()) if diff is not None else missing_value,
-        "max": float(diff.max()) if diff is not None else missing_value,
-        "mean": float(mean(diff)) if diff is not None else missing_value,
+        "min": float(diff_stats["min"]),
+        "max": float(diff_stats["max"]),
+        "mean": float(diff_stats["mean"]),
     }
     metrics_dict["misc"] = {
-        "rmse": float(rmse(test_regrid, ref_regrid))
-        if ref_regrid is not None
-        else missing_value,
-        "corr": float(corr(test_regrid, ref_regrid))
-        if ref_regrid is not None
-        else missing_value,
+        "rmse": float(pair_stats["rmse"]),
+        "corr": float(pair_stats["corr"]),
     }
     return metrics_dict
 
@@ -126,16 +139,7 @@ def run_diag(parameter):  # noqa: C901
         )
 
         # Get land/ocean fraction for masking.
-        try:
-            land_frac = test_data.get_climo_variable("LANDFRAC", season)
-            ocean_frac = test_data.get_climo_variable("OCNFRAC", season)
-        except Exception:
-            mask_path = os.path.join(
-                e3sm_diags.INSTALL_PATH, "acme_ne30_ocean_land_mask.nc"
-            )
-            with cdms2.open(mask_path) as f:
-                land_frac = f("LANDFRAC")
-                ocean_frac = f("OCNFRAC")
+        land_frac, ocean_frac = utils.general.get_land_ocean_frac(test_data, season)
 
         parameter.model_only = False
         for var in variables:
@@ -1,14 +1,10 @@
 from __future__ import print_function
 
-import os
-
-import cdms2
 import MV2
 
-import e3sm_diags
 from e3sm_diags.driver import utils
 from e3sm_diags.logger import custom_logger
-from e3sm_diags.metrics import corr, max_cdms, mean, min_cdms, rmse
+from e3sm_diags.metrics import get_pair_stats, get_stats
 from e3sm_diags.plot import plot
 
 logger = custom_logger(__name__)
@@ -17,26 +13,14 @@ logger = custom_logger(__name__)
 def create_metrics(ref, test, ref_regrid, test_regrid, diff):
     """Creates the mean, max, min, rmse, corr in a dictionary"""
     metrics_dict = {}
-    metrics_dict["ref"] = {
-        "min": min_cdms(ref),
-        "max": max_cdms(ref),
-        "mean": mean(ref),
-    }
-    metrics_dict["test"] = {
-        "min": min_cdms(test),
-        "max": max_cdms(test),
-        "mean": mean(test),
-    }
-
-    metrics_dict["diff"] = {
-        "min": min_cdms(diff),
-        "max": max_cdms(diff),
-        "mean": mean(diff),
-    }
-    metrics_dict["misc"] = {
-        "rmse": rmse(test_regrid, ref_regrid),
-        "corr": corr(test_regrid, ref_regrid),
-    }
+    for name, variable in [("ref", ref), ("test", test), ("diff", diff)]:
+        stats = get_stats(variable)
+        metrics_dict[name] = {
+            "min": stats["min"],
+            "max": stats["max"],
+            "mean": stats["mean"],
+        }
+    metrics_dict["misc"] = get_pair_stats(test_regrid, ref_regrid)
 
     return metrics_dict
 
@@ -60,16 +44,7 @@ def run_diag(parameter):
         )
 
         # Get land/ocean fraction for masking.
-        try:
-            land_frac = test_data.get_climo_variable("LANDFRAC", season)
-            ocean_frac = test_data.get_climo_variable("OCNFRAC", season)
-        except Exception:
-            mask_path = os.path.join(
-                e3sm_diags.INSTALL_PATH, "acme_ne30_ocean_land_mask.nc"
-            )
-            with cdms2.open(mask_path) as f:
-                land_frac = f("LANDFRAC")
-                ocean_frac = f("OCNFRAC")
+        land_frac, ocean_frac = utils.general.get_land_ocean_frac(test_data, season)
 
         for var in variables:
             logger.info("Variable: {}".format(var))
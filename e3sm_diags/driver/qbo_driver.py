@@ -89,11 +89,15 @@ def get_20to40month_fft_amplitude(qboN, levelN):
 
 
 def process_u_for_power_spectral_density(data_region):
-    # Average over vertical levels and horizontal area (units: hPa)
-    level_bottom = 22
-    level_top = 18
     # Average over lat and lon
     data_lat_lon_average = cdutil.averager(data_region, axis="xy")
+    return process_lat_lon_average_for_power_spectral_density(data_lat_lon_average)
+
+
+def process_lat_lon_average_for_power_spectral_density(data_lat_lon_average):
+    # Average over vertical levels (units: hPa)
+    level_bottom = 22
+    level_top = 18
     # Average over vertical
     try:
         average = data_lat_lon_average(level=(level_top, level_bottom))
@@ -154,6 +158,32 @@ def get_psd_from_deseason(xraw, period_new):
     return psd_x_new0, amplitude_new0
 
 
+def get_u_averages(data, variable, region):
+    """
+    Get the time-height array of the average of variable over the region from
+    process_u_for_time_height() and its average over lat and lon, for
+    process_lat_lon_average_for_power_spectral_density(). With
+    incremental_timeseries, only the years after the averages stored by a
+    previous run are read.
+    """
+    keys = ["{}_time_height".format(region), "{}_lat_lon".format(region)]
+
+    def reduce(data):
+        var = data.get_timeseries_variable(variable)
+        qbo_region = default_regions.regions_specs[region]["domain"]  # type: ignore
+        data_region = var(qbo_region)
+
+        # Convert plevs for unified units and direction
+        unify_plev(data_region)
+
+        time_height, _ = process_u_for_time_height(data_region)
+        lat_lon_average = cdutil.averager(data_region, axis="xy")
+        return dict(zip(keys, [time_height, lat_lon_average]))
+
+    averages = utils.incremental.get_series(data, variable, keys, reduce)
+    return averages[keys[0]], averages[keys[1]]
+
+
 def run_diag(parameter):
     variables = parameter.variables
     # The region will always be 5S5N
@@ -166,16 +196,12 @@ def run_diag(parameter):
     for variable in variables:
         if parameter.print_statements:
             logger.info("Variable={}".format(variable))
-        test_var = test_data.get_timeseries_variable(variable)
-        ref_var = ref_data.get_timeseries_variable(variable)
-        qbo_region = default_regions.regions_specs[region]["domain"]  # type: ignore
-
-        test_region = test_var(qbo_region)
-        ref_region = ref_var(qbo_region)
-
-        # Convert plevs of test and ref for unified units and direction
-        unify_plev(test_region)
-        unify_plev(ref_region)
+        test_time_height, test_lat_lon_average = get_u_averages(
+            test_data, variable, region
+        )
+        ref_time_height, ref_lat_lon_average = get_u_averages(
+            ref_data, variable, region
+        )
 
         test = {}
         ref = {}
@@ -184,8 +210,8 @@ def run_diag(parameter):
         # Richter, J. H., Chen, C. C., Tang, Q., Xie, S., & Rasch, P. J. (2019). Improved Simulation of the QBO in E3SMv1. Journal of Advances in Modeling Earth Systems, 11(11), 3403-3418.
         # https://agupubs.onlinelibrary.wiley.com/doi/epdf/10.1029/2019MS001763
         # U = "Monthly mean zonal mean zonal wind averaged between 5S and 5N as a function of pressure and time" (p. 3406)
-        test["qbo"], test["level"] = process_u_for_time_height(test_region)
-        ref["qbo"], ref["level"] = process_u_for_time_height(ref_region)
+        test["qbo"], test["level"] = test_time_height, test_time_height.getAxis(1)
+        ref["qbo"], ref["level"] = ref_time_height, ref_time_height.getAxis(1)
 
         # Diagnostic 2: calculate and plot the amplitude of wind variations with a 20-40 month period
         test["psd_sum"], test["amplitude"] = get_20to40month_fft_amplitude(
@@ -197,8 +223,10 @@ def run_diag(parameter):
 
         # Diagnostic 3: calculate the Power Spectral Density
         # Pre-process data to average over lat,lon,height
-        x_test = process_u_for_power_spectral_density(test_region)
-        x_ref = process_u_for_power_spectral_density(ref_region)
+        x_test = process_lat_lon_average_for_power_spectral_density(
+            test_lat_lon_average
+        )
+        x_ref = process_lat_lon_average_for_power_spectral_density(ref_lat_lon_average)
         # Calculate the PSD and interpolate to period_new. Specify periods to plot
         period_new = np.concatenate(
             (np.arange(2.0, 33.0), np.arange(34.0, 100.0, 2.0)), axis=0
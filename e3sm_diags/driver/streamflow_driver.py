@@ -1,7 +1,10 @@
 from __future__ import print_function
 
 import csv
+import hashlib
 import os
+import tempfile
+import warnings
 
 import cdms2
 import cdutil
@@ -18,74 +21,65 @@ from e3sm_diags.plot.cartopy.streamflow_plot import (
 
 logger = custom_logger(__name__)
 
+# The number of gauges to process at once
+GAUGES_CHUNK_SIZE = 2000
 
-def get_drainage_area_error(
-    radius, resolution, lon_ref, lat_ref, area_upstream, area_ref
-):
-    k_bound = len(range(-radius, radius + 1))
-    k_bound *= k_bound
-    area_test = numpy.zeros((k_bound, 1))
-    error_test = numpy.zeros((k_bound, 1))
-    lat_lon_test = numpy.zeros((k_bound, 2))
-    k = 0
-    for i in range(-radius, radius + 1):
-        for j in range(-radius, radius + 1):
-            x = int(
-                1 + ((lon_ref + j * resolution) - (-180 + resolution / 2)) / resolution
-            )
-            y = int(
-                1 + ((lat_ref + i * resolution) - (-90 + resolution / 2)) / resolution
-            )
-            area_test[k] = area_upstream[x - 1, y - 1] / 1000000
-            error_test[k] = numpy.abs(area_test[k] - area_ref) / area_ref
-            lat_lon_test[k, 0] = lat_ref + i * resolution
-            lat_lon_test[k, 1] = lon_ref + j * resolution
-            k += 1
-    # The id of the center grid in the searching area
-    center_id = (k_bound - 1) / 2
-
-    lat_lon_ref = [lat_ref, lon_ref]
-    drainage_area_error = error_test[int(center_id)]
+
+def get_grid_indices(lon, lat, resolution):
+    """
+    Get the (lon, lat) indices of the grid cells that contain the points, on a
+    global grid with the resolution, starting at (-180, -90).
+    """
+    # Truncate like `int()`.
+    lon_index = (1 + (lon - (-180 + resolution / 2)) / resolution).astype(numpy.int64)
+    lat_index = (1 + (lat - (-90 + resolution / 2)) / resolution).astype(numpy.int64)
+    return lon_index - 1, lat_index - 1
+
+
+def get_drainage_area_error(resolution, lon_ref, lat_ref, area_upstream, area_ref):
+    # `lon_ref`, `lat_ref` and `area_ref` are arrays with one value per gauge.
+    # Only the grid containing the gauge is used.
+    x, y = get_grid_indices(lon_ref, lat_ref, resolution)
+    area_test = area_upstream[x, y] / 1000000
+
+    lat_lon_ref = numpy.stack([lat_ref, lon_ref], axis=1)
+    drainage_area_error = numpy.abs(area_test - area_ref) / area_ref
     return drainage_area_error, lat_lon_ref
 
 
-def get_seasonality(monthly):
+def get_seasonality(monthly, num_years=None):
     monthly = monthly.astype(numpy.float64)
     # See https://agupubs.onlinelibrary.wiley.com/doi/epdf/10.1029/2018MS001603 Equations 1 and 2
+    # `monthly` is 12 x num_years, or 12 x num_years x num_gauges for all gauges at once.
     if monthly.shape[0] != 12:
         raise Exception(
             "monthly.shape={} does not include 12 months".format(monthly.shape)
         )
-    num_years = monthly.shape[1]
-    p_k = numpy.zeros((12, 1))
+    # Years with a nan month don't contribute to the sums below, so they can be
+    # excluded from `num_years` as well.
+    if num_years is None:
+        num_years = monthly.shape[1]
     # The total streamflow for each year (sum of Q_ij in the denominator of Equation 1, for all j)
-    # 1 x num_years
+    # 1 x num_years (x num_gauges)
     total_streamflow = numpy.sum(monthly, axis=0)
-    for month in range(12):
-        # The streamflow for this month in each year (Q_ij in the numerator of Equation 1, for all j)
-        # 1 x num_years
-        streamflow_month_all_years = monthly[month, :]
-        # Proportion that this month contributes to streamflow that year.
-        # 1 x num_years
-        # For all i, divide streamflow_month_all_years[i] by total_streamflow[i]
-        streamflow_proportion = numpy.divide(
-            streamflow_month_all_years, total_streamflow
-        )
-        # The sum is the sum over j in Equation 1.
-        # Dividing the sum of proportions by num_years gives the *average* proportion of annual streamflow during
-        # this month.
-        # Multiplying by 12 makes it so that Pk_i (`p_k[month]`) will be 1 if all months have equal streamflow and
-        # 12 if all streamflow occurs in one month.
-        # These steps produce the 12/n factor in Equation 1.
-        p_k[month] = numpy.nansum(streamflow_proportion) * 12 / num_years
+    # Proportion that each month contributes to streamflow that year.
+    # 12 x num_years (x num_gauges)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        streamflow_proportion = monthly / total_streamflow
+    # The sum is the sum over j in Equation 1.
+    # Dividing the sum of proportions by num_years gives the *average* proportion of annual streamflow during
+    # each month.
+    # Multiplying by 12 makes it so that Pk_i (`p_k[month]`) will be 1 if all months have equal streamflow and
+    # 12 if all streamflow occurs in one month.
+    # These steps produce the 12/n factor in Equation 1.
+    # 12 (x num_gauges)
+    p_k = numpy.nansum(streamflow_proportion, axis=1) * 12 / num_years
     # From Equation 2
-    seasonality_index = numpy.max(p_k)
-    # `p_k == numpy.max(p_k)` produces a Boolean matrix, True if the value (i.e., streamflow) is the max value.
-    # `np.where(p_k == numpy.max(p_k))` produces the indices (i.e., months) where the max value is reached.
-    peak_month = numpy.where(p_k == numpy.max(p_k))[0]
+    seasonality_index = numpy.max(p_k, axis=0)
+    # `p_k == seasonality_index` is True for the months where the max value (i.e., streamflow) is reached.
     # If more than one month has peak streamflow, simply define the peak month as the first one of the peak months.
     # Month 0 is January, Month 1 is February, and so on.
-    peak_month = peak_month[0]
+    peak_month = numpy.argmax(p_k == seasonality_index, axis=0)
     return seasonality_index, peak_month
 
 
@@ -119,11 +113,7 @@ def run_diag(parameter):
         )
 
     # Set path to the gauge metadata
-    with open(gauges_path) as gauges_file:
-        gauges_list = list(csv.reader(gauges_file))
-    # Remove headers
-    gauges_list.pop(0)
-    gauges = numpy.array(gauges_list)
+    gauges = load_cached_array(gauges_path, parameter.gsim_cache_dir, read_gauges)
     if parameter.print_statements:
         logger.info("gauges.shape={}".format(gauges.shape))
 
@@ -134,8 +124,6 @@ def run_diag(parameter):
 
         # Resolution of MOSART output
         resolution = 0.5
-        # Search radius (number of grids around the center point)
-        radius = 1
         bins = numpy.floor(gauges[:, 7:9].astype(numpy.float64) / resolution)
         # Move the ref lat lon to grid center
         lat_lon = (bins + 0.5) * resolution
@@ -148,7 +136,6 @@ def run_diag(parameter):
             lat_lon,
             area_upstream,
             gauges,
-            radius,
             resolution,
             using_ref_mat_file,
             ref_array,
@@ -246,8 +233,9 @@ def setup_ref(parameter, var, using_ref_mat_file):
         parameter.ref_name_yrs = "{} ({}-{})".format(
             ref_name, parameter.ref_start_yr, parameter.ref_end_yr
         )
-        ref_mat = scipy.io.loadmat(ref_mat_file)
-        ref_array = ref_mat["GSIM"].astype(numpy.float64)
+        ref_array = load_cached_array(
+            ref_mat_file, parameter.gsim_cache_dir, read_gsim_mat_file
+        )
     if parameter.print_statements:
         # GSIM: 1380 x 30961
         # wrmflow: 720 x 360 x 360
@@ -256,6 +244,59 @@ def setup_ref(parameter, var, using_ref_mat_file):
     return ref_array
 
 
+def read_gauges(gauges_path):
+    with open(gauges_path) as gauges_file:
+        gauges_list = list(csv.reader(gauges_file))
+    # Remove headers
+    gauges_list.pop(0)
+    return numpy.array(gauges_list)
+
+
+def read_gsim_mat_file(ref_mat_file):
+    ref_mat = scipy.io.loadmat(ref_mat_file)
+    return ref_mat["GSIM"].astype(numpy.float64)
+
+
+def load_cached_array(path, cache_dir, read):
+    """
+    Load the array read from path by read(path), from a .npy file in the
+    cache directory. The .npy file is written the first time, and memory-mapped
+    read-only after that, so the processes that load it share the same pages
+    through the OS page cache instead of each decoding their own copy.
+
+    If cache_dir is "", the array is read from path every time.
+    """
+    if not cache_dir:
+        return read(path)
+
+    # The cache file is only used for the same version of the file.
+    stat = os.stat(path)
+    key = hashlib.sha1(
+        "{}_{}_{}".format(
+            os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+        ).encode()
+    ).hexdigest()
+    cache_path = os.path.join(
+        cache_dir, "{}_{}.npy".format(os.path.splitext(os.path.basename(path))[0], key)
+    )
+
+    if not os.path.exists(cache_path):
+        array = read(path)
+        try:
+            # Write to a temporary file first, so other processes never load a
+            # partially written file.
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".npy")
+            with os.fdopen(fd, "wb") as f:
+                numpy.save(f, array, allow_pickle=False)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            logger.warning("Could not save {} to {}.".format(path, cache_path))
+            return array
+
+    return numpy.load(cache_path, mmap_mode="r", allow_pickle=False)
+
+
 def setup_test(parameter, var, using_test_mat_file):
     # Load E3SM simulated streamflow dataset
     if not using_test_mat_file:
@@ -373,7 +414,6 @@ def generate_export(
     lat_lon,
     area_upstream,
     gauges,
-    radius,
     resolution,
     using_ref_mat_file,
     ref_array,
@@ -383,148 +423,159 @@ def generate_export(
     export = numpy.zeros((lat_lon.shape[0], 9))
     if parameter.print_statements:
         logger.info("export.shape={}".format(export.shape))
-    for i in range(lat_lon.shape[0]):
-        if parameter.print_statements and (i % 1000 == 0):
-            logger.info("On gauge #{}".format(i))
-        if parameter.max_num_gauges and i >= parameter.max_num_gauges:
-            break
-        lat_ref = lat_lon[i, 1]
-        lon_ref = lat_lon[i, 0]
-        # Estimated drainage area (km^2) from ref
-        area_ref = gauges[i, 13].astype(numpy.float64)
+    num_gauges = lat_lon.shape[0]
+    if parameter.max_num_gauges:
+        num_gauges = min(num_gauges, parameter.max_num_gauges)
+
+    if using_ref_mat_file:
+        check_gsim_months(ref_array)
+
+    # Masked values are treated like nan values.
+    ref_array = numpy.ma.filled(ref_array, numpy.nan)
+    test_array = numpy.ma.filled(test_array, numpy.nan)
+    if area_upstream is not None:
+        area_upstream = numpy.ma.filled(area_upstream, numpy.nan)
+
+    # The gauges are processed in chunks, to bound the memory used by the
+    # streamflow of the gauges.
+    for start in range(0, num_gauges, GAUGES_CHUNK_SIZE):
+        if parameter.print_statements:
+            logger.info("On gauge #{}".format(start))
+        gauges_slice = slice(start, min(start + GAUGES_CHUNK_SIZE, num_gauges))
+        export[gauges_slice] = generate_export_chunk(
+            lat_lon[gauges_slice],
+            area_upstream,
+            gauges[gauges_slice],
+            resolution,
+            using_ref_mat_file,
+            ref_array,
+            test_array,
+        )
+    return export
 
-        if area_upstream is not None:
-            drainage_area_error, lat_lon_ref = get_drainage_area_error(
-                radius,
-                resolution,
-                lon_ref,
-                lat_ref,
-                area_upstream,
-                area_ref,
-            )
-        else:
-            # Use the center location
-            lat_lon_ref = [lat_ref, lon_ref]
-        if using_ref_mat_file:
-            origin_id = gauges[i, 1].astype(numpy.int64)
-            # Column 0 -- year
-            # Column 1 -- month
-            # Column origin_id + 1 -- the ref streamflow from gauge with the corresponding origin_id
-            extracted = ref_array[:, [0, 1, origin_id + 1]]
-            monthly_mean = numpy.zeros((12, 1)) + numpy.nan
-            # For GSIM, shape is (1380,)
-            month_array = extracted[:, 1]
-            for month in range(12):
-                # Add 1 to month to account for the months being 1-indexed
-                month_array_boolean = month_array == month + 1
-                s = numpy.sum(month_array_boolean)
-                if s > 0:
-                    # `extracted[:,1]`: for all x, examine `extracted[x,1]`
-                    # `extracted[:,1] == m`: Boolean array where 0 means the item in position [x,1] is NOT m,
-                    # and 1 means it is m
-                    # Example:
-                    # a = [[1,2,3,4],
-                    #      [5,6,7,8],
-                    #      [1,2,3,4]]
-                    # a[:,1]: [[2],
-                    #          [6],
-                    #          [2]]
-                    # a[:,1] == 2: [[1], # False is 0, True is 1
-                    #               [0],
-                    #               [1]]
-                    # a[a[:,1] == 2, 2]: [[3],
-                    #                     [3]]
-                    monthly_mean[month] = numpy.nanmean(
-                        extracted[month_array_boolean, 2]
-                    )
-            # This is ref annual mean streamflow
-            annual_mean_ref = numpy.mean(monthly_mean)
-        if using_ref_mat_file and numpy.isnan(annual_mean_ref):
-            # All elements of row i will be nan
-            export[i, :] = numpy.nan
-        else:
-            if using_ref_mat_file:
-                # Reshape extracted[:,2] into a 12 x ? matrix; -1 means to
-                # calculate the size of the missing dimension.
-                # Note that `numpy.reshape(extracted[:, 2], (12,-1))` will not work.
-                # We do need to go from (12n x 1) to (12 x n).
-                # `reshape` alone would make the first row [January of year 1, February of year 1,...]
-                # (i.e., 12 sequential rows with n entries)
-                # We actually want the first row to be [January of year 1, January of year 2,...]
-                # (i.e., n sequential columns with 12 entries)
-                # So, we use `reshape` to slice into n segments of length 12 and then we `transpose`.
-                mmat = numpy.transpose(numpy.reshape(extracted[:, 2], (-1, 12)))
-                mmat_id = numpy.sum(mmat, axis=0).transpose()
-                if numpy.sum(~numpy.isnan(mmat_id), axis=0) > 0:
-                    # There's at least one year of record
-                    monthly = mmat[:, ~numpy.isnan(mmat_id)]
-                else:
-                    monthly = monthly_mean
-                seasonality_index_ref, peak_month_ref = get_seasonality(monthly)
-            else:
-                ref_lon = int(
-                    1 + (lat_lon_ref[1] - (-180 + resolution / 2)) / resolution
-                )
-                ref_lat = int(
-                    1 + (lat_lon_ref[0] - (-90 + resolution / 2)) / resolution
-                )
-                ref = numpy.squeeze(ref_array[ref_lon - 1, ref_lat - 1, :])
-                # Note that `numpy.reshape(ref, (12,-1))` will not work.
-                # We do need to go from (12n x 1) to (12 x n).
-                # `reshape` alone would make the first row [January of year 1, February of year 1,...]
-                # (i.e., 12 sequential rows with n entries)
-                # We actually want the first row to be [January of year 1, January of year 2,...]
-                # (i.e., n sequential columns with 12 entries)
-                # So, we use `reshape` to slice into n segments of length 12 and then we `transpose`.
-                mmat = numpy.transpose(numpy.reshape(ref, (-1, 12)))
-                monthly_mean_ref = numpy.nanmean(mmat, axis=1)
-                annual_mean_ref = numpy.mean(monthly_mean_ref)
-                if numpy.isnan(annual_mean_ref) == 1:
-                    # The identified grid is in the ocean
-                    monthly = numpy.ones((12, 1))
-                else:
-                    monthly = mmat
-
-                if type(monthly) == cdms2.tvariable.TransientVariable:
-                    monthly = monthly.getValue()
-
-                seasonality_index_ref, peak_month_ref = get_seasonality(monthly)
-
-            test_lon = int(1 + (lat_lon_ref[1] - (-180 + resolution / 2)) / resolution)
-            test_lat = int(1 + (lat_lon_ref[0] - (-90 + resolution / 2)) / resolution)
-            # For edison: 600x1
-            test = numpy.squeeze(test_array[test_lon - 1, test_lat - 1, :])
-            # For edison: 12x50
-            # Note that `numpy.reshape(test, (12,-1))` will not work.
-            # We do need to go from (12n x 1) to (12 x n).
-            # `reshape` alone would make the first row [January of year 1, February of year 1,...]
-            # (i.e., 12 sequential rows with n entries)
-            # We actually want the first row to be [January of year 1, January of year 2,...]
-            # (i.e., n sequential columns with 12 entries)
-            # So, we use `reshape` to slice into n segments of length 12 and then we `transpose`.
-            mmat = numpy.transpose(numpy.reshape(test, (-1, 12)))
-            monthly_mean_test = numpy.nanmean(mmat, axis=1)
-            annual_mean_test = numpy.mean(monthly_mean_test)
-            if numpy.isnan(annual_mean_test) == 1:
-                # The identified grid is in the ocean
-                monthly = numpy.ones((12, 1))
-            else:
-                monthly = mmat
-
-            if type(monthly) == cdms2.tvariable.TransientVariable:
-                monthly = monthly.getValue()
-
-            seasonality_index_test, peak_month_test = get_seasonality(monthly)
-
-            export[i, 0] = annual_mean_ref
-            export[i, 1] = annual_mean_test
-            if area_upstream is not None:
-                export[i, 2] = (
-                    drainage_area_error * 100
-                )  # From fraction to percentage of the drainage area bias
-            export[i, 3] = seasonality_index_ref  # Seasonality index of ref
-            export[i, 4] = peak_month_ref  # Max flow month of ref
-            export[i, 5] = seasonality_index_test  # Seasonality index of test
-            export[i, 6] = peak_month_test  # Max flow month of test
-            export[i, 7:9] = lat_lon_ref  # latlon of ref
+
+def generate_export_chunk(
+    lat_lon,
+    area_upstream,
+    gauges,
+    resolution,
+    using_ref_mat_file,
+    ref_array,
+    test_array,
+):
+    # The rows of `export` for a chunk of gauges, all computed at once.
+    export = numpy.zeros((lat_lon.shape[0], 9))
+    lat_ref = lat_lon[:, 1]
+    lon_ref = lat_lon[:, 0]
+    # Estimated drainage area (km^2) from ref
+    area_ref = gauges[:, 13].astype(numpy.float64)
+
+    if area_upstream is not None:
+        drainage_area_error, lat_lon_ref = get_drainage_area_error(
+            resolution,
+            lon_ref,
+            lat_ref,
+            area_upstream,
+            area_ref,
+        )
+    else:
+        # Use the center location
+        lat_lon_ref = numpy.stack([lat_ref, lon_ref], axis=1)
+    grid_lon, grid_lat = get_grid_indices(
+        lat_lon_ref[:, 1], lat_lon_ref[:, 0], resolution
+    )
+
+    if using_ref_mat_file:
+        origin_id = gauges[:, 1].astype(numpy.int64)
+        # Column 0 -- year
+        # Column 1 -- month
+        # Column origin_id + 1 -- the ref streamflow from gauge with the corresponding origin_id
+        # For GSIM, the rows are the months from January of the first year to
+        # December of the last one, so the streamflow of all gauges can be
+        # reshaped into a num_years x 12 x num_gauges cube.
+        cube = get_monthly_cube(ref_array[:, origin_id + 1])
+        monthly_mean = nanmean(cube, axis=0)
+        # This is ref annual mean streamflow
+        annual_mean_ref = numpy.mean(monthly_mean, axis=0)
+
+        # 12 x num_years x num_gauges
+        mmat = numpy.transpose(cube, (1, 0, 2))
+        # The years of record are the years without a nan month, for each gauge.
+        num_years_ref = numpy.sum(~numpy.isnan(numpy.sum(mmat, axis=0)), axis=0)
+        seasonality_index_ref, peak_month_ref = get_seasonality(
+            mmat, numpy.maximum(num_years_ref, 1)
+        )
+        # Use the monthly means for gauges without one year of record.
+        seasonality_index_mean, peak_month_mean = get_seasonality(
+            monthly_mean[:, numpy.newaxis, :]
+        )
+        no_record = num_years_ref == 0
+        seasonality_index_ref[no_record] = seasonality_index_mean[no_record]
+        peak_month_ref[no_record] = peak_month_mean[no_record]
+    else:
+        annual_mean_ref, seasonality_index_ref, peak_month_ref = get_grid_seasonality(
+            ref_array[grid_lon, grid_lat, :]
+        )
+
+    annual_mean_test, seasonality_index_test, peak_month_test = get_grid_seasonality(
+        test_array[grid_lon, grid_lat, :]
+    )
+
+    export[:, 0] = annual_mean_ref
+    export[:, 1] = annual_mean_test
+    if area_upstream is not None:
+        # From fraction to percentage of the drainage area bias
+        export[:, 2] = drainage_area_error * 100
+    export[:, 3] = seasonality_index_ref  # Seasonality index of ref
+    export[:, 4] = peak_month_ref  # Max flow month of ref
+    export[:, 5] = seasonality_index_test  # Seasonality index of test
+    export[:, 6] = peak_month_test  # Max flow month of test
+    export[:, 7:9] = lat_lon_ref  # latlon of ref
+    if using_ref_mat_file:
+        # All elements of the rows without a ref annual mean will be nan
+        export[numpy.isnan(annual_mean_ref), :] = numpy.nan
     return export
+
+
+def check_gsim_months(ref_array):
+    # The streamflow of the gauges is reshaped into years of 12 months, so the
+    # rows of GSIM (column 1 is the month) must run from January to December of
+    # each year.
+    months = ref_array[:, 1]
+    num_years = months.shape[0] // 12
+    if months.shape[0] % 12 != 0 or numpy.any(
+        months != numpy.tile(numpy.arange(1, 13), num_years)
+    ):
+        raise Exception(
+            "The rows of the reference data don't run from January to December of each year"
+        )
+
+
+def get_grid_seasonality(flow):
+    # `flow` is the streamflow of the grid cell of each gauge, num_gauges x 12n.
+    # num_years x 12 x num_gauges
+    cube = get_monthly_cube(flow.T)
+    monthly_mean = nanmean(cube, axis=0)
+    annual_mean = numpy.mean(monthly_mean, axis=0)
+    seasonality_index, peak_month = get_seasonality(numpy.transpose(cube, (1, 0, 2)))
+    # The grid cells without an annual mean are in the ocean, and have a
+    # uniform seasonality
+    in_ocean = numpy.isnan(annual_mean)
+    seasonality_index[in_ocean] = 1.0
+    peak_month[in_ocean] = 0
+    return annual_mean, seasonality_index, peak_month
+
+
+def get_monthly_cube(flow):
+    # Reshape the monthly streamflow of each gauge, 12n x num_gauges, into a
+    # num_years x 12 x num_gauges cube.
+    # The first row of each year is January of that year.
+    return numpy.reshape(flow, (-1, 12, flow.shape[-1]))
+
+
+def nanmean(a, axis):
+    # `numpy.nanmean` without the warnings for all-nan slices, which are expected
+    # for gauges without a record, or in the ocean
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return numpy.nanmean(a, axis=axis)
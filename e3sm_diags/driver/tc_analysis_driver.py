@@ -1,15 +1,16 @@
 from __future__ import print_function
 
 import collections
+import itertools
 import os
-from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+import tempfile
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import cdms2
 import numpy as np
 from netCDF4 import Dataset as netcdffile
 
-import e3sm_diags
+from e3sm_diags.driver import utils
 from e3sm_diags.plot.cartopy import tc_analysis_plot
 
 if TYPE_CHECKING:
@@ -37,6 +38,27 @@ BASIN_DICT: Dict[str, BasinInfo] = {
     "SP": ("South Pacific", 135, 270, -45, 0, 10.4),
 }
 
+# The upper bounds (knots) of the TC intensity categories, from tropical storms
+# to category 5 hurricanes, which have no upper bound.
+INTENSITY_UPPER_BOUNDS = np.array([63, 82, 95, 112, 136])
+# The lower bound (knots) of tropical storms, and of category 4 hurricanes.
+TS_LOWER_BOUND = 34
+CAT4_LOWER_BOUND = 113
+
+# The columns of the TE stitch file for each TE stitch variable, after splitting
+# a line of a TC track on tabs.
+TE_STITCH_COLUMNS = {"longmc": 2, "latmc": 3, "vsmc": 5, "yearmc": 6, "monthmc": 7}
+# The number of lines of a TE stitch file to parse at once.
+TE_STITCH_CHUNK_LINES = 1000000
+# The version of the TE stitch cache files, to increment when their content changes.
+TE_STITCH_CACHE_VERSION = 1
+
+# The E3SM ocean fraction, loaded once by _get_ocean_frac().
+_OCEAN_FRAC: Dict[str, np.ndarray] = {}
+
+# The units of the IBTrACS time variable, days since 1858-11-17 00:00:00.
+IBTRACS_TIME_ORIGIN = np.datetime64("1858-11-17T00:00:00", "us")
+
 
 def run_diag(parameter: "CoreParameter") -> "CoreParameter":
     """Runs the tropical cyclone analysis diagnostic.
@@ -89,7 +111,9 @@ def run_diag(parameter: "CoreParameter") -> "CoreParameter":
     test_data = collections.OrderedDict()
     ref_data = collections.OrderedDict()
 
-    test_data["metrics"] = generate_tc_metrics_from_te_stitch_file(test_te_file)
+    test_data["metrics"] = generate_tc_metrics_from_te_stitch_file(
+        test_te_file, parameter.te_stitch_cache
+    )
     test_data["cyclone_density"] = test_cyclones_hist
     test_data["aew_density"] = test_aew_hist
     test_num_years = int(test_end_yr) - int(test_start_yr) + 1
@@ -117,7 +141,9 @@ def run_diag(parameter: "CoreParameter") -> "CoreParameter":
             "aew_hist_{}_{}_{}.nc".format(ref_name, ref_start_yr, ref_end_yr),
         )
         ref_aew_hist = cdms2.open(ref_aew_file)("density", squeeze=1)
-        ref_data["metrics"] = generate_tc_metrics_from_te_stitch_file(ref_te_file)
+        ref_data["metrics"] = generate_tc_metrics_from_te_stitch_file(
+            ref_te_file, parameter.te_stitch_cache
+        )
         ref_data["cyclone_density"] = ref_cyclones_hist
         ref_data["aew_density"] = ref_aew_hist
         ref_num_years = int(ref_end_yr) - int(ref_start_yr) + 1
@@ -152,11 +178,16 @@ def run_diag(parameter: "CoreParameter") -> "CoreParameter":
     return parameter
 
 
-def generate_tc_metrics_from_te_stitch_file(te_stitch_file: str) -> Dict[str, Any]:
+def generate_tc_metrics_from_te_stitch_file(
+    te_stitch_file: str, use_cache: bool = False
+) -> Dict[str, Any]:
     """Generates tropical cyclone metrics from TE stitch file.
 
     :param te_stitch_file: TE stitch file path
     :type te_stitch_file: str
+    :param use_cache: Load and save the parsed TE stitch file as a .npz file
+        next to it, defaults to False
+    :type use_cache: bool, optional
     :return: Tropical cyclone metrics
     :rtype: Dict[str, Any]
 
@@ -164,30 +195,15 @@ def generate_tc_metrics_from_te_stitch_file(te_stitch_file: str) -> Dict[str, An
     """
     logger.info("\nGenerating TC Metrics from TE Stitch Files")
     logger.info("============================================")
-    with open(te_stitch_file) as f:
-        lines = f.readlines()
-
-    # Calculate number of storms and max length
-    num_storms, max_len = _calc_num_storms_and_max_len(lines)
-    # Parse variables from TE stitch file
-    te_stitch_vars = _get_vars_from_te_stitch(lines, max_len, num_storms)
-
-    # Use E3SM land-sea mask
-    mask_path = os.path.join(e3sm_diags.INSTALL_PATH, "acme_ne30_ocean_land_mask.nc")
-    ocnfrac = cdms2.open(mask_path)("OCNFRAC", squeeze=1)
+    te_stitch_vars = read_te_stitch_file(te_stitch_file, use_cache)
 
     # From model data, this dict stores a tuple for each basin.
     # (mean ace, tc_intensity_dist, seasonal_cycle, # storms, # of storms over the ocean)
     result_mod: Dict[str, Any] = {}
     result_mod["num_years"] = te_stitch_vars["num_years"]
 
-    for basin, basin_info in BASIN_DICT.items():
-        mod_vars = _derive_metrics_per_basin(
-            num_storms,
-            te_stitch_vars,
-            ocnfrac,
-            basin_info,
-        )
+    mod_vars_per_basin = _derive_metrics_per_basin(te_stitch_vars)
+    for basin, mod_vars in mod_vars_per_basin.items():
 
         pdf_mod_intensity = _calc_ts_intensity_dist(mod_vars["mod_wnd"])
         pdf_mod_seasonal_cycle = _calc_seasonal_cycle(mod_vars["mod_mon"])
@@ -205,160 +221,333 @@ def generate_tc_metrics_from_te_stitch_file(te_stitch_file: str) -> Dict[str, An
     return result_mod
 
 
-def _calc_num_storms_and_max_len(lines: List[str]) -> Tuple[int, int]:
-    """Calculate number of storms and max length using lines from a TE stitch file.
+def read_te_stitch_file(te_stitch_file: str, use_cache: bool = False) -> Dict[str, Any]:
+    """Reads the TC tracks of a TE stitch file into flat arrays.
 
-    :param lines: Lines from TE stitch file
-    :type lines: List[str]
-    :return: Number of storms and max storm length
-    :rtype: Tuple[int, int]
+    The points of all the TC tracks are stored one after the other in flat
+    arrays, with the points of storm k from offsets[k] to offsets[k + 1].
+    Unlike (max_len, num_storms) arrays padded with NaNs, the size of the arrays
+    is the number of points, so long simulations with a few long storms don't
+    use more memory than needed.
+
+    :param te_stitch_file: TE stitch file path
+    :type te_stitch_file: str
+    :param use_cache: Load the variables from "<te_stitch_file>.npz" if it was
+        saved from the current TE stitch file, otherwise save them to it,
+        defaults to False
+    :type use_cache: bool, optional
+    :return: Dictionary of variables from TE stitch file
+    :rtype: Dict[str, Any]
     """
-    num_storms = 0
-    max_len = 0
+    cache_path = f"{te_stitch_file}.npz"
+    source = _get_te_stitch_source(te_stitch_file)
+
+    vars_dict = _load_te_stitch_cache(cache_path, source) if use_cache else None
+    if vars_dict is None:
+        vars_dict = _parse_te_stitch_file(te_stitch_file)
+        if use_cache:
+            _save_te_stitch_cache(cache_path, source, vars_dict)
 
-    for line in lines:
-        if line[0] == "s":
-            num_storms = num_storms + 1
-            num_points = 0
-        else:
-            num_points = num_points + 1
-            max_len = max(max_len, num_points)
+    logger.info(f"Number of storms: {vars_dict['num_storms']}")
+    logger.info(
+        f"TE Start Year: {vars_dict['year_start']}, TE End Year: {vars_dict['year_end']}, Total Years: {vars_dict['num_years']}"
+    )
 
-    logger.info(f"Number of storms: {num_storms}")
-    logger.info(f"Max length of storms: {max_len}")
-    return num_storms, max_len
+    return vars_dict
 
 
-def _get_vars_from_te_stitch(
-    lines: List[str], max_len: int, num_storms: int
-) -> Dict[str, Any]:
-    """Extracts variables from lines of a TE stitch file.
-
-    :param lines: Lines from a TE stitch file
-    :type lines: List[str]
-    :param max_len: Max length of storms
-    :type max_len: int
-    :param num_storms: Number of storms
-    :type num_storms: int
+def _parse_te_stitch_file(te_stitch_file: str) -> Dict[str, Any]:
+    """Parses a TE stitch file into flat arrays and storm offsets.
+
+    The file is parsed in chunks of lines, and the lines of the TC tracks of
+    each chunk are converted to numbers at once by np.loadtxt.
+
+    :param te_stitch_file: TE stitch file path
+    :type te_stitch_file: str
+    :raises ValueError: If the file doesn't start with a storm or is empty
     :return: Dictionary of variables from TE stitch file
     :rtype: Dict[str, Any]
     """
-    keys = ("longmc", "latmc", "vsmc", "yearmc", "monthmc")
-    vars_dict = {k: np.empty((max_len, num_storms)) * np.nan for k in keys}
-
-    index = 0
-    year_start = int(lines[0].split("\t")[2])
-    year_end = year_start
-
-    for line in lines:
-        line_split = line.split("\t")
-        if line[0] == "s":
-            index = index + 1
-            year = int(line_split[2])
-            year_end = max(year, year_start)
-            k = 0
-        else:
-            k = k + 1
-            vars_dict["longmc"][k - 1, index - 1] = float(line_split[2])
-            vars_dict["latmc"][k - 1, index - 1] = float(line_split[3])
-            # Convert wind speed from units m/s to knot by multiplying 1.94
-            vars_dict["vsmc"][k - 1, index - 1] = float(line_split[5]) * 1.94
-            vars_dict["yearmc"][k - 1, index - 1] = float(line_split[6])
-            vars_dict["monthmc"][k - 1, index - 1] = float(line_split[7])
-
-    vars_dict["year_start"] = year_start
-    vars_dict["year_end"] = year_end
-    vars_dict["num_years"] = year_end - year_start + 1
-    logger.info(
-        f"TE Start Year: {vars_dict['year_start']}, TE End Year: {vars_dict['year_end']}, Total Years: {vars_dict['num_years']}"
-    )
+    columns: Dict[str, List[np.ndarray]] = {k: [] for k in TE_STITCH_COLUMNS}
+    storm_years: List[int] = []
+    storm_lines: List[np.ndarray] = []
+    num_lines = 0
+
+    with open(te_stitch_file) as f:
+        while True:
+            lines = [
+                line
+                for line in itertools.islice(f, TE_STITCH_CHUNK_LINES)
+                if line.strip()
+            ]
+            if not lines:
+                break
+
+            is_storm = np.array([line[0] == "s" for line in lines])
+            if num_lines == 0 and not is_storm[0]:
+                raise ValueError(f"{te_stitch_file} doesn't start with a storm.")
+
+            storm_lines.append(np.flatnonzero(is_storm) + num_lines)
+            storm_years.extend(
+                int(line.split("\t")[2]) for line in itertools.compress(lines, is_storm)
+            )
+
+            points = list(itertools.compress(lines, ~is_storm))
+            if points:
+                data = np.loadtxt(
+                    points,
+                    delimiter="\t",
+                    usecols=list(TE_STITCH_COLUMNS.values()),
+                    ndmin=2,
+                )
+                for i, key in enumerate(TE_STITCH_COLUMNS):
+                    columns[key].append(data[:, i])
+
+            num_lines += len(lines)
+
+    if num_lines == 0:
+        raise ValueError(f"{te_stitch_file} doesn't have any storms.")
+
+    # The number of points of each storm is the number of lines until the next one.
+    storm_index = np.concatenate(storm_lines + [np.array([num_lines])])
+    num_points = np.diff(storm_index) - 1
+
+    vars_dict: Dict[str, Any] = {
+        k: np.concatenate(v) if v else np.empty(0) for k, v in columns.items()
+    }
+    # Convert wind speed from units m/s to knot by multiplying 1.94
+    vars_dict["vsmc"] = vars_dict["vsmc"] * 1.94
+    vars_dict["offsets"] = np.concatenate([[0], np.cumsum(num_points)])
+    vars_dict["num_storms"] = len(storm_years)
+    vars_dict["max_len"] = int(num_points.max())
+
+    # The end year is the year of the last storm, as long as it isn't before the
+    # year of the first storm.
+    vars_dict["year_start"] = storm_years[0]
+    vars_dict["year_end"] = max(storm_years[-1], storm_years[0])
+    vars_dict["num_years"] = vars_dict["year_end"] - vars_dict["year_start"] + 1
 
     return vars_dict
 
 
-def _derive_metrics_per_basin(
-    num_storms: int,
-    vars: Dict[str, Any],
-    ocnfrac: cdms2.dataset.DatasetVariable,
-    basin_info: BasinInfo,
-) -> Dict[str, Any]:
+def _get_te_stitch_source(te_stitch_file: str) -> np.ndarray:
+    """Gets the cache version, size and modification time of a TE stitch file.
+
+    A cache file is only used if it was saved from a file with the same ones.
+    """
+    stat = os.stat(te_stitch_file)
+
+    return np.array([TE_STITCH_CACHE_VERSION, stat.st_size, stat.st_mtime_ns])
+
+
+def _load_te_stitch_cache(
+    cache_path: str, source: np.ndarray
+) -> Optional[Dict[str, Any]]:
+    """Loads the TE stitch variables from a cache file.
+
+    :param cache_path: Cache file path
+    :type cache_path: str
+    :param source: The source of the TE stitch file, from _get_te_stitch_source()
+    :type source: np.ndarray
+    :return: Dictionary of variables from TE stitch file, or None if the cache
+        file doesn't exist, can't be read or is for another TE stitch file
+    :rtype: Optional[Dict[str, Any]]
+    """
+    if not os.path.exists(cache_path):
+        return None
+
+    try:
+        with np.load(cache_path) as data:
+            if not np.array_equal(data["source"], source):
+                logger.info(f"Ignoring the outdated TE stitch cache {cache_path}.")
+                return None
+
+            vars_dict = {k: data[k] for k in data.files if k != "source"}
+    except (OSError, ValueError, KeyError):
+        logger.warning(f"Could not load the TE stitch cache {cache_path}.")
+        return None
+
+    for key in ["num_storms", "max_len", "year_start", "year_end", "num_years"]:
+        vars_dict[key] = int(vars_dict[key])
+
+    logger.info(f"Loaded the TE stitch cache {cache_path}.")
+
+    return vars_dict
+
+
+def _save_te_stitch_cache(
+    cache_path: str, source: np.ndarray, vars_dict: Dict[str, Any]
+):
+    """Saves the TE stitch variables to a cache file.
+
+    The file is written to a temporary file first, so other processes never load
+    a partially written file.
+    """
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(cache_path)), suffix=".npz"
+        )
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, source=source, **vars_dict)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        logger.warning(f"Could not save the TE stitch cache to {cache_path}.")
+
+
+def _derive_metrics_per_basin(vars: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
     """Derives metrics for each basin using TE stitch variables and other information.
 
-    :param num_storms: Number of storms
-    :type num_storms: int
-    :param vars: TE stitch variables
+    The storms are assigned to the basins and the land-sea mask is looked up
+    for all the storms at once, instead of once per storm and basin.
+
+    :param vars: TE stitch variables, from read_te_stitch_file()
     :type vars: Dict[str, Any]
-    :param ocnfrac: Ocnfrac CDMS2 dataset variable
-    :type ocnfrac: cdms2.dataset.DatasetVariable
-    :param basin_info: Basin information
-    :type basin_info: BasinInfo
-    :return: A dictionary containing mod variables
-    :rtype: Dist[str, Any]
+    :return: A dictionary containing mod variables for each basin
+    :rtype: Dict[str, Dict[str, Any]]
 
-    # TODO: Add tests to cover this function
     # TODO: Refactor this function to avoid using mod vars and dict separately
     """
-    mod_mon = []
-    mod_wnd = []
-    mod_num = 0
-    mod_num_ocn = 0
+    vsmc = vars["vsmc"]
+    offsets = vars["offsets"]
+
+    # The first point of each TC track. Storms without any points (NaN) aren't
+    # in any basin.
+    has_points = np.diff(offsets) > 0
+    first = np.where(has_points, offsets[:-1], 0)
+    lat_0 = np.where(has_points, vars["latmc"][first], np.nan)
+    lon_0 = np.where(has_points, vars["longmc"][first], np.nan)
+    mon_0 = np.where(has_points, vars["monthmc"][first], np.nan)
+    year_0 = np.where(has_points, vars["yearmc"][first], np.nan)
+
+    # The max wind and ACE of each TC track, reduced over the points of each
+    # storm.
+    max_wind = np.full(has_points.shape, -np.inf)
+    ace = np.zeros(has_points.shape)
+    if vsmc.size:
+        starts = offsets[:-1][has_points]
+        max_wind[has_points] = np.maximum.reduceat(vsmc, starts)
+        ace[has_points] = (
+            np.add.reduceat(np.where(vsmc > 35, vsmc**2, 0), starts) / 1e4
+        )
 
-    years = np.asarray(np.arange(vars["year_start"], vars["year_end"] + 1))
-    mod_ace = np.zeros((np.size(years)))
+    # Use the E3SM land-sea mask at the nearest location to the first point of
+    # a TC Track
+    over_ocean = get_ocean_frac_at(lat_0, lon_0) > 0
 
-    latmc = vars["latmc"]
-    longmc = vars["longmc"]
-    vsmc = vars["vsmc"]
-    monthmc = vars["monthmc"]
-    yearmc = vars["yearmc"]
-
-    for k in range(0, num_storms):
-        if (
-            latmc[0, k] > basin_info[3]
-            and latmc[0, k] < basin_info[4]
-            and longmc[0, k] > basin_info[1]
-            and longmc[0, k] < basin_info[2]
-        ):
-            mod_num = mod_num + 1
-
-        lat = latmc[:, k][~np.isnan(latmc[:, k])]
-        lon = longmc[:, k][~np.isnan(latmc[:, k])]
-        wind = vsmc[:, k][~np.isnan(latmc[:, k])]
-        mon = monthmc[:, k][~np.isnan(latmc[:, k])]
-        yer = yearmc[:, k][~np.isnan(latmc[:, k])]
-
-        # Get the nearest location on land-sea mask to the first point of a TC Track
-        p = np.abs(ocnfrac.getLatitude()[:] - lat[0])
-        loc_y = int(np.argmin(p))
-        p = np.abs(ocnfrac.getLongitude()[:] - lon[0])
-        loc_x = int(np.argmin(p))
-        ocn_frac_0 = ocnfrac[loc_y, loc_x]
-
-        if (
-            ocn_frac_0 > 0
-            and lon[0] > basin_info[1]
-            and lon[0] < basin_info[2]
-            and lat[0] > basin_info[3]
-            and lat[0] < basin_info[4]
-        ):
-
-            mod_num_ocn = mod_num_ocn + 1
-            mod_mon.append(mon[0])
-            mod_wnd.append(np.max(wind))
-
-            wind_new = wind[wind > 35]
-            mod_ace[np.where(years - yer[0] == 0)] = (
-                mod_ace[np.where(years - yer[0] == 0)] + np.sum(wind_new**2) / 1e4
-            )
+    years = np.arange(vars["year_start"], vars["year_end"] + 1)
+    in_years = np.isin(year_0, years)
+    year_index = np.where(in_years, year_0 - vars["year_start"], 0).astype(int)
 
-    mod_vars = {
-        "mod_mon": mod_mon,
-        "mod_wnd": mod_wnd,
-        "mod_num": mod_num,
-        "mod_num_ocn": mod_num_ocn,
-        "mod_ace_mean": np.mean(mod_ace),
-    }
-    return mod_vars
+    mod_vars_per_basin = {}
+    for basin, basin_info in BASIN_DICT.items():
+        in_basin = (
+            (lat_0 > basin_info[3])
+            & (lat_0 < basin_info[4])
+            & (lon_0 > basin_info[1])
+            & (lon_0 < basin_info[2])
+        )
+        in_basin_ocn = in_basin & over_ocean
+
+        mod_ace = np.bincount(
+            year_index[in_basin_ocn & in_years],
+            weights=ace[in_basin_ocn & in_years],
+            minlength=years.size,
+        )
+
+        mod_vars_per_basin[basin] = {
+            "mod_mon": mon_0[in_basin_ocn],
+            "mod_wnd": max_wind[in_basin_ocn],
+            "mod_num": int(np.count_nonzero(in_basin)),
+            "mod_num_ocn": int(np.count_nonzero(in_basin_ocn)),
+            "mod_ace_mean": np.mean(mod_ace),
+        }
+
+    return mod_vars_per_basin
+
+
+def get_ocean_frac_at(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Gets the E3SM ocean fraction at the nearest location to each point.
+
+    :param lat: Latitudes of the points
+    :type lat: np.ndarray
+    :param lon: Longitudes of the points
+    :type lon: np.ndarray
+    :return: Ocean fraction at each point, 0 where it's missing
+    :rtype: np.ndarray
+    """
+    ocean_frac = _get_ocean_frac()
+    loc_y = _nearest_index(ocean_frac["lat"], lat, ocean_frac["lat_order"])
+    loc_x = _nearest_index(ocean_frac["lon"], lon, ocean_frac["lon_order"])
+
+    return ocean_frac["ocnfrac"][loc_y, loc_x]
+
+
+def _get_ocean_frac() -> Dict[str, np.ndarray]:
+    """Gets the E3SM ocean fraction and its axes as arrays.
+
+    The mask file is only read once, and shared with the other sets by
+    utils.general.get_default_land_ocean_frac(). The sort order of the axes
+    for _nearest_index() is also computed once.
+
+    :return: The ocean fraction ("ocnfrac"), its axes ("lat" and "lon") and
+        their sort order ("lat_order" and "lon_order")
+    :rtype: Dict[str, np.ndarray]
+    """
+    if not _OCEAN_FRAC:
+        _, ocnfrac = utils.general.get_default_land_ocean_frac()
+        ocnfrac = ocnfrac(squeeze=1)
+
+        _OCEAN_FRAC["ocnfrac"] = np.ma.filled(ocnfrac, 0).astype(np.float64)
+        for name, axis in [
+            ("lat", ocnfrac.getLatitude()),
+            ("lon", ocnfrac.getLongitude()),
+        ]:
+            _OCEAN_FRAC[name] = np.asarray(axis[:], dtype=np.float64)
+            _OCEAN_FRAC[f"{name}_order"] = np.argsort(_OCEAN_FRAC[name], kind="stable")
+
+    return _OCEAN_FRAC
+
+
+def _nearest_index(
+    axis: np.ndarray, values: np.ndarray, order: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Finds the index of the nearest axis value to each value.
+
+    If two axis values are equally near, the one with the lowest index is
+    used, as with np.argmin(np.abs(axis - value)).
+
+    :param axis: Axis values
+    :type axis: np.ndarray
+    :param values: Values to find the nearest axis values of
+    :type values: np.ndarray
+    :param order: The indices that sort the axis, to avoid sorting it again,
+        defaults to None
+    :type order: Optional[np.ndarray], optional
+    :return: Indices of the nearest axis values
+    :rtype: np.ndarray
+    """
+    axis = np.asarray(axis, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if axis.size == 1:
+        return np.zeros(values.shape, dtype=int)
+
+    if order is None:
+        order = np.argsort(axis, kind="stable")
+    sorted_axis = axis[order]
+
+    right = np.clip(np.searchsorted(sorted_axis, values), 1, axis.size - 1)
+    left = right - 1
+    dist_left = np.abs(values - sorted_axis[left])
+    dist_right = np.abs(sorted_axis[right] - values)
+
+    index_left = order[left]
+    index_right = order[right]
+
+    return np.where(
+        dist_left == dist_right,
+        np.minimum(index_left, index_right),
+        np.where(dist_left < dist_right, index_left, index_right),
+    )
 
 
 def generate_tc_metrics_from_obs_files(reference_data_path: str) -> Dict[str, Any]:
@@ -424,18 +613,22 @@ def _get_monthmc_yearic(time: "MaskedArray") -> Tuple[np.ndarray, np.ndarray]:
     :return: Arrays for the months and years based on the day of a hurricane
     :rtype: Tuple[np.ndarray, np.ndarray]
     """
-    monthmc = np.zeros(time.shape)
-    yearic = np.zeros(time.shape[0])
+    time = np.ma.asarray(time)
+    is_valid = ~np.ma.getmaskarray(time)
 
-    # The units attribute of the time variable
-    days_since = datetime(1858, 11, 17, 0, 0, 0)
+    # Convert all the days to dates at once, with microsecond precision.
+    microseconds = np.round(np.ma.filled(time, 0) * 86400e6).astype(np.int64)
+    dates = IBTRACS_TIME_ORIGIN + microseconds.astype("timedelta64[us]")
+    years = dates.astype("datetime64[Y]").astype(int) + 1970
+    months = dates.astype("datetime64[M]").astype(int) % 12 + 1
 
-    for i in range(0, time.shape[0]):
-        for j in range(0, time.shape[1]):
-            if time[i, j] is not np.ma.masked:
-                day_hurr = days_since + timedelta(time[i, j])
-                monthmc[i, j] = day_hurr.month
-                yearic[i] = day_hurr.year
+    monthmc = np.where(is_valid, months, 0).astype(np.float64)
+
+    # The year of the last valid data point of each row.
+    has_valid = is_valid.any(axis=1)
+    last = time.shape[1] - 1 - np.argmax(is_valid[:, ::-1], axis=1)
+    last_years = np.take_along_axis(years, last[:, np.newaxis], axis=1)[:, 0]
+    yearic = np.where(has_valid, last_years, 0).astype(np.float64)
 
     return monthmc, yearic
 
@@ -448,6 +641,8 @@ def _get_mon_wind(
 ) -> Tuple[List[int], List[int]]:
     """Extracts the months and max wind speeds.
 
+    The max wind speed of a row without any wind speeds is NaN.
+
     :param vsmc: Maximum sustained wind speed from official WMO agency.
     :type vsmc: MaskedArray
     :param monthmc: Months
@@ -459,13 +654,11 @@ def _get_mon_wind(
     :return: Array of months and max wind speeds
     :rtype: Tuple[List[int], List[int]]
     """
-    mon = []
-    wnd = []
+    rows = (OBS_START_YR <= yearic[:num_rows]) & (yearic[:num_rows] <= OBS_END_YR)
 
-    for i in range(0, num_rows):
-        if OBS_START_YR <= yearic[i] <= OBS_END_YR:
-            mon.append(monthmc[i, 0])
-            wnd.append(np.max(vsmc[i, :]))
+    mon = monthmc[:num_rows][rows, 0].tolist()
+    wnd = np.ma.asarray(vsmc[:num_rows][rows]).max(axis=1)
+    wnd = np.ma.filled(wnd.astype(np.float64), np.nan).tolist()
 
     return mon, wnd
 
@@ -483,14 +676,20 @@ def _calc_mean_ace(vsmc: "MaskedArray", yearic: np.ndarray, num_rows: int) -> fl
     :rtype: float
     """
     num_years = OBS_YEARS.size
-    ace = np.zeros(num_years)
-
-    for i in range(0, num_years):
-        for j in range(0, num_rows):
-            if yearic[j] == OBS_YEARS[i]:
-                wind = vsmc[j, :]
-                wind_ts = wind[wind >= 35]
-                ace[i] = ace[i] + np.sum(wind_ts**2) / 1e4
+    vsmc = np.ma.asarray(vsmc[:num_rows])
+    yearic = yearic[:num_rows]
+
+    # The ace of each row, from its wind speeds of at least 35 knots.
+    wind = np.ma.filled(vsmc.astype(np.float64), 0)
+    wind_ts = np.where(wind >= 35, wind, 0)
+    ace_per_row = np.sum(wind_ts**2, axis=1) / 1e4
+
+    rows = np.isin(yearic, OBS_YEARS)
+    ace = np.bincount(
+        (yearic[rows] - OBS_START_YR).astype(int),
+        weights=ace_per_row[rows],
+        minlength=num_years,
+    )
 
     return np.mean(ace)
 
@@ -498,31 +697,27 @@ def _calc_mean_ace(vsmc: "MaskedArray", yearic: np.ndarray, num_rows: int) -> fl
 def _calc_ts_intensity_dist(wind_speeds: List[int]) -> np.ndarray:
     """Calculate TC intensity distribution based on wind speed.
 
+    Wind speeds of at most 34 knots, between 112 and 113 knots, or that are
+    missing (NaN) aren't in any category.
+
     :param wind_speeds: Wind speeds
     :type wind_speeds: List[int]
     :return: Number of storms in each hurricane category (tc intensity distribution)
     :rtype: np.ndarray
     """
     num_categories = 6
-    dist = np.zeros(num_categories)
-
-    for speed in wind_speeds:
-        if speed <= 34:
-            continue
-        elif speed > 34 and speed <= 63:
-            dist[0] = dist[0] + 1
-        elif speed > 63 and speed <= 82:
-            dist[1] = dist[1] + 1
-        elif speed > 82 and speed <= 95:
-            dist[2] = dist[2] + 1
-        elif speed > 95 and speed <= 112:
-            dist[3] = dist[3] + 1
-        elif speed > 113 and speed <= 136:
-            dist[4] = dist[4] + 1
-        elif speed > 136:
-            dist[5] = dist[5] + 1
-
-    return dist
+    speeds = np.asarray(wind_speeds, dtype=np.float64)
+
+    # The first category with an upper bound of at least the speed.
+    category = np.searchsorted(INTENSITY_UPPER_BOUNDS, speeds, side="left")
+    with np.errstate(invalid="ignore"):
+        is_valid = (speeds > TS_LOWER_BOUND) & ~(
+            (speeds > INTENSITY_UPPER_BOUNDS[3]) & (speeds <= CAT4_LOWER_BOUND)
+        )
+
+    dist = np.bincount(category[is_valid], minlength=num_categories)
+
+    return dist.astype(np.float64)
 
 
 def _calc_seasonal_cycle(mon: List[int]) -> np.ndarray:
@@ -533,9 +728,9 @@ def _calc_seasonal_cycle(mon: List[int]) -> np.ndarray:
     :return: Seasonal cycle
     :rtype: np.ndarray
     """
-    seasonal_cycle = np.zeros(12)
-    for i in range(0, len(mon)):
-        k = int(mon[i])
-        seasonal_cycle[k - 1] = seasonal_cycle[k - 1] + 1
+    # A month of 0 (no data) is counted in December, as it was when the months
+    # indexed the seasonal cycle directly.
+    months = np.asarray(mon, dtype=np.float64).astype(int)
+    seasonal_cycle = np.bincount((months - 1) % 12, minlength=12).astype(np.float64)
 
     return seasonal_cycle / np.sum(seasonal_cycle)
@@ -1 +1,9 @@
-from . import dataset, diurnal_cycle, general
+from . import (
+    dataset,
+    diurnal_cycle,
+    file_catalog,
+    general,
+    incremental,
+    regrid,
+    vertical,
+)
@@ -1,33 +1,67 @@
+import weakref
+from typing import Dict, Tuple
+
 import cdms2
 import numpy as np
 import numpy.ma as ma
 
+# The months (Jan to Dec) included in each season.
+SEASON_IDX = {
+    "01": [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    "02": [0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    "03": [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    "04": [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+    "05": [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0],
+    "06": [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0],
+    "07": [0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    "08": [0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
+    "09": [0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0],
+    "10": [0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0],
+    "11": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0],
+    "12": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+    "DJF": [1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+    "MAM": [0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0],
+    "JJA": [0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0],
+    "SON": [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0],
+    "ANN": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+}
+
+# The seasons computed for the cycles.
+CYCLES = {
+    "ANNUALCYCLE": [
+        "01",
+        "02",
+        "03",
+        "04",
+        "05",
+        "06",
+        "07",
+        "08",
+        "09",
+        "10",
+        "11",
+        "12",
+    ],
+    "SEASONALCYCLE": ["DJF", "MAM", "JJA", "SON"],
+}
+
+# The bounds-weighted monthly sums of each variable that climo() was ran on,
+# keyed by the id() of the variable. An entry is removed when its variable is
+# garbage collected, so an id is never reused by another variable while its
+# entry is in the cache.
+_MONTHLY_ACCUMULATORS: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
 
 def climo(var, season):
     """
     Compute the climatology for var for the given season.
     The returned variable must be 2 dimensional.
-    """
-    season_idx = {
-        "01": [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        "02": [0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        "03": [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        "04": [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
-        "05": [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0],
-        "06": [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-        "07": [0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
-        "08": [0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-        "09": [0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0],
-        "10": [0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0],
-        "11": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0],
-        "12": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-        "DJF": [1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-        "MAM": [0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0],
-        "JJA": [0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0],
-        "SON": [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0],
-        "ANN": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-    }
 
+    The time axis of var is reduced once into bounds-weighted sums for each of
+    the 12 months, which are cached for var. The climatology of any season is
+    then derived from those monthly sums, so calling this function on the same
+    variable for other seasons doesn't traverse the data again.
+    """
     # Redefine time to be in the middle of the time interval
     var_time = var.getTime()
     if var_time is None:
@@ -36,47 +70,136 @@ def climo(var, season):
 
     tbounds = var_time.getBounds()
     var_time[:] = 0.5 * (tbounds[:, 0] + tbounds[:, 1])
-    var_time_absolute = var_time.asComponentTime()
 
+    monthly_sums, monthly_weights = _get_monthly_accumulators(var, var_time, tbounds)
+
+    return climo_from_monthly_sums(monthly_sums, monthly_weights, season, var)
+
+
+def climo_from_monthly_sums(monthly_sums, monthly_weights, season, var):
+    """
+    Compute the climatology for the given season from the bounds-weighted
+    monthly sums of var and the sums of the weights.
+
+    var is only used for the grid, axes and attributes of the climatology,
+    so it can be any part of the timeseries the sums were computed for.
+    """
+    cycle = CYCLES.get(season, [season])
+    climo = ma.zeros([len(cycle)] + list(monthly_sums.shape)[1:])
+    for n, cycle_season in enumerate(cycle):
+        climo[n] = _season_mean(monthly_sums, monthly_weights, cycle_season)
+
+    return _create_climo_variable(climo, var)
+
+
+def accumulate_months(var) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the bounds-weighted sums of var for each month, along with the
+    sums of the weights.
+
+    The sums of consecutive parts of a timeseries add up to the sums of the
+    whole timeseries, so they can be accumulated over chunks of it.
+    """
+    var_time = var.getTime()
+    tbounds = var_time.getBounds()
+    var_time[:] = 0.5 * (tbounds[:, 0] + tbounds[:, 1])
+
+    return _accumulate_months(var.asma(), *_get_months_and_lengths(var_time, tbounds))
+
+
+def _get_monthly_accumulators(var, var_time, tbounds) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the bounds-weighted sums of var for each month, along with the sums of
+    the weights, computing them if they're not cached for var yet.
+
+    Both arrays have the shape (12, ...), where ... is the shape of var
+    without the time axis. Masked values don't contribute to either sum.
+    """
+    key = id(var)
+    if key in _MONTHLY_ACCUMULATORS:
+        return _MONTHLY_ACCUMULATORS[key]
+
+    accumulators = _accumulate_months(
+        var.asma(), *_get_months_and_lengths(var_time, tbounds)
+    )
+
+    try:
+        weakref.finalize(var, _MONTHLY_ACCUMULATORS.pop, key, None)
+    except TypeError:
+        # The variable doesn't support weak references, so it can't be cached.
+        return accumulators
+
+    _MONTHLY_ACCUMULATORS[key] = accumulators
+
+    return accumulators
+
+
+def _get_months_and_lengths(var_time, tbounds) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the month (0 to 11) and the length of each timestep."""
+    # Decode the time axis once into the month of each timestep.
+    months = np.array([t.month - 1 for t in var_time.asComponentTime()], dtype=np.intp)
     # Compute time length
-    dt = tbounds[:, 1] - tbounds[:, 0]
-
-    # Convert to masked array
-    v = var.asma()
-
-    # Compute climatology
-    if season == "ANNUALCYCLE":
-        cycle = [
-            "01",
-            "02",
-            "03",
-            "04",
-            "05",
-            "06",
-            "07",
-            "08",
-            "09",
-            "10",
-            "11",
-            "12",
-        ]
-    elif season == "SEASONALCYCLE":
-        cycle = ["DJF", "MAM", "JJA", "SON"]
-    else:
-        cycle = [season]
-
-    ncycle = len(cycle)
-    climo = ma.zeros([ncycle] + list(np.shape(v))[1:])
-    for n in range(ncycle):
-        idx = np.array(
-            [
-                season_idx[cycle[n]][var_time_absolute[i].month - 1]
-                for i in range(len(var_time_absolute))
-            ],
-            dtype=np.int,
-        ).nonzero()
-        climo[n] = ma.average(v[idx], axis=0, weights=dt[idx])
+    dt = np.asarray(tbounds[:, 1] - tbounds[:, 0], dtype=np.float64)
+
+    return months, dt
+
+
+def _accumulate_months(
+    v: ma.MaskedArray, months: np.ndarray, dt: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the weighted sums of v for each month.
+
+    The timesteps of each month are summed with their weights by a single dot
+    product, so the temporary arrays are the size of a month of the data
+    rather than of the whole data.
+    """
+    shape = (12,) + v.shape[1:]
+    data = ma.getdata(v).reshape(v.shape[0], -1)
+    mask = ma.getmask(v)
+    if mask is not ma.nomask:
+        mask = mask.reshape(v.shape[0], -1)
 
+    monthly_sums = np.zeros((12, data.shape[1]))
+    monthly_weights = np.zeros((12, data.shape[1]))
+    for month in np.unique(months):
+        in_month = months == month
+        month_dt = dt[in_month]
+        month_data = data[in_month]
+        if mask is ma.nomask:
+            monthly_sums[month] = month_dt @ month_data
+            monthly_weights[month] = month_dt.sum()
+        else:
+            month_valid = ~mask[in_month]
+            monthly_sums[month] = month_dt @ np.where(month_valid, month_data, 0.0)
+            monthly_weights[month] = month_dt @ month_valid
+
+    return monthly_sums.reshape(shape), monthly_weights.reshape(shape)
+
+
+def _season_mean(
+    monthly_sums: np.ndarray, monthly_weights: np.ndarray, season: str
+) -> ma.MaskedArray:
+    """
+    Combine the monthly sums into the weighted mean for the season.
+    Points without any valid timesteps in the season are masked.
+    """
+    in_season = np.array(SEASON_IDX[season], dtype=bool)
+
+    total = monthly_sums[in_season].sum(axis=0)
+    total_weight = monthly_weights[in_season].sum(axis=0)
+
+    no_data = total_weight == 0
+    mean = total / np.where(no_data, 1.0, total_weight)
+
+    return ma.masked_where(no_data, mean)
+
+
+def _create_climo_variable(climo, var):
+    """
+    Create the climatology variable from the climo array, with the grid,
+    axes and attributes of var.
+    """
     trans_var = cdms2.createVariable(climo)(squeeze=1)
     # Losing the grid after a squeeze is normal, we need to set it again.
     trans_var.setGrid(var.getGrid())
@@ -4,17 +4,114 @@ This data can either be climatology files or timeseries files.
 Derived variables are also supported.
 """
 import collections
+import copy
 import fnmatch
-import glob
 import os
-import re
 
 import cdms2
+import numpy.ma as ma
 
 import e3sm_diags.derivations.acme
 from e3sm_diags.driver import utils
 
-from . import climo
+from . import climo, file_catalog
+
+# The default size of the variable cache, in bytes.
+VARIABLE_CACHE_MAX_BYTES = 1024**3
+
+
+class VariableCache:
+    """
+    A least recently used cache of the variables read by Dataset, bounded by
+    the total size of the cached data.
+
+    The same variables are read again and again during a run, e.g. by every
+    set for the same season or for the pressure levels of each 3D variable.
+    The cache is shared by all Datasets of a process. The cache keeps the
+    variables it's given, and copies of them are returned, so the callers can
+    modify them.
+    """
+
+    def __init__(self, max_bytes=VARIABLE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        """
+        Get copies of the variables cached for key, or None if they're not
+        in the cache.
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        variables, _ = self._entries[key]
+
+        return copy.deepcopy(variables)
+
+    def put(self, key, variables):
+        """
+        Cache the variables for key, evicting the least recently used entries
+        to stay within max_bytes. Variables larger than max_bytes aren't
+        cached.
+
+        The variables aren't copied, so they must not be modified once they're
+        cached. Returns whether they're cached.
+        """
+        nbytes = sum(_get_nbytes(v) for v in variables)
+        if nbytes > self.max_bytes:
+            return False
+
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+
+        while self._entries and self.nbytes + nbytes > self.max_bytes:
+            _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= evicted_nbytes
+            self.evictions += 1
+
+        self._entries[key] = (variables, nbytes)
+        self.nbytes += nbytes
+
+        return True
+
+    def clear(self):
+        """Remove all of the variables from the cache and reset the counters."""
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (
+            f"VariableCache({len(self)} entries, {self.nbytes}/{self.max_bytes} "
+            f"bytes, {self.hits} hits, {self.misses} misses, "
+            f"{self.evictions} evictions)"
+        )
+
+
+def _get_nbytes(variable):
+    """Get the size of the data and mask of a variable, in bytes."""
+    nbytes = getattr(variable, "nbytes", 0)
+    mask = ma.getmask(variable)
+    if mask is not ma.nomask:
+        nbytes += mask.nbytes
+
+    return nbytes
+
+
+# The variable cache of this process.
+variable_cache = VariableCache()
 
 
 class Dataset:
@@ -32,6 +129,16 @@ class Dataset:
         self.derived_vars = derived_vars
         self.climo_fcn = climo_fcn
 
+        # The timeseries variables from the last call to get_climo_variable(),
+        # which are reused when only the season changes between calls.
+        self._last_climo_timeseries_vars = None
+        # The monthly sums from the last call that streamed the timeseries.
+        self._last_streamed_monthly_sums = None
+
+        self.use_variable_cache = not getattr(
+            self.parameters, "no_variable_cache", False
+        )
+
         if self.ref is False and self.test is False:
             msg = "Both ref and test cannot be False. One must be True."
             raise RuntimeError(msg)
@@ -82,24 +189,13 @@ class Dataset:
         """
         self.var = var
         self.extra_vars = extra_vars
+        data_path = self._get_timeseries_data_path()
 
-        if not self.is_timeseries():
-            msg = "You can only use this function with timeseries data."
-            raise RuntimeError(msg)
-
-        if self.ref:
-            # Get the reference variable from timeseries files.
-            data_path = self.parameters.reference_data_path
-            variables = self._get_timeseries_var(data_path, *args, **kwargs)
-
-        elif self.test:
-            # Get the test variable from timeseries files.
-            data_path = self.parameters.test_data_path
+        key = self._get_variable_cache_key("", args, kwargs)
+        variables = self._get_cached_variables(key)
+        if variables is None:
             variables = self._get_timeseries_var(data_path, *args, **kwargs)
-
-        else:
-            msg = "Error when determining what kind (ref or test)of variable to get."
-            raise RuntimeError(msg)
+            variables = self._cache_variables(key, variables)
 
         # Needed so we can do:
         #   v1 = Dataset.get_variable('v1', season)
@@ -117,6 +213,59 @@ class Dataset:
                 variable = utils.general.adjust_time_from_time_bounds(variable)
         return variables[0] if len(variables) == 1 else variables
 
+    def get_timeseries_variable_chunks(
+        self, var, chunk_size, extra_vars=[], single_point=False
+    ):
+        """
+        Get the variable and any extra variables like get_timeseries_variable(),
+        but chunk_size timesteps at a time, so only a chunk of the timeseries
+        is in memory at once.
+
+        This is a generator of the variables of each chunk, in time order. If
+        chunk_size is 0, the whole timeseries is a single chunk.
+        """
+        if not chunk_size:
+            yield self.get_timeseries_variable(var, extra_vars, single_point)
+            return
+
+        self.var = var
+        self.extra_vars = extra_vars
+        data_path = self._get_timeseries_data_path()
+
+        num_times = self._get_num_timesteps(data_path)
+        if num_times == 0:
+            msg = "No timesteps for the years {} to {} in the timeseries files".format(
+                *self.get_start_and_end_years()[:2]
+            )
+            msg += " of {} in {}.".format(self.var, data_path)
+            raise RuntimeError(msg)
+
+        for time_slice in _get_time_chunks(num_times, chunk_size):
+            variables = self._get_timeseries_var(data_path, time_slice=time_slice)
+            for variable in variables:
+                if variable.getTime() and not single_point:
+                    utils.general.adjust_time_from_time_bounds(variable)
+
+            yield variables[0] if len(variables) == 1 else variables
+
+    def _get_timeseries_data_path(self):
+        """Get the path of the test or reference timeseries files."""
+        if not self.is_timeseries():
+            msg = "You can only use this function with timeseries data."
+            raise RuntimeError(msg)
+
+        if self.ref:
+            # Get the reference variable from timeseries files.
+            return self.parameters.reference_data_path
+
+        elif self.test:
+            # Get the test variable from timeseries files.
+            return self.parameters.test_data_path
+
+        else:
+            msg = "Error when determining what kind (ref or test)of variable to get."
+            raise RuntimeError(msg)
+
     def get_climo_variable(self, var, season, extra_vars=[], *args, **kwargs):
         """
         For a given season, get the variable and any extra variables and run
@@ -136,19 +285,36 @@ class Dataset:
         #    - This is done with self.ref and self.test.
         # 2) Are the files being used climo or timeseries files?
         #   - This is done with the ref_timeseries_input and test_timeseries_input parameters.
+        key = self._get_variable_cache_key(season, args, kwargs)
+        variables = self._get_cached_variables(key)
+        if variables is None:
+            variables = self._get_climo_vars(season, *args, **kwargs)
+            variables = self._cache_variables(key, variables)
+
+        # Needed so we can do:
+        #   v1 = Dataset.get_variable('v1', season)
+        # and also:
+        #   v1, v2, v3 = Dataset.get_variable('v1', season, extra_vars=['v2', 'v3'])
+        return variables[0] if len(variables) == 1 else variables
+
+    def _get_climo_vars(self, season, *args, **kwargs):
+        """
+        For a given season, get the variable and any extra variables from
+        the climo or timeseries files, and run the climatology on them.
+        """
         if self.ref and self.is_timeseries():
             # Get the reference variable from timeseries files.
             data_path = self.parameters.reference_data_path
-            timeseries_vars = self._get_timeseries_var(data_path, *args, **kwargs)
-            # Run climo on the variables.
-            variables = [self.climo_fcn(v, season) for v in timeseries_vars]
+            variables = self._run_climo_on_timeseries(
+                data_path, season, *args, **kwargs
+            )
 
         elif self.test and self.is_timeseries():
             # Get the test variable from timeseries files.
             data_path = self.parameters.test_data_path
-            timeseries_vars = self._get_timeseries_var(data_path, *args, **kwargs)
-            # Run climo on the variables.
-            variables = [self.climo_fcn(v, season) for v in timeseries_vars]
+            variables = self._run_climo_on_timeseries(
+                data_path, season, *args, **kwargs
+            )
 
         elif self.ref:
             # Get the reference variable from climo files.
@@ -166,13 +332,233 @@ class Dataset:
             msg += "(climo or timeseries files)."
             raise RuntimeError(msg)
 
-        # Needed so we can do:
-        #   v1 = Dataset.get_variable('v1', season)
-        # and also:
-        #   v1, v2, v3 = Dataset.get_variable('v1', season, extra_vars=['v2', 'v3'])
-        return variables[0] if len(variables) == 1 else variables
+        return variables
+
+    def _get_variable_cache_key(self, season, args, kwargs):
+        """
+        Get the key of the requested variables in the variable cache, or None
+        if they can't be cached.
+
+        The key identifies the files the variables are read from and their
+        modification times, the variable and extra variables, how they're
+        derived, the years and the season. The season is empty for timeseries
+        variables.
+        """
+        if self.is_timeseries():
+            files = self._get_timeseries_files(self._get_timeseries_data_path())
+            years = self.get_start_and_end_years()
+        else:
+            if self.ref:
+                files = [self.get_ref_filename_climo(season)]
+            else:
+                files = [self.get_test_filename_climo(season)]
+            years = None
+
+        try:
+            files_mtimes = tuple((fnm, os.stat(fnm).st_mtime_ns) for fnm in files)
+        except OSError:
+            return None
+        if not files_mtimes:
+            return None
+
+        var = self.var
+        if self.is_climo() and kwargs.get("extra_vars_only", False):
+            # The extra variables in a climo file don't depend on the variable,
+            # so e.g. hyam, hybm and PS are shared by all of the 3D variables.
+            var = None
+
+        derivations = tuple(
+            tuple(self.derived_vars.get(v, {}).items())
+            for v in [var] + list(self.extra_vars)
+        )
+        key = (
+            files_mtimes,
+            var,
+            tuple(self.extra_vars),
+            derivations,
+            years,
+            season,
+            self.climo_fcn if season else None,
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+
+    def _get_cached_variables(self, key):
+        """
+        Get the variables for key from the variable cache, or None if they
+        aren't cached or the cache isn't used.
+        """
+        if not self.use_variable_cache or key is None:
+            return None
+
+        return variable_cache.get(key)
+
+    def _cache_variables(self, key, variables):
+        """
+        Add the variables for key to the variable cache, if it's used. Returns
+        the variables to give to the caller, which are copies if the cache
+        keeps the variables.
+        """
+        if (
+            self.use_variable_cache
+            and key is not None
+            and variable_cache.put(key, variables)
+        ):
+            return copy.deepcopy(variables)
+
+        return variables
+
+    def _run_climo_on_timeseries(self, data_path, season, *args, **kwargs):
+        """
+        Get the timeseries variables in data_path and run the climatology
+        on them.
+
+        If climo_time_chunk_size is set, the timeseries are read that many
+        timesteps at a time and reduced into monthly sums, so only a chunk of
+        each variable is in memory at once.
+        """
+        chunk_size = getattr(self.parameters, "climo_time_chunk_size", 0)
+        if chunk_size and self.climo_fcn is climo.climo:
+            variables = []
+            for monthly_sums, monthly_weights, v in self._get_streamed_monthly_sums(
+                data_path, chunk_size, *args, **kwargs
+            ):
+                if monthly_sums is not None:
+                    v = climo.climo_from_monthly_sums(
+                        monthly_sums, monthly_weights, season, v
+                    )
+                variables.append(v)
+
+            return variables
+
+        timeseries_vars = self._get_climo_timeseries_vars(data_path, *args, **kwargs)
+        # Run climo on the variables.
+        return [self.climo_fcn(v, season) for v in timeseries_vars]
+
+    def _get_streamed_monthly_sums(self, data_path, chunk_size, *args, **kwargs):
+        """
+        Get the bounds-weighted monthly sums of the timeseries variables and
+        the sums of the weights, reading chunk_size timesteps at a time.
+
+        Returns a list of (monthly_sums, monthly_weights, var) for each
+        variable, where var is its last chunk. The sums are None for variables
+        without a time axis, in which case var is the whole variable.
+
+        Derived variables are derived for each chunk, which gives the same
+        result since the derivations don't depend on the other timesteps.
+        The sums of the last call are reused when only the season changes.
+        """
+        key = self._get_climo_timeseries_key(data_path, args, kwargs)
+        if (
+            self._last_streamed_monthly_sums is not None
+            and self._last_streamed_monthly_sums[0] == key
+        ):
+            return self._last_streamed_monthly_sums[1]
+
+        accumulators = None
+        num_times = self._get_num_timesteps(data_path)
+        if num_times == 0:
+            msg = "No timesteps for the years {} to {} in the timeseries files".format(
+                *self.get_start_and_end_years()[:2]
+            )
+            msg += " of {} in {}.".format(self.var, data_path)
+            raise RuntimeError(msg)
+
+        for time_slice in _get_time_chunks(num_times, chunk_size):
+            chunk_vars = self._get_timeseries_var(
+                data_path, *args, time_slice=time_slice, **kwargs
+            )
+            if accumulators is None:
+                accumulators = [[None, None, None] for _ in chunk_vars]
+
+            for accumulator, v in zip(accumulators, chunk_vars):
+                if v.getTime() is not None:
+                    monthly_sums, monthly_weights = climo.accumulate_months(v)
+                    if accumulator[0] is None:
+                        accumulator[0] = monthly_sums
+                        accumulator[1] = monthly_weights
+                    else:
+                        accumulator[0] += monthly_sums
+                        accumulator[1] += monthly_weights
+                accumulator[2] = v
+
+        accumulators = [tuple(accumulator) for accumulator in accumulators]
+        self._last_streamed_monthly_sums = (key, accumulators)
+
+        return accumulators
+
+    def _get_num_timesteps(self, data_path):
+        """
+        Get the number of timesteps in the years to read from the timeseries
+        file of self.var, or of the first variable it's derived from.
+        """
+        if self.var in self.derived_vars:
+            vars_to_func_dict = self._get_first_valid_vars_timeseries(
+                self.derived_vars[self.var], data_path
+            )
+            var = list(vars_to_func_dict.keys())[0][0]
+        else:
+            var = self.var
+
+        fnm = self._get_timeseries_file_path(var, data_path)
+        # See _get_var_from_timeseries_file() for why a with statement isn't used.
+        fin = cdms2.open(fnm)
+        interval = fin[var].getTime().mapIntervalExt(self._get_time_interval())
+        fin.close()
+
+        if interval is None:
+            return 0
+
+        return interval[1] - interval[0]
+
+    def _get_climo_timeseries_vars(self, data_path, *args, **kwargs):
+        """
+        Get the timeseries variables to run the climatology on.
+
+        If the same variables were requested by the last call, e.g. for
+        another season, the already loaded variables are returned. Since the
+        climatology function caches the monthly sums of each variable, the
+        timeseries is then only read and reduced once for all seasons.
+        """
+        key = self._get_climo_timeseries_key(data_path, args, kwargs)
+
+        if self._last_climo_timeseries_vars is None or (
+            self._last_climo_timeseries_vars[0] != key
+        ):
+            timeseries_vars = self._get_timeseries_var(data_path, *args, **kwargs)
+            self._last_climo_timeseries_vars = (key, timeseries_vars)
+
+        return self._last_climo_timeseries_vars[1]
+
+    def _get_climo_timeseries_key(self, data_path, args, kwargs):
+        """
+        Get the key that identifies the timeseries variables requested to run
+        the climatology on.
+        """
+        return (
+            tuple(self._get_timeseries_files(data_path)),
+            self.var,
+            tuple(self.extra_vars),
+            self.get_start_and_end_years(),
+            args,
+            tuple(sorted(kwargs.items())),
+        )
 
     def get_static_variable(self, static_var, primary_var):
+        return self.get_static_variables([static_var], primary_var)[0]
+
+    def get_static_variables(self, static_vars, primary_var):
+        """
+        Get the static variables from the timeseries file of primary_var,
+        which is only opened once for all of them.
+        """
         if self.ref:
             # Get the reference variable from timeseries files.
             data_path = self.parameters.reference_data_path
@@ -181,9 +567,9 @@ class Dataset:
             data_path = self.parameters.test_data_path
         file_path = self._get_timeseries_file_path(primary_var, data_path)
         fin = cdms2.open(file_path)
-        result = fin(static_var)
+        results = [fin(static_var) for static_var in static_vars]
         fin.close()
-        return result
+        return results
 
     def is_timeseries(self):
         """
@@ -238,23 +624,44 @@ class Dataset:
         Get the user-defined start and end years.
         """
         sub_monthly = False
-        if self.parameters.sets[0] in ["area_mean_time_series"]:
-            start_yr = getattr(self.parameters, "start_yr")
-            end_yr = getattr(self.parameters, "end_yr")
-        else:
-            if self.ref:
-                start_yr = getattr(self.parameters, "ref_start_yr")
-                end_yr = getattr(self.parameters, "ref_end_yr")
-
-            else:
-                start_yr = getattr(self.parameters, "test_start_yr")
-                end_yr = getattr(self.parameters, "test_end_yr")
+        start_yr_attr, end_yr_attr = self._get_start_and_end_year_attrs()
+        start_yr = getattr(self.parameters, start_yr_attr)
+        end_yr = getattr(self.parameters, end_yr_attr)
 
         if self.parameters.sets[0] in ["diurnal_cycle", "arm_diags"]:
             sub_monthly = True
 
         return start_yr, end_yr, sub_monthly
 
+    def get_dataset_for_years(self, start_yr, end_yr):
+        """
+        Get a Dataset for the same data that reads the timeseries of the years
+        start_yr to end_yr instead of the user-defined years.
+        """
+        parameters = copy.copy(self.parameters)
+        start_yr_attr, end_yr_attr = self._get_start_and_end_year_attrs()
+        setattr(parameters, start_yr_attr, str(start_yr))
+        setattr(parameters, end_yr_attr, str(end_yr))
+
+        return Dataset(
+            parameters,
+            ref=self.ref,
+            test=self.test,
+            derived_vars=self.derived_vars,
+            climo_fcn=self.climo_fcn,
+        )
+
+    def _get_start_and_end_year_attrs(self):
+        """
+        Get the names of the parameters with the start and end years.
+        """
+        if self.parameters.sets[0] in ["area_mean_time_series"]:
+            return "start_yr", "end_yr"
+        elif self.ref:
+            return "ref_start_yr", "ref_end_yr"
+        else:
+            return "test_start_yr", "test_end_yr"
+
     def get_test_filename_climo(self, season):
         """
         Return the path to the test file name based on
@@ -312,17 +719,7 @@ class Dataset:
         """
         Locate climatology file name based on data_name and season.
         """
-        dir_files = sorted(os.listdir(path_name))
-        for filename in dir_files:
-            if filename.startswith(data_name + "_" + season):
-                return os.path.join(path_name, filename)
-        # The below is only ran on model data, because a shorter name is passed into this software. Won't work when use month name such as '01' as season.
-        for filename in dir_files:
-            if season in ["ANN", "DJF", "MAM", "JJA", "SON"]:
-                if filename.startswith(data_name) and season in filename:
-                    return os.path.join(path_name, filename)
-        # No file found.
-        return ""
+        return file_catalog.get_catalog(path_name).find_climo_file(data_name, season)
 
     def _get_climo_var(self, filename, extra_vars_only=False):
         """
@@ -442,12 +839,13 @@ class Dataset:
         for k in vars_to_func_dict:
             return vars_to_func_dict[k]
 
-    def _get_timeseries_var(self, data_path, extra_vars_only=False):
+    def _get_timeseries_var(self, data_path, extra_vars_only=False, time_slice=None):
         """
         For a given season and timeseries input data,
         get the variable (self.var).
 
         If self.extra_vars is also defined, get them as well.
+        If time_slice is defined, only get those timesteps of the years.
         """
         # Can't iterate through self.var and self.extra_vars as we do in _get_climo_var()
         # b/c the extra_vars must be taken from the same timeseries file as self.var.
@@ -472,7 +870,7 @@ class Dataset:
                 # Open the files of the variables and get the cdms2.TransientVariables.
                 # Ex: [PRECC, PRECL], where both are TransientVariables.
                 variables = self._get_original_vars_timeseries(
-                    vars_to_func_dict, data_path
+                    vars_to_func_dict, data_path, time_slice
                 )
 
                 # Get the corresponding function.
@@ -491,7 +889,10 @@ class Dataset:
             first_orig_var = list(vars_to_func_dict.keys())[0][0]
             for extra_var in self.extra_vars:
                 v = self._get_var_from_timeseries_file(
-                    first_orig_var, data_path, var_to_get=extra_var
+                    first_orig_var,
+                    data_path,
+                    var_to_get=extra_var,
+                    time_slice=time_slice,
                 )
                 return_variables.append(v)
 
@@ -500,13 +901,15 @@ class Dataset:
             # We do want the self.var.
             if not extra_vars_only:
                 # Find {var}_{start_yr}01_{end_yr}12.nc in data_path and get var from it.
-                v = self._get_var_from_timeseries_file(self.var, data_path)
+                v = self._get_var_from_timeseries_file(
+                    self.var, data_path, time_slice=time_slice
+                )
                 return_variables.append(v)
 
             # Also get any extra vars.
             for extra_var in self.extra_vars:
                 v = self._get_var_from_timeseries_file(
-                    self.var, data_path, var_to_get=extra_var
+                    self.var, data_path, var_to_get=extra_var, time_slice=time_slice
                 )
                 return_variables.append(v)
 
@@ -556,6 +959,29 @@ class Dataset:
         msg += " have valid files in {}.".format(data_path)
         raise RuntimeError(msg)
 
+    def _get_timeseries_files(self, data_path):
+        """
+        Get the timeseries files in data_path that self.var is read from, i.e.
+        the files of the variables it's derived from, or an empty list if
+        they can't be found.
+
+        The extra variables are read from the file of self.var, or of the
+        first variable it's derived from, so they don't add any files.
+        """
+        try:
+            if self.var in self.derived_vars:
+                vars_to_func_dict = self._get_first_valid_vars_timeseries(
+                    self.derived_vars[self.var], data_path
+                )
+                variables = list(vars_to_func_dict.keys())[0]
+            else:
+                variables = [self.var]
+            files = [self._get_timeseries_file_path(v, data_path) for v in variables]
+        except RuntimeError:
+            return []
+
+        return files if all(files) else []
+
     def _get_timeseries_file_path(self, var, data_path):
         """
         Returns the file path if a file exists in data_path in the form:
@@ -568,26 +994,14 @@ class Dataset:
         (with different start_yr or end_yr), return ''.
         This is equivalent to returning False.
         """
-        # Get all of the nc file paths in data_path.
-
-        # path = os.path.join(data_path, '*.nc')
-        path = os.path.join(data_path, "*.*")
-        files = sorted(glob.glob(path))
-
-        # Both .nc and .xml files are supported
-        file_fmt = ""
-        if len(files) > 0:
-            file_fmt = files[0].split(".")[-1]
-
-        # Everything between '{var}_' and '.nc' in a
-        # time-series file is always 13 characters.
+        # The files in data_path are looked up in the catalog of the
+        # directory, which is only scanned once per run.
         if self.parameters.sets[0] in ["arm_diags"]:
             site = getattr(self.parameters, "regions", "")
-            re_str = var + "_" + site[0] + r"_.{13}." + file_fmt
+            prefix = var + "_" + site[0]
         else:
-            re_str = var + r"_.{13}." + file_fmt
-        re_str = os.path.join(data_path, re_str)
-        matches = [f for f in files if re.search(re_str, f)]
+            prefix = var
+        matches = file_catalog.get_catalog(data_path).get_timeseries_files(prefix)
 
         if len(matches) == 1:
             return matches[0]
@@ -601,19 +1015,8 @@ class Dataset:
         # If nothing was found, try looking for the file with
         # the ref_name prepended to it.
         ref_name = getattr(self.parameters, "ref_name", "")
-        # path = os.path.join(data_path, ref_name, '*.nc')
-        path = os.path.join(data_path, ref_name, "*.*")
-        files = sorted(glob.glob(path))
-        # Both .nc and .xml files are supported
-        file_fmt = ""
-        if len(files) > 0:
-            file_fmt = files[0].split(".")[-1]
-
-        # Everything between '{var}_' and '.nc' in a
-        # time-series file is always 13 characters.
-        re_str = var + r"_.{13}." + file_fmt
-        re_str = os.path.join(data_path, ref_name, re_str)
-        matches = [f for f in files if re.search(re_str, f)]
+        path = os.path.join(data_path, ref_name)
+        matches = file_catalog.get_catalog(path).get_timeseries_files(var)
         # Again, there should only be one file per var in this new location.
         if len(matches) == 1:
             return matches[0]
@@ -626,7 +1029,9 @@ class Dataset:
         else:
             return ""
 
-    def _get_original_vars_timeseries(self, vars_to_func_dict, data_path):
+    def _get_original_vars_timeseries(
+        self, vars_to_func_dict, data_path, time_slice=None
+    ):
         """
         Given a dictionary in the form {(vars): func}, get the vars
         from files in data_path as cdms2.TransientVariables.
@@ -640,33 +1045,27 @@ class Dataset:
 
         variables = []
         for var in vars_to_get:
-            v = self._get_var_from_timeseries_file(var, data_path)
+            v = self._get_var_from_timeseries_file(
+                var, data_path, time_slice=time_slice
+            )
             variables.append(v)
 
         return variables
 
-    def _get_var_from_timeseries_file(self, var, data_path, var_to_get=""):
+    def _get_var_from_timeseries_file(
+        self, var, data_path, var_to_get="", time_slice=None
+    ):
         """
         Get the actual var from the timeseries file for var.
         If var_to_get is defined, get that from the file instead of var.
+        If time_slice is defined, only get those timesteps of the years.
 
         This function is only called after it's checked that a file
         for this var exists in data_path.
         The checking is done in _get_first_valid_vars_timeseries().
         """
-        (
-            start_year,
-            end_year,
-            sub_monthly,
-        ) = self.get_start_and_end_years()
-        if sub_monthly:
-            start_time = "{}-01-01".format(start_year)
-            end_time = "{}-01-01".format(str(int(end_year) + 1))
-            slice_flag = "co"
-        else:
-            start_time = "{}-01-15".format(start_year)
-            end_time = "{}-12-15".format(end_year)
-            slice_flag = "ccb"
+        start_year, end_year, _ = self.get_start_and_end_years()
+        time_interval = self._get_time_interval()
 
         fnm = self._get_timeseries_file_path(var, data_path)
 
@@ -694,6 +1093,51 @@ class Dataset:
             #    return var_time
             # For xml files using above with statement won't work because the Dataset object returned doesn't have attribute __enter__ for content management.
             fin = cdms2.open(fnm)
-            var_time = fin(var, time=(start_time, end_time, slice_flag))(squeeze=1)
+            if time_slice is None:
+                var_time = fin(var, time=time_interval)(squeeze=1)
+            else:
+                first = fin[var].getTime().mapIntervalExt(time_interval)[0]
+                var_time = fin(
+                    var,
+                    time=slice(first + time_slice.start, first + time_slice.stop),
+                )(squeeze=1)
             fin.close()
             return var_time
+
+    def _get_time_interval(self):
+        """
+        Get the (start_time, end_time, slice_flag) interval of the years to
+        read from the timeseries files.
+        """
+        (
+            start_year,
+            end_year,
+            sub_monthly,
+        ) = self.get_start_and_end_years()
+        if sub_monthly:
+            start_time = "{}-01-01".format(start_year)
+            end_time = "{}-01-01".format(str(int(end_year) + 1))
+            slice_flag = "co"
+        else:
+            start_time = "{}-01-15".format(start_year)
+            end_time = "{}-12-15".format(end_year)
+            slice_flag = "ccb"
+
+        return start_time, end_time, slice_flag
+
+
+def _get_time_chunks(num_times, chunk_size):
+    """
+    Split num_times timesteps into slices of chunk_size timesteps.
+
+    Reading a single timestep would squeeze the time axis out of the
+    variable, so a last chunk of a single timestep is merged into the
+    previous one.
+    """
+    chunk_size = max(chunk_size, 2)
+    starts = list(range(0, num_times, chunk_size))
+    if len(starts) > 1 and num_times - starts[-1] == 1:
+        starts.pop()
+    stops = starts[1:] + [num_times]
+
+    return [slice(start, stop) for start, stop in zip(starts, stops)]
@@ -1,3 +1,5 @@
+import collections
+
 import MV2
 import numpy
 import numpy.ma as ma
@@ -6,46 +8,208 @@ from e3sm_diags.logger import custom_logger
 
 logger = custom_logger(__name__)
 
+# The months of each season, Jan to Dec.
+SEASON_IDX = {
+    "01": [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    "02": [0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    "03": [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    "04": [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+    "05": [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0],
+    "06": [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0],
+    "07": [0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    "08": [0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
+    "09": [0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0],
+    "10": [0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0],
+    "11": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0],
+    "12": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+    "DJF": [1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+    "MAM": [0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0],
+    "JJA": [0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0],
+    "SON": [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0],
+    "ANN": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+}
+
+# The seasons of each cycle. The cycles aren't supported yet!
+CYCLES = {
+    "ANNUALCYCLE": [
+        "01",
+        "02",
+        "03",
+        "04",
+        "05",
+        "06",
+        "07",
+        "08",
+        "09",
+        "10",
+        "11",
+        "12",
+    ],
+    "SEASONALCYCLE": ["DJF", "MAM", "JJA", "SON"],
+}
+
 
 def composite_diurnal_cycle(var, season, fft=True):
     """
     Compute the composite diurnal cycle for var for the given season.
     Return mean + amplitudes and times-of-maximum of the first Fourier harmonic component as three transient variables.
     """
-    season_idx = {
-        "01": [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        "02": [0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        "03": [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-        "04": [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
-        "05": [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0],
-        "06": [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-        "07": [0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
-        "08": [0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-        "09": [0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0],
-        "10": [0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0],
-        "11": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0],
-        "12": [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-        "DJF": [1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-        "MAM": [0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0],
-        "JJA": [0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0],
-        "SON": [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0],
-        "ANN": [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-    }
-
-    site = False
-    if var.getLatitude() is None and var.getLongitude() is None:
-        site = True
-        lat = var.lat
-        lon = var.lon
+    return composite_diurnal_cycles(var, [season], fft=fft)[season]
+
+
+def composite_diurnal_cycles(var, seasons, fft=True):
+    """
+    Compute the composite diurnal cycles for var for each of the seasons.
+    The time of var is decoded and the data is averaged once for all of the seasons.
+    Return a dict of what composite_diurnal_cycle() returns for each season.
+    """
+    site, lat, lon = _get_lat_lon(var)
     # Redefine time to be in the middle of the time interval
     var_time = var.getTime()
     if var_time is None:
         # Climo cannot be run on this variable.
-        return var
+        return collections.OrderedDict((season, var) for season in seasons)
 
     #    tbounds = var_time.getBounds()
     #    var_time[:] = 0.5*(tbounds[:,0]+tbounds[:,1]) #time bounds for h1-h4 are problematic
     var_time_absolute = var_time.asComponentTime()
+    start_time, time_freq = _get_start_time_and_freq(var_time_absolute)
+    months = numpy.array([t.month for t in var_time_absolute])
+
+    # Convert to masked array
+    v = var.asma()
+
+    # Select specified seasons, and average all of them at once.
+    # composites has shape i.e. (ncycles, ntimesteps, [lat,lon]) for lat lon data
+    composites = get_composites(v, months, time_freq, _get_cycle_seasons(seasons))
+
+    return _get_diurnal_cycles(
+        composites,
+        seasons,
+        site,
+        lat,
+        lon,
+        getattr(var, "units", ""),
+        start_time,
+        time_freq,
+        fft,
+    )
+
+
+class DiurnalCycleAccumulator:
+    """
+    The sums of the composite diurnal cycles of a variable for each season,
+    accumulated over the time chunks of the variable in time order, e.g. from
+    Dataset.get_timeseries_variable_chunks(). Only a chunk is in memory at
+    once, along with the sums.
+
+    The timesteps are composited by their position in the days of time_freq
+    timesteps from the first timestep, so the composites are the same as the
+    ones of composite_diurnal_cycles() when none of the days straddle months.
+    """
+
+    def __init__(self, var, seasons):
+        """
+        var is the first chunk of the variable, which has its grid and the
+        first timesteps. It isn't added to the sums.
+        """
+        self.seasons = seasons
+        self.cycle_seasons = _get_cycle_seasons(seasons)
+        self.season_idx = numpy.array(
+            [SEASON_IDX[season] for season in self.cycle_seasons], dtype=bool
+        )
+        self.site, self.lat, self.lon = _get_lat_lon(var)
+        self.units = getattr(var, "units", "")
+        self.start_time, self.time_freq = _get_start_time_and_freq(
+            var.getTime().subAxis(0, 2).asComponentTime()
+        )
+        self.num_times = 0
+
+        shape = (len(self.cycle_seasons), self.time_freq) + var.shape[1:]
+        self.sums = numpy.zeros(shape)
+        # The number of values in the sums. There's a single count for each
+        # season and time of day until a chunk has masked values.
+        self.counts = numpy.zeros(shape[:2] + (1,) * (len(shape) - 2))
+
+    def add(self, var):
+        """
+        Add the next time chunk of the variable to the sums.
+        """
+        months = numpy.array([t.month for t in var.getTime().asComponentTime()])
+        first_slot = self.num_times % self.time_freq
+        self.num_times += len(months)
+
+        v = var.asma()
+        mask = ma.getmask(v)
+        if mask is not ma.nomask and self.counts.shape != self.sums.shape:
+            self.counts = numpy.broadcast_to(self.counts, self.sums.shape).copy()
+        data = ma.filled(v, 0.0)
+
+        # The timesteps of each month are contiguous, and the timesteps of a
+        # time of day are every time_freq timesteps of them.
+        starts = numpy.flatnonzero(numpy.diff(months, prepend=0))
+        stops = list(starts[1:]) + [len(months)]
+        for start, stop in zip(starts, stops):
+            in_season = self.season_idx[:, months[start] - 1]
+            for slot in range(self.time_freq):
+                first = start + (slot - first_slot - start) % self.time_freq
+                if first >= stop:
+                    continue
+                times = slice(first, stop, self.time_freq)
+
+                self.sums[in_season, slot] += data[times].sum(
+                    axis=0, dtype=numpy.float64
+                )
+                if mask is ma.nomask:
+                    self.counts[in_season, slot] += len(
+                        range(first, stop, self.time_freq)
+                    )
+                else:
+                    self.counts[in_season, slot] += (~mask[times]).sum(axis=0)
+
+    def get_composites(self):
+        """
+        Get the composite diurnal cycles of each of the seasons, with shape
+        (ncycles, time_freq, [lat,lon]) like get_composites().
+        """
+        counts = numpy.broadcast_to(self.counts, self.sums.shape)
+        return ma.masked_where(
+            counts == 0, self.sums / numpy.where(counts == 0, 1.0, counts)
+        )
+
+    def get_diurnal_cycles(self, fft=True):
+        """
+        Get a dict of what composite_diurnal_cycle() returns for each season.
+        """
+        return _get_diurnal_cycles(
+            self.get_composites(),
+            self.seasons,
+            self.site,
+            self.lat,
+            self.lon,
+            self.units,
+            self.start_time,
+            self.time_freq,
+            fft,
+        )
+
+
+def _get_lat_lon(var):
+    """
+    Get whether var is at a site, and its latitude and longitude, which are
+    attributes of the variables at a site.
+    """
+    if var.getLatitude() is None and var.getLongitude() is None:
+        return True, var.lat, var.lon
+
+    return False, var.getLatitude(), var.getLongitude()
+
+
+def _get_start_time_and_freq(var_time_absolute):
+    """
+    Get the time of day of the first timestep, in hours, and the number of
+    timesteps per day from the first two timesteps.
+    """
     # i.e. var_time_absolute[0] = "2000-1-1 1:30:0.0"
     time_0 = (
         var_time_absolute[0].hour
@@ -62,49 +226,37 @@ def composite_diurnal_cycle(var, season, fft=True):
     logger.info(f"start_time {var_time_absolute[0]} {start_time}")
     logger.info(f"var_time_freq={time_freq}")
 
-    # Convert to masked array
-    v = var.asma()
+    return start_time, time_freq
 
-    # Select specified seasons:
-    if season == "ANNUALCYCLE":  # Not supported yet!
-        cycle = [
-            "01",
-            "02",
-            "03",
-            "04",
-            "05",
-            "06",
-            "07",
-            "08",
-            "09",
-            "10",
-            "11",
-            "12",
-        ]
-    elif season == "SEASONALCYCLE":  # Not supported yet!
-        cycle = ["DJF", "MAM", "JJA", "SON"]
-    else:
-        cycle = [season]
 
-    ncycle = len(cycle)
-    # var_diurnal has shape i.e. (ncycle, ntimesteps, [lat,lon]) for lat lon data
-    var_diurnal = ma.zeros([ncycle] + [time_freq] + list(numpy.shape(v))[1:])
-    for n in range(ncycle):
-        # Get time index for each month/season.
-        idx = numpy.array(
-            [
-                season_idx[cycle[n]][var_time_absolute[i].month - 1]
-                for i in range(len(var_time_absolute))
-            ],
-            dtype=numpy.int,
-        ).nonzero()
-        var_diurnal[n,] = ma.average(  # noqa
-            numpy.reshape(
-                v[idx],
-                (int(v[idx].shape[0] / time_freq), time_freq) + v[idx].shape[1:],
-            ),
-            axis=0,
-        )
+def _get_cycle_seasons(seasons):
+    """
+    Get the seasons of the cycles of each of the seasons, one after another.
+    """
+    return [
+        cycle_season
+        for season in seasons
+        for cycle_season in CYCLES.get(season, [season])
+    ]
+
+
+def _get_diurnal_cycles(
+    composites, seasons, site, lat, lon, units, start_time, time_freq, fft
+):
+    """
+    Get a dict of what composite_diurnal_cycle() returns for each season, from
+    the composites of the seasons of their cycles.
+    """
+    # var_diurnal has shape i.e. (ncycle, ntimesteps, [lat,lon]) for each season
+    var_diurnals = []
+    start = 0
+    for season in seasons:
+        ncycle = len(CYCLES.get(season, [season]))
+        var_diurnal = composites[start : start + ncycle]
+        start += ncycle
+        if not site:
+            var_diurnal = numpy.squeeze(var_diurnal)
+        var_diurnals.append(var_diurnal)
 
     # Convert GMT to local time
     if site:
@@ -112,6 +264,7 @@ def composite_diurnal_cycle(var, season, fft=True):
         nlon = 1
         # lat = [36.6]
         # lon = [262.5]
+        lon_values = numpy.ravel(numpy.asarray(lon, dtype=numpy.float64))
         lat = [
             lat,
         ]
@@ -119,38 +272,43 @@ def composite_diurnal_cycle(var, season, fft=True):
             lon,
         ]
     else:
-        nlat = var.shape[1]
-        nlon = var.shape[2]
-        lat = var.getLatitude()
-        lon = var.getLongitude()
-        var_diurnal = numpy.squeeze(var_diurnal)
+        nlat = len(lat)
+        nlon = len(lon)
+        lon_values = numpy.asarray(lon[:], dtype=numpy.float64)
 
     nt = time_freq
+    itime = numpy.arange(0, 24, 24 / nt)[:, numpy.newaxis, numpy.newaxis]
     lst = numpy.zeros((nt, nlat, nlon))
-    for it, itime in enumerate(numpy.arange(0, 24, 24 / nt)):
-        for ilon in range(nlon):
-            lst[it, :, ilon] = (
-                itime + start_time + lon[ilon] / 360 * 24
-            ) % 24  # convert GMT to LST
+    lst[:] = (itime + start_time + lon_values / 360 * 24) % 24  # convert GMT to LST
 
     # Compute mean, amplitude and max time of the first three Fourier components.
     if not fft:
-        return var_diurnal, lst
+        return collections.OrderedDict(
+            (season, (var_diurnal, lst))
+            for season, var_diurnal in zip(seasons, var_diurnals)
+        )
 
-    else:
-        cycmean, maxvalue, tmax = fastAllGridFT(var_diurnal, lst)
+    # The seasons are stacked along the latitudes, so the FFT of all of them is done at once.
+    cycmean, maxvalue, tmax = fastAllGridFT(
+        numpy.concatenate(var_diurnals, axis=1),
+        numpy.concatenate([lst] * len(seasons), axis=1),
+    )
+
+    results = collections.OrderedDict()
+    for i, season in enumerate(seasons):
+        lats = slice(i * nlat, (i + 1) * nlat)
 
         # Save phase, amplitude, and mean for the first homonic,
         amplitude = MV2.zeros((nlat, nlon))
-        amplitude[:, :] = maxvalue[0]
+        amplitude[:, :] = maxvalue[0][lats]
         amplitude.id = "PRECT_diurnal_amplitude"
         amplitude.longname = "Amplitude of diurnal cycle of PRECT"
-        amplitude.units = var.units
+        amplitude.units = units
         amplitude.setAxis(0, lat)
         amplitude.setAxis(1, lon)
 
         maxtime = MV2.zeros((nlat, nlon))
-        maxtime[:, :] = tmax[0]
+        maxtime[:, :] = tmax[0][lats]
         maxtime.id = "PRECT_diurnal_phase"
         maxtime.longname = "Phase of diurnal cycle of PRECT"
         maxtime.units = "hour"
@@ -158,14 +316,74 @@ def composite_diurnal_cycle(var, season, fft=True):
         maxtime.setAxis(1, lon)
 
         cmean = MV2.zeros((nlat, nlon))
-        cmean[:, :] = cycmean
+        cmean[:, :] = cycmean[lats]
         cmean.id = "PRECT_diurnal_cycmean"
         cmean.longname = "Mean of diurnal cycle of PRECT"
-        cmean.units = var.units
+        cmean.units = units
         cmean.setAxis(0, lat)
         cmean.setAxis(1, lon)
 
-        return cmean, amplitude, maxtime
+        results[season] = (cmean, amplitude, maxtime)
+
+    return results
+
+
+def get_composites(v, months, time_freq, seasons):
+    """
+    Get the composite diurnal cycle of the masked array v for each of the seasons,
+    with shape (nseasons, time_freq) + v.shape[1:].
+    months are the months of the timesteps of v.
+
+    When each day of time_freq timesteps is in a single month, the days of all of the
+    seasons are averaged in a single pass over v. Otherwise, the timesteps of each season
+    are selected and averaged separately.
+    Masked values aren't averaged, like ma.average().
+    """
+    season_idx = numpy.array([SEASON_IDX[season] for season in seasons], dtype=bool)
+    ndays = v.shape[0] // time_freq
+    day_months = months[: ndays * time_freq].reshape(ndays, time_freq)
+
+    if ndays * time_freq == v.shape[0] and numpy.all(day_months == day_months[:, :1]):
+        # The days are summed over each run of days in the same month, so v is
+        # only read once, and the runs are then summed by season.
+        day_months = day_months[:, 0]
+        starts = numpy.flatnonzero(numpy.diff(day_months, prepend=0))
+        runs = [
+            slice(start, stop)
+            for start, stop in zip(starts, list(starts[1:]) + [ndays])
+        ]
+        # (nruns, time_freq * [lat * lon]) with the masked values set to 0.
+        data = ma.filled(v.reshape(ndays, -1), 0.0)
+        sums = numpy.array([data[run].sum(axis=0, dtype=numpy.float64) for run in runs])
+        mask = ma.getmask(v)
+        if mask is ma.nomask:
+            counts = numpy.array([[run.stop - run.start] for run in runs])
+        else:
+            valid = ~mask.reshape(ndays, -1)
+            counts = numpy.array([valid[run].sum(axis=0) for run in runs])
+        # (nseasons, nruns) with 1 for the runs in each season.
+        in_season = season_idx[:, day_months[starts] - 1].astype(numpy.float64)
+
+        sums = in_season @ sums
+        counts = numpy.broadcast_to(in_season @ counts, sums.shape)
+        composites = ma.masked_where(
+            counts == 0, sums / numpy.where(counts == 0, 1.0, counts)
+        )
+        return composites.reshape((len(seasons), time_freq) + v.shape[1:])
+
+    composites = ma.zeros([len(seasons)] + [time_freq] + list(numpy.shape(v))[1:])
+    for n in range(len(seasons)):
+        # Get time index for each month/season.
+        v_season = v[season_idx[n][months - 1]]
+        composites[n,] = ma.average(  # noqa
+            numpy.reshape(
+                v_season,
+                (int(v_season.shape[0] / time_freq), time_freq) + v_season.shape[1:],
+            ),
+            axis=0,
+        )
+
+    return composites
 
 
 def fastAllGridFT(x, t):
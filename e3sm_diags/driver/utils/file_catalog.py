@@ -0,0 +1,128 @@
+"""
+A per-directory catalog of the climatology and timeseries files in a data path.
+
+Looking up the file for a variable or season used to glob or list the data
+directory on every call, which is slow on parallel file systems with tens of
+thousands of files. A catalog scans a directory once and indexes its files, so
+the lookups afterwards are dictionary hits. The catalog of a directory is
+rebuilt when the modification time of the directory changes, i.e. when files
+are added, removed or renamed.
+"""
+import os
+from typing import Dict, List, Tuple
+
+# Everything between '{var}_' and '.nc' in a time-series file is always
+# 13 characters, ex: '185001_201412'.
+TIMESERIES_DATE_RANGE_LENGTH = 13
+
+CLIMO_SEASONS = ["ANN", "DJF", "MAM", "JJA", "SON"]
+
+
+class DirectoryCatalog:
+    """The files in a single directory, indexed for lookups."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+        # Sorted entries of the directory, like `sorted(os.listdir(path))`.
+        self.entries: List[str] = (
+            sorted(os.listdir(path)) if os.path.isdir(path) else []
+        )
+
+        # Sorted paths of the entries with an extension, like
+        # `sorted(glob.glob(os.path.join(path, "*.*")))`.
+        self.files: List[str] = [
+            os.path.join(path, entry)
+            for entry in self.entries
+            if "." in entry and not entry.startswith(".")
+        ]
+
+        # Both .nc and .xml files are supported, the format of the
+        # timeseries files is determined by the first file in the directory.
+        self.file_fmt = self.files[0].split(".")[-1] if self.files else ""
+
+        self._timeseries_index = self._index_timeseries_files()
+        self._climo_lookups: Dict[Tuple[str, str], str] = {}
+
+    def _index_timeseries_files(self) -> Dict[str, List[str]]:
+        """
+        Index the timeseries files by the prefix of their name, which is
+        either '{var}' or '{var}_{site}' in files of the form:
+            {var}_{start_yr}01_{end_yr}12.nc
+            {var}_{site}_{start_yr}01_{end_yr}12.nc
+        """
+        index: Dict[str, List[str]] = {}
+        suffix_len = TIMESERIES_DATE_RANGE_LENGTH + len(self.file_fmt) + 2
+
+        for path in self.files:
+            name = os.path.basename(path)
+            if len(name) <= suffix_len or not name.endswith("." + self.file_fmt):
+                continue
+            if name[-suffix_len] != "_":
+                continue
+
+            index.setdefault(name[:-suffix_len], []).append(path)
+
+        return index
+
+    def get_timeseries_files(self, prefix: str) -> List[str]:
+        """
+        Return the paths of the timeseries files for the prefix, which is
+        either '{var}' or '{var}_{site}'.
+        """
+        return self._timeseries_index.get(prefix, [])
+
+    def find_climo_file(self, data_name: str, season: str) -> str:
+        """
+        Locate climatology file name based on data_name and season.
+        Returns '' if no file is found.
+        """
+        key = (data_name, season)
+        if key not in self._climo_lookups:
+            self._climo_lookups[key] = self._find_climo_file(data_name, season)
+
+        return self._climo_lookups[key]
+
+    def _find_climo_file(self, data_name: str, season: str) -> str:
+        for filename in self.entries:
+            if filename.startswith(data_name + "_" + season):
+                return os.path.join(self.path, filename)
+        # The below is only ran on model data, because a shorter name is passed into this software. Won't work when use month name such as '01' as season.
+        if season in CLIMO_SEASONS:
+            for filename in self.entries:
+                if filename.startswith(data_name) and season in filename:
+                    return os.path.join(self.path, filename)
+        # No file found.
+        return ""
+
+
+# The catalogs for each directory scanned in this process, along with the
+# modification time of the directory when it was scanned.
+_CATALOGS: Dict[str, Tuple[int, DirectoryCatalog]] = {}
+
+
+def get_catalog(path: str) -> DirectoryCatalog:
+    """
+    Return the catalog for the directory, scanning it if it hasn't been
+    scanned yet or if it was modified since the last scan.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        # The directory doesn't exist, so there are no files in it.
+        _CATALOGS.pop(path, None)
+        return DirectoryCatalog(path)
+
+    cached = _CATALOGS.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    catalog = DirectoryCatalog(path)
+    _CATALOGS[path] = (mtime, catalog)
+
+    return catalog
+
+
+def clear_catalogs():
+    """Remove all of the cached directory catalogs."""
+    _CATALOGS.clear()
@@ -1,20 +1,43 @@
 from __future__ import print_function
 
+import collections
 import copy
 import errno
 import os
 from pathlib import Path
+from typing import Optional, Tuple
 
 import cdms2
-import cdutil
-import genutil
-import MV2
+import numpy as np
+import numpy.ma as ma
 
+import e3sm_diags
 from e3sm_diags.derivations.default_regions import points_specs, regions_specs
+from e3sm_diags.driver.utils import regrid, vertical
 from e3sm_diags.logger import custom_logger
 
 logger = custom_logger(__name__)
 
+# The maximum number of land and ocean fractions, and of region masks, kept in
+# memory by each process. The least recently used ones are removed first.
+MAX_CACHED_LAND_OCEAN_FRACS = 16
+MAX_CACHED_REGION_MASKS = 16
+
+# The land and ocean fractions read by get_land_ocean_frac(), keyed by the file
+# or directory they were read from and the season. None means the data doesn't
+# have them, so the default fractions are used.
+_LAND_OCEAN_FRACS: "collections.OrderedDict[Tuple, Optional[Tuple]]" = (
+    collections.OrderedDict()
+)
+
+# The land and ocean fractions from the default E3SM ne30 mask file.
+_DEFAULT_LAND_OCEAN_FRAC: Optional[Tuple] = None
+
+# The masks of the points outside of each land/ocean region, keyed by the
+# source of the fraction, the shape and fingerprint of the target grid, the
+# region value and the regrid tool and method.
+_REGION_MASKS: "collections.OrderedDict[Tuple, np.ndarray]" = collections.OrderedDict()
+
 
 def strictly_increasing(L):
     return all(x < y for x, y in zip(L, L[1:]))
@@ -130,17 +153,22 @@ def convert_to_pressure_levels(mv, plevs, dataset, var, season):
 
 
 def hybrid_to_plevs(var, hyam, hybm, ps, plev):
-    """Convert from hybrid pressure coordinate to desired pressure level(s)."""
+    """Convert from hybrid pressure coordinate to desired pressure level(s).
+
+    The interpolation weights are cached per hyam, hybm and surface pressure,
+    so they're shared by all of the variables from the same data and season.
+    """
     p0 = 1000.0  # mb
-    ps = ps / 100.0  # convert unit from 'Pa' to mb
-    levels_orig = cdutil.vertical.reconstructPressureFromHybrid(ps, hyam, hybm, p0)
-    levels_orig.units = "mb"
+    ps = ps(squeeze=1).asma() / 100.0  # convert unit from 'Pa' to mb
+    hyam = np.asarray(hyam, dtype=np.float64)
+    hybm = np.asarray(hybm, dtype=np.float64)
     # Make sure z is positive down
     if var.getLevel()[0] > var.getLevel()[-1]:
         var = var(lev=slice(-1, None, -1))
-        levels_orig = levels_orig(lev=slice(-1, None, -1))
-    var_p = cdutil.vertical.logLinearInterpolation(
-        var(squeeze=1), levels_orig(squeeze=1), plev
+        hyam = hyam[::-1]
+        hybm = hybm[::-1]
+    var_p = vertical.hybrid_log_linear_interpolation(
+        var(squeeze=1), hyam, hybm, ps, plev, p0
     )
 
     return var_p
@@ -152,21 +180,12 @@ def pressure_to_plevs(var, plev):
     var_plv = var.getLevel()
     if var_plv.units == "Pa":
         var_plv[:] = var_plv[:] / 100.0  # convert Pa to mb
-    levels_orig = MV2.array(var_plv[:])
-    levels_orig.setAxis(0, var_plv)
-    # grow 1d levels_orig to mv dimention
-    var, levels_orig = genutil.grower(var, levels_orig)
-    # levels_orig.info()
-    # logLinearInterpolation only takes positive down plevel:
-    # "I :      interpolation field (usually Pressure or depth)
-    # from TOP (level 0) to BOTTOM (last level), i.e P value
-    # going up with each level"
+    # The interpolation only takes positive down plevel, i.e. the pressure
+    # going up with each level.
     if var.getLevel()[0] > var.getLevel()[-1]:
         var = var(lev=slice(-1, None, -1))
-        levels_orig = levels_orig(lev=slice(-1, None, -1))
-    var_p = cdutil.vertical.logLinearInterpolation(
-        var(squeeze=1), levels_orig(squeeze=1), plev
-    )
+    levels_orig = np.asarray(var.getLevel()[:], dtype=np.float64)
+    var_p = vertical.log_linear_interpolation(var(squeeze=1), levels_orig, plev)
 
     return var_p
 
@@ -185,6 +204,74 @@ def select_region_lat_lon(region, var, parameter):
     return var_selected
 
 
+def get_land_ocean_frac(dataset, season):
+    """Get the land and ocean fractions for masking.
+
+    The fractions are read from the dataset if it has LANDFRAC and OCNFRAC,
+    otherwise from the default E3SM ne30 mask file. They're read once per
+    data source and season, and the most recently used ones are kept.
+    """
+    try:
+        key = (_get_land_ocean_frac_source(dataset, season), season)
+    except Exception:
+        return get_default_land_ocean_frac()
+
+    if key in _LAND_OCEAN_FRACS:
+        _LAND_OCEAN_FRACS.move_to_end(key)
+    else:
+        try:
+            _LAND_OCEAN_FRACS[key] = (
+                dataset.get_climo_variable("LANDFRAC", season),
+                dataset.get_climo_variable("OCNFRAC", season),
+            )
+        except Exception:
+            _LAND_OCEAN_FRACS[key] = None
+        while len(_LAND_OCEAN_FRACS) > MAX_CACHED_LAND_OCEAN_FRACS:
+            _LAND_OCEAN_FRACS.popitem(last=False)
+
+    land_ocean_frac = _LAND_OCEAN_FRACS[key]
+    if land_ocean_frac is None:
+        return get_default_land_ocean_frac()
+
+    return land_ocean_frac
+
+
+def _get_land_ocean_frac_source(dataset, season):
+    """Get the file, or the directory and years, that dataset reads from."""
+    if dataset.is_climo():
+        if dataset.test:
+            return (dataset.get_test_filename_climo(season),)
+
+        return (dataset.get_ref_filename_climo(season),)
+
+    if dataset.test:
+        data_path = dataset.parameters.test_data_path
+    else:
+        data_path = os.path.join(
+            dataset.parameters.reference_data_path,
+            getattr(dataset.parameters, "ref_name", ""),
+        )
+
+    return (data_path, dataset.get_start_and_end_years())
+
+
+def get_default_land_ocean_frac():
+    """
+    Get the land and ocean fractions from the default E3SM ne30 mask file,
+    which is only read once.
+    """
+    global _DEFAULT_LAND_OCEAN_FRAC
+
+    if _DEFAULT_LAND_OCEAN_FRAC is None:
+        mask_path = os.path.join(
+            e3sm_diags.INSTALL_PATH, "acme_ne30_ocean_land_mask.nc"
+        )
+        with cdms2.open(mask_path) as f:
+            _DEFAULT_LAND_OCEAN_FRAC = (f("LANDFRAC"), f("OCNFRAC"))
+
+    return _DEFAULT_LAND_OCEAN_FRAC
+
+
 def select_region(region, var, land_frac, ocean_frac, parameter):
     """Select desired regions from transient variables."""
     domain = None
@@ -196,13 +283,8 @@ def select_region(region, var, land_frac, ocean_frac, parameter):
             land_ocean_frac = ocean_frac
         region_value = regions_specs[region]["value"]  # type: ignore
 
-        land_ocean_frac = land_ocean_frac.regrid(
-            var.getGrid(),
-            regridTool=parameter.regrid_tool,
-            regridMethod=parameter.regrid_method,
-        )
-
-        var_domain = mask_by(var, land_ocean_frac, low_limit=region_value)
+        region_mask = _get_region_mask(var, land_ocean_frac, region_value, parameter)
+        var_domain = _apply_region_mask(var, region_mask)
     else:
         var_domain = var
 
@@ -218,6 +300,85 @@ def select_region(region, var, land_frac, ocean_frac, parameter):
     return var_domain_selected
 
 
+def _get_region_mask(var, land_ocean_frac, region_value, parameter):
+    """
+    Get the mask of the points of the grid of var where the land/ocean
+    fraction is below region_value.
+
+    The fraction is regridded to the grid of var once, and the mask is cached
+    for each fraction from get_land_ocean_frac(), rectilinear grid and region
+    value.
+    """
+    grid = var.getGrid()
+    frac_key = _get_land_ocean_frac_key(land_ocean_frac)
+    grid_key = regrid.get_grid_key(grid)
+    key = None
+    if frac_key is not None and grid_key is not None:
+        key = (
+            frac_key,
+            grid.shape,
+            grid_key,
+            region_value,
+            parameter.regrid_tool,
+            parameter.regrid_method,
+        )
+        if key in _REGION_MASKS:
+            _REGION_MASKS.move_to_end(key)
+            return _REGION_MASKS[key]
+
+    land_ocean_frac = regrid.regrid(
+        land_ocean_frac,
+        grid,
+        parameter.regrid_tool,
+        parameter.regrid_method,
+    )
+    # Points where the regridded fraction is missing aren't masked.
+    region_mask = ma.filled(land_ocean_frac < region_value, False)
+
+    if key is not None:
+        _REGION_MASKS[key] = region_mask
+        while len(_REGION_MASKS) > MAX_CACHED_REGION_MASKS:
+            _REGION_MASKS.popitem(last=False)
+
+    return region_mask
+
+
+def _get_land_ocean_frac_key(land_ocean_frac) -> Optional[Tuple]:
+    """
+    Get the source, season and name of a fraction returned by
+    get_land_ocean_frac(), or None if the fraction isn't one of them.
+    """
+    fracs = [(("default",), _DEFAULT_LAND_OCEAN_FRAC)]
+    fracs.extend(_LAND_OCEAN_FRACS.items())
+    for key, land_ocean_fracs in fracs:
+        if land_ocean_fracs is None:
+            continue
+        for name, frac in zip(["LANDFRAC", "OCNFRAC"], land_ocean_fracs):
+            if frac is land_ocean_frac:
+                return key + (name,)
+
+    return None
+
+
+def _apply_region_mask(var, region_mask):
+    """
+    Mask the points of var in region_mask. The new variable shares the data
+    of var instead of copying it.
+    """
+    mask = ma.getmaskarray(var) | region_mask
+    var_domain = cdms2.createVariable(
+        var,
+        mask=mask,
+        copy=0,
+        axes=var.getAxisList(),
+        grid=var.getGrid(),
+        id=var.id,
+        attributes=dict(var.attributes),
+    )
+
+    return var_domain
+
+
 def select_point(region, var):
     """Select desired point from transient variables."""
 
@@ -238,7 +399,10 @@ def select_point(region, var):
 
 
 def regrid_to_lower_res(mv1, mv2, regrid_tool, regrid_method):
-    """Regrid transient variable toward lower resolution of two variables."""
+    """Regrid transient variable toward lower resolution of two variables.
+
+    The regridders are cached per pair of grids, see regrid.regrid().
+    """
 
     axes1 = mv1.getAxisList()
     axes2 = mv2.getAxisList()
@@ -248,17 +412,13 @@ def regrid_to_lower_res(mv1, mv2, regrid_tool, regrid_method):
     if len(axes1[1]) <= len(axes2[1]):
         mv_grid = mv1.getGrid()
         mv1_reg = mv1
-        mv2_reg = mv2.regrid(
-            mv_grid, regridTool=regrid_tool, regridMethod=regrid_method
-        )
+        mv2_reg = regrid.regrid(mv2, mv_grid, regrid_tool, regrid_method)
         mv2_reg.units = mv2.units
 
     else:
         mv_grid = mv2.getGrid()
         mv2_reg = mv2
-        mv1_reg = mv1.regrid(
-            mv_grid, regridTool=regrid_tool, regridMethod=regrid_method
-        )
+        mv1_reg = regrid.regrid(mv1, mv_grid, regrid_tool, regrid_method)
         mv1_reg.units = mv1.units
 
     return mv1_reg, mv2_reg
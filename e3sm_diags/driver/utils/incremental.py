@@ -0,0 +1,216 @@
+"""
+A store of the reduced series of the timeseries sets, e.g. the annual regional
+means of area_mean_time_series or the Nino indices of enso_diags, so that a
+run only reads the years that were appended to the timeseries files since the
+previous run.
+
+The series are saved in the incremental_store directory of results_dir, one
+file for each set, variable, key (e.g. the region) and dataset. The years that
+are already in the store are assumed not to change. Remove the directory to
+compute the series from all of the years again.
+"""
+import collections
+import hashlib
+import json
+import os
+import tempfile
+
+import cdms2
+import numpy as np
+import numpy.ma as ma
+
+from e3sm_diags.logger import custom_logger
+
+logger = custom_logger(__name__)
+
+# The directory of results_dir with the stored series.
+STORE_DIR = "incremental_store"
+# The version of the stored series, increased when the format changes so
+# series stored by an older version are computed again.
+STORE_VERSION = 1
+
+
+def get_series(dataset, var, keys, reduce):
+    """
+    Get the reduced series of var in dataset for each of the keys, e.g. the
+    annual means of var over each region.
+
+    reduce(dataset) reads var from the timeseries files of the years of
+    dataset and returns a dict of the series for each key, with time as the
+    first axis. If incremental_timeseries is set, the series stored by a
+    previous run are extended with the series of only the years after them
+    and stored again. Otherwise, reduce() is called for all of the years.
+    """
+    parameters = dataset.parameters
+    if not getattr(parameters, "incremental_timeseries", False):
+        return reduce(dataset)
+
+    start_yr, end_yr, _ = dataset.get_start_and_end_years()
+    start_yr = int(start_yr)
+    end_yr = int(end_yr)
+
+    paths = collections.OrderedDict(
+        (key, get_store_path(dataset, var, key)) for key in keys
+    )
+    stored = collections.OrderedDict(
+        (key, load_series(path, start_yr, end_yr)) for key, path in paths.items()
+    )
+
+    # The stored series are only extended if all of them can be.
+    if all(series is not None for series, _ in stored.values()):
+        read_start_yr = min(stored_end_yr for _, stored_end_yr in stored.values()) + 1
+    else:
+        read_start_yr = start_yr
+
+    if read_start_yr > end_yr:
+        logger.info(
+            "Using the stored {} series of {} to {} for {}.".format(
+                var, start_yr, end_yr, ", ".join(str(key) for key in keys)
+            )
+        )
+        return collections.OrderedDict(
+            (key, series) for key, (series, _) in stored.items()
+        )
+
+    if read_start_yr > start_yr:
+        logger.info(
+            "Extending the stored {} series with the years {} to {}.".format(
+                var, read_start_yr, end_yr
+            )
+        )
+        new_series = reduce(dataset.get_dataset_for_years(read_start_yr, end_yr))
+    else:
+        new_series = reduce(dataset)
+
+    all_series = collections.OrderedDict()
+    for key, path in paths.items():
+        if read_start_yr > start_yr:
+            series = append_series(
+                select_years(stored[key][0], start_yr, read_start_yr - 1),
+                new_series[key],
+            )
+        else:
+            series = new_series[key]
+
+        save_series(path, series, start_yr, end_yr)
+        all_series[key] = series
+
+    return all_series
+
+
+def get_store_path(dataset, var, key):
+    """
+    Get the path of the stored series of var for the key in dataset.
+
+    The name of the file has a hash of everything that identifies the series
+    except the years, so changing the set, the data or the reference
+    doesn't reuse the series of another one.
+    """
+    parameters = dataset.parameters
+    set_name = getattr(parameters, "current_set", parameters.sets[0])
+    label = "ref" if dataset.ref else "test"
+    identity = [
+        STORE_VERSION,
+        set_name,
+        var,
+        str(key),
+        label,
+        os.path.abspath(dataset._get_timeseries_data_path()),
+        getattr(parameters, "ref_name", "") if dataset.ref else "",
+    ]
+    sha = hashlib.sha1(json.dumps(identity).encode()).hexdigest()[:16]
+
+    return os.path.join(
+        parameters.results_dir,
+        STORE_DIR,
+        set_name,
+        "{}-{}-{}_{}.nc".format(var, key, label, sha),
+    )
+
+
+def load_series(path, start_yr, end_yr):
+    """
+    Load the stored series in path and return it and its last year, with only
+    the years from start_yr to end_yr. (None, None) is returned if there's
+    no stored series or it doesn't have the years from start_yr on.
+    """
+    if not os.path.exists(path):
+        return None, None
+
+    fin = cdms2.open(path)
+    try:
+        series = fin(fin.series_id)
+        stored_start_yr = int(fin.start_yr)
+        stored_end_yr = int(fin.end_yr)
+    except Exception:
+        logger.exception("Ignoring the stored series in {}".format(path))
+        return None, None
+    finally:
+        fin.close()
+
+    if stored_start_yr > start_yr or stored_end_yr < start_yr:
+        return None, None
+
+    stored_end_yr = min(stored_end_yr, end_yr)
+    return select_years(series, start_yr, stored_end_yr), stored_end_yr
+
+
+def save_series(path, series, start_yr, end_yr):
+    """
+    Store the series of the years start_yr to end_yr in path. The file is
+    written to a temporary file first, so other runs never read a partial
+    file.
+    """
+    store_dir = os.path.dirname(path)
+    os.makedirs(store_dir, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".nc", dir=store_dir)
+    os.close(fd)
+    try:
+        fout = cdms2.open(tmp_path, "w")
+        fout.write(series)
+        fout.series_id = series.id
+        fout.start_yr = str(start_yr)
+        fout.end_yr = str(end_yr)
+        fout.close()
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def select_years(series, start_yr, end_yr):
+    """
+    Get the timesteps of the series in the years start_yr to end_yr.
+    """
+    years = np.array([t.year for t in series.getTime().asComponentTime()])
+    indices = np.where((years >= start_yr) & (years <= end_yr))[0]
+
+    return series[indices[0] : indices[-1] + 1]
+
+
+def append_series(series, new_series):
+    """
+    Append the timesteps of new_series to the series. The times of new_series
+    are converted to the units and calendar of the series.
+    """
+    time = series.getTime()
+    new_time = new_series.getTime().clone()
+    new_time.toRelativeTime(time.units, time.getCalendar())
+
+    all_time = cdms2.createAxis(np.concatenate([time[:], new_time[:]]))
+    bounds = time.getBounds()
+    new_bounds = new_time.getBounds()
+    if bounds is not None and new_bounds is not None:
+        all_time.setBounds(np.concatenate([bounds, new_bounds]))
+    all_time.designateTime()
+    all_time.id = time.id
+    all_time.units = time.units
+    all_time.setCalendar(time.getCalendar())
+
+    return cdms2.createVariable(
+        ma.concatenate([series.asma(), new_series.asma()]),
+        axes=[all_time] + series.getAxisList()[1:],
+        id=series.id,
+        attributes=dict(series.attributes),
+    )
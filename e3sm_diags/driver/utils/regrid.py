@@ -0,0 +1,166 @@
+"""
+Regridding with cached regridders.
+
+Regridding a variable with ``mv.regrid()`` builds a cdms2 regridder for the
+source and destination grids, e.g. the ESMF conservative weights, for every
+variable. The regridders built here are cached for each pair of grids and each
+source mask, and are reused by all of the variables on the same grids, which
+gives the same result as ``mv.regrid()`` without computing the weights again.
+"""
+import collections
+import hashlib
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+import numpy.ma as ma
+from cdms2.mvCdmsRegrid import CdmsRegrid, getMinHorizontalMask
+
+if TYPE_CHECKING:
+    from cdms2.tvariable import TransientVariable
+
+# The maximum number of regridders kept in memory by each process. The least
+# recently used regridder is removed first.
+MAX_CACHED_REGRIDDERS = 16
+
+# The regridders built in this process, keyed by the fingerprints of the source
+# and destination grids, the regrid tool and method, the dtype of the data and
+# the fingerprint of the source mask.
+_REGRIDDERS: "collections.OrderedDict[tuple, CdmsRegrid]" = collections.OrderedDict()
+
+
+def regrid(
+    mv: "TransientVariable", grid, regrid_tool: str, regrid_method: str
+) -> "TransientVariable":
+    """Regrid a variable to the grid, like ``mv.regrid()``.
+
+    With ESMF, the regridder between rectilinear latitude/longitude grids is
+    built like ``mv.regrid()`` builds it and is cached, so it's reused for
+    the variables with the same grids, mask and dtype. Any other regridding
+    is done with ``mv.regrid()``.
+
+    Parameters
+    ----------
+    mv : TransientVariable
+        The variable, with latitude and longitude as the last two axes.
+    grid : cdms2.grid.AbstractRectGrid
+        The destination grid.
+    regrid_tool : str
+        The regrid tool, e.g. "esmf".
+    regrid_method : str
+        The regrid method, e.g. "conservative".
+
+    Returns
+    -------
+    TransientVariable
+        The regridded variable.
+    """
+    src_key = get_grid_key(mv.getGrid())
+    dst_key = get_grid_key(grid)
+    if (
+        regrid_tool != "esmf"
+        or mv.getOrder()[-2:] != "yx"
+        or src_key is None
+        or dst_key is None
+    ):
+        return mv.regrid(grid, regridTool=regrid_tool, regridMethod=regrid_method)
+
+    # The same source mask and keywords as mv.regrid().
+    src_grid_mask = None
+    if np.any(ma.getmaskarray(mv)):
+        src_grid_mask = getMinHorizontalMask(mv)
+    keywords = {}
+    if mv.getAxis(-1).attributes.get("topology") == "circular":
+        keywords["periodicity"] = 1
+
+    key = (
+        src_key,
+        dst_key,
+        regrid_tool,
+        regrid_method,
+        np.dtype(mv.dtype).str,
+        _get_mask_fingerprint(src_grid_mask),
+        tuple(sorted(keywords.items())),
+    )
+    if key in _REGRIDDERS:
+        _REGRIDDERS.move_to_end(key)
+        regridder = _REGRIDDERS[key]
+    else:
+        regridder = CdmsRegrid(
+            mv.getGrid(),
+            grid,
+            dtype=mv.dtype,
+            regridMethod=regrid_method,
+            regridTool=regrid_tool,
+            srcGridMask=src_grid_mask,
+            srcGridAreas=None,
+            dstGridMask=None,
+            dstGridAreas=None,
+            **keywords,
+        )
+        _REGRIDDERS[key] = regridder
+        while len(_REGRIDDERS) > MAX_CACHED_REGRIDDERS:
+            _REGRIDDERS.popitem(last=False)
+
+    return regridder(mv, **keywords)
+
+
+def get_rect_grid_bounds(grid) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Get the (lat, lon) bounds of a rectilinear grid with the shape (n, 2),
+    or None if the grid isn't rectilinear.
+    """
+    if grid is None:
+        return None
+
+    lat = grid.getLatitude()
+    lon = grid.getLongitude()
+    if lat is None or lon is None or len(lat.shape) != 1 or len(lon.shape) != 1:
+        return None
+
+    lat_bounds = lat.getBounds()
+    if lat_bounds is None:
+        lat_bounds = lat.genGenericBounds()
+    lon_bounds = lon.getBounds()
+    if lon_bounds is None:
+        lon_bounds = lon.genGenericBounds()
+
+    return (
+        np.asarray(lat_bounds, dtype=np.float64),
+        np.asarray(lon_bounds, dtype=np.float64),
+    )
+
+
+def get_grid_key(grid) -> Optional[str]:
+    """
+    Get the fingerprint of a rectilinear grid, or None if the grid isn't
+    rectilinear.
+    """
+    bounds = get_rect_grid_bounds(grid)
+    if bounds is None:
+        return None
+
+    return get_grid_fingerprint(*bounds)
+
+
+def get_grid_fingerprint(lat_bounds: np.ndarray, lon_bounds: np.ndarray) -> str:
+    """Get a fingerprint that identifies a grid by its cell bounds."""
+    sha = hashlib.sha1()
+    for bounds in [lat_bounds, lon_bounds]:
+        bounds = np.ascontiguousarray(bounds, dtype=np.float64)
+        sha.update(str(bounds.shape).encode())
+        sha.update(bounds.tobytes())
+
+    return sha.hexdigest()
+
+
+def _get_mask_fingerprint(mask: Optional[np.ndarray]) -> str:
+    """Get a fingerprint that identifies a 2D mask, or "" for no mask."""
+    if mask is None:
+        return ""
+
+    mask = np.asarray(mask, dtype=bool)
+    sha = hashlib.sha1()
+    sha.update(str(mask.shape).encode())
+    sha.update(np.packbits(mask).tobytes())
+
+    return sha.hexdigest()
@@ -0,0 +1,279 @@
+"""
+Log-linear interpolation to pressure levels.
+
+cdutil.vertical.logLinearInterpolation loops over the pressure levels and the
+levels of the data with masked array operations, for every variable. The
+levels that bracket each pressure level and the log-pressure weights only
+depend on the pressure field, so here they're computed once per pressure field
+and cached. Interpolating a variable onto the pressure levels is then a single
+gather and blend, with the same results as logLinearInterpolation.
+"""
+import collections
+import hashlib
+from typing import TYPE_CHECKING, Tuple
+
+import cdms2
+import numpy as np
+import numpy.ma as ma
+
+if TYPE_CHECKING:
+    from cdms2.tvariable import TransientVariable
+
+# The maximum number of pressure fields to keep the weights of.
+MAX_CACHED_WEIGHTS = 16
+
+# The (indices, weights, valid) of the most recently used pressure fields,
+# keyed by the fingerprint of the pressure field, or of the arrays it's
+# computed from, and the pressure levels.
+_WEIGHTS: "collections.OrderedDict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]" = (
+    collections.OrderedDict()
+)
+
+
+def log_linear_interpolation(
+    var: "TransientVariable", pressure: np.ndarray, plevs, units: str = "mb"
+) -> "TransientVariable":
+    """Interpolate var to the pressure levels, linearly in log(pressure).
+
+    Points where a pressure level isn't between two levels of var, e.g.
+    below the surface, are masked.
+
+    Parameters
+    ----------
+    var : TransientVariable
+        The variable, with a level axis.
+    pressure : np.ndarray
+        The pressure of the levels of var, increasing from the first (top)
+        level to the last (bottom) one, with the shape (lev, ...). ... is
+        either the shape of var without the level axis, or empty if the
+        pressure is the same everywhere.
+    plevs : list
+        The pressure levels to interpolate to, in the units of pressure.
+    units : str, optional
+        The units of pressure, by default "mb".
+
+    Returns
+    -------
+    TransientVariable
+        The variable on the pressure levels, with a "plev" level axis.
+    """
+    pressure = np.asarray(ma.filled(pressure, np.nan), dtype=np.float64)
+    key = _get_fingerprint("pressure", pressure, plevs)
+
+    return _interpolate_variable(var, key, lambda: pressure, plevs, units)
+
+
+def hybrid_log_linear_interpolation(
+    var: "TransientVariable",
+    hyam: np.ndarray,
+    hybm: np.ndarray,
+    ps: np.ndarray,
+    plevs,
+    p0: float = 1000.0,
+    units: str = "mb",
+) -> "TransientVariable":
+    """Interpolate var on hybrid levels to the pressure levels.
+
+    The pressure of the levels is hyam * p0 + hybm * ps, like the pressure
+    field of log_linear_interpolation(). The weights are cached by hyam, hybm
+    and ps, so the pressure field is only computed when they're not cached.
+
+    Parameters
+    ----------
+    var : TransientVariable
+        The variable, with a level axis.
+    hyam : np.ndarray
+        The hybrid A coefficients of the levels of var, from the top level to
+        the bottom one.
+    hybm : np.ndarray
+        The hybrid B coefficients of the levels of var.
+    ps : np.ndarray
+        The surface pressure, with the shape of var without the level axis,
+        in the units of p0.
+    plevs : list
+        The pressure levels to interpolate to, in the units of p0.
+    p0 : float, optional
+        The reference pressure, by default 1000.0 mb.
+    units : str, optional
+        The units of the pressure, by default "mb".
+
+    Returns
+    -------
+    TransientVariable
+        The variable on the pressure levels, with a "plev" level axis.
+    """
+    hyam = np.asarray(hyam, dtype=np.float64)
+    hybm = np.asarray(hybm, dtype=np.float64)
+    ps = np.asarray(ma.filled(ps, np.nan), dtype=np.float64)
+    key = _get_fingerprint("hybrid", hyam, hybm, ps, [p0], plevs)
+
+    return _interpolate_variable(
+        var, key, lambda: get_hybrid_pressure(hyam, hybm, ps, p0), plevs, units
+    )
+
+
+def get_hybrid_pressure(
+    hyam: np.ndarray, hybm: np.ndarray, ps: np.ndarray, p0: float
+) -> np.ndarray:
+    """
+    Get the pressure of the hybrid levels, with the shape (lev, ...), where
+    ... is the shape of ps.
+    """
+    pressure = np.multiply.outer(hyam, np.full(ps.shape, p0))
+    pressure += np.multiply.outer(hybm, ps)
+
+    return pressure
+
+
+def _interpolate_variable(
+    var: "TransientVariable", key: str, get_pressure, plevs, units: str
+) -> "TransientVariable":
+    """
+    Interpolate var to the pressure levels with the weights cached for key,
+    computed from the pressure field get_pressure() returns if they're not
+    cached yet.
+    """
+    order = var.getOrder()
+    var_z = var(order="z...")
+    num_levels = var_z.shape[0]
+
+    indices, weights, valid = get_log_linear_weights(
+        key, lambda: get_pressure().reshape(num_levels, -1), plevs
+    )
+
+    data = _interpolate(var_z.asma().reshape(num_levels, -1), indices, weights, valid)
+    data = data.reshape((len(plevs),) + var_z.shape[1:])
+
+    plev = cdms2.createAxis(np.array(plevs, dtype=np.float64))
+    plev.designateLevel()
+    plev.id = "plev"
+    plev.units = units
+
+    var_p = cdms2.createVariable(
+        data,
+        axes=[plev] + var_z.getAxisList()[1:],
+        id=var.id,
+        attributes=dict(var.attributes),
+    )
+
+    return var_p(order=order)
+
+
+def get_log_linear_weights(
+    key: str, get_pressure, plevs
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the weights cached for key to interpolate data to the pressure levels,
+    or compute them from the pressure field with the shape (lev, points) that
+    get_pressure() returns if they're not cached yet.
+
+    See compute_log_linear_weights() for the weights.
+    """
+    if key in _WEIGHTS:
+        _WEIGHTS.move_to_end(key)
+        return _WEIGHTS[key]
+
+    weights = compute_log_linear_weights(get_pressure(), plevs)
+
+    _WEIGHTS[key] = weights
+    while len(_WEIGHTS) > MAX_CACHED_WEIGHTS:
+        _WEIGHTS.popitem(last=False)
+
+    return weights
+
+
+def compute_log_linear_weights(
+    pressure: np.ndarray, plevs
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute the weights to interpolate to the pressure levels.
+
+    Parameters
+    ----------
+    pressure : np.ndarray
+        The pressure of the levels, increasing along the first axis, with the
+        shape (lev, points).
+    plevs : list
+        The pressure levels to interpolate to.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray]
+        The indices, weights and valid points, each with the shape
+        (len(plevs), points). A pressure level is between the levels
+        indices - 1 and indices, and the interpolated value is
+        data[indices - 1] + (data[indices] - data[indices - 1]) * weights.
+        Points without levels on both sides of the pressure level aren't
+        valid.
+    """
+    num_levels, num_points = pressure.shape
+    plevs = np.asarray(plevs, dtype=np.float64)
+
+    indices = np.empty((len(plevs), num_points), dtype=np.intp)
+    weights = np.empty((len(plevs), num_points), dtype=np.float64)
+    valid = np.empty((len(plevs), num_points), dtype=bool)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pressure = np.log(pressure)
+        for n, plev in enumerate(plevs):
+            # The first level with a pressure greater than plev, i.e. below
+            # it. If plev is equal to a level, that level is the one above.
+            index = np.clip(np.sum(pressure <= plev, axis=0), 1, num_levels - 1)
+            below = index[np.newaxis]
+            above = below - 1
+            p_below = np.take_along_axis(pressure, below, 0)[0]
+            p_above = np.take_along_axis(pressure, above, 0)[0]
+            log_below = np.take_along_axis(log_pressure, below, 0)[0]
+            log_above = np.take_along_axis(log_pressure, above, 0)[0]
+
+            is_valid = (p_above <= plev) & (p_below >= plev)
+            log_diff = log_below - log_above
+            weight = np.where(log_diff != 0, (np.log(plev) - log_above) / log_diff, 1.0)
+
+            indices[n] = index
+            weights[n] = np.where(is_valid, weight, 0.0)
+            valid[n] = is_valid
+
+    return indices, weights, valid
+
+
+def _interpolate(
+    data: ma.MaskedArray, indices: np.ndarray, weights: np.ndarray, valid: np.ndarray
+) -> ma.MaskedArray:
+    """
+    Interpolate the data with the shape (lev, points) with the weights from
+    compute_log_linear_weights(), which can have a single point to apply to
+    all points. The result has the np.result_type() of the data and weights.
+    """
+    shape = (indices.shape[0], data.shape[1])
+    indices = np.broadcast_to(indices, shape)
+    weights = np.broadcast_to(weights, shape)
+    valid = np.broadcast_to(valid, shape)
+
+    values = ma.getdata(data)
+    mask = ma.getmaskarray(data)
+
+    below = np.take_along_axis(values, indices, 0)
+    above = np.take_along_axis(values, indices - 1, 0)
+    result = above + (below - above) * weights
+
+    result_mask = (
+        ~valid
+        | np.take_along_axis(mask, indices, 0)
+        | np.take_along_axis(mask, indices - 1, 0)
+    )
+
+    return ma.array(result, mask=result_mask, dtype=np.result_type(values, weights))
+
+
+def _get_fingerprint(kind: str, *arrays) -> str:
+    """
+    Get a fingerprint that identifies the kind of pressure field and the
+    arrays it's computed from, and the pressure levels.
+    """
+    sha = hashlib.sha1(kind.encode())
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        sha.update(str(array.shape).encode())
+        sha.update(array.tobytes())
+
+    return sha.hexdigest()
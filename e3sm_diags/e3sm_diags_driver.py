@@ -2,16 +2,21 @@
 # The above line is needed for `test_all_sets.test_all_sets_mpl`.
 # Otherwise, OSError: [Errno 8] Exec format error: 'e3sm_diags_driver.py'.
 
+import collections
+import concurrent.futures
+import copy
 import importlib
+import itertools
+import multiprocessing
 import os
 import subprocess
 import sys
 import traceback
-from typing import Dict, List, Tuple
-
-import dask
+from typing import Dict, List, Optional, Tuple
 
 import e3sm_diags
+from e3sm_diags import plot
+from e3sm_diags.driver.utils import dataset
 from e3sm_diags.logger import custom_logger
 from e3sm_diags.parameter.core_parameter import CoreParameter
 from e3sm_diags.parser import SET_TO_PARSER
@@ -316,8 +321,14 @@ def _run_serially(parameters: List[CoreParameter]) -> List[CoreParameter]:
     """
     results = []
 
-    for p in parameters:
-        results.append(run_diag(p))
+    # The plots are rendered by the render pool while the next diagnostics
+    # are computed, and all of them are saved before returning.
+    plot.start_render_pool(getattr(parameters[0], "num_render_workers", 0))
+    try:
+        for p in parameters:
+            results.append(run_diag(p))
+    finally:
+        plot.stop_render_pool()
 
     # `results` becomes a list of lists of parameters so it needs to be
     # collapsed a level.
@@ -326,14 +337,21 @@ def _run_serially(parameters: List[CoreParameter]) -> List[CoreParameter]:
     return collapsed_results
 
 
-def _run_with_dask(parameters: List[CoreParameter]) -> List[CoreParameter]:
-    """Run diagnostics with the parameters in parallel using Dask.
+def _run_in_parallel(parameters: List[CoreParameter]) -> List[CoreParameter]:
+    """Run diagnostics with the parameters in parallel using the task scheduler.
 
-    This function passes ``run_diag`` to ``dask.bag.map``, which gets executed
-    in parallel with ``.compute``.
+    Each CoreParameter object is expanded into fine-grained tasks, one per
+    (set, variable, season, plev, region) combination along the attributes
+    listed in its ``granulate`` attribute. The tasks are ordered
+    longest-first using ``_estimate_task_cost`` and submitted to a process
+    pool. Idle workers pull the next pending task from the pool's shared
+    queue, so expensive tasks start early and cheap tasks fill the gaps at
+    the end of the run. The task results are merged back into one
+    CoreParameter object per (parameter, set), which is what
+    ``create_viewer`` expects.
 
     The first CoreParameter object's `num_workers` attribute is used to set
-    the number of workers for ``.compute``.
+    the number of worker processes.
 
     Parameters
     ----------
@@ -345,14 +363,11 @@ def _run_with_dask(parameters: List[CoreParameter]) -> List[CoreParameter]:
     List[CoreParameter]
         The list of CoreParameter objects with results from the diagnostic run.
 
-    Notes
-    -----
-    https://docs.dask.org/en/stable/generated/dask.bag.map.html
-    https://docs.dask.org/en/stable/generated/dask.dataframe.DataFrame.compute.html
+    Raises
+    ------
+    ValueError
+        If the `num_workers` attribute is not set on the first CoreParameter.
     """
-    bag = dask.bag.from_sequence(parameters)
-    config = {"scheduler": "processes", "context": "fork"}
-
     num_workers = getattr(parameters[0], "num_workers", None)
     if num_workers is None:
         raise ValueError(
@@ -361,14 +376,272 @@ def _run_with_dask(parameters: List[CoreParameter]) -> List[CoreParameter]:
             "again."
         )
 
-    with dask.config.set(config):
-        results = bag.map(run_diag).compute(num_workers=num_workers)
+    tasks = _expand_tasks(parameters)
+    ordered_task_idxs = sorted(
+        range(len(tasks)),
+        key=lambda task_idx: _estimate_task_cost(tasks[task_idx][2]),
+        reverse=True,
+    )
+    logger.info(
+        f"Scheduling {len(tasks)} tasks from {len(parameters)} parameters on "
+        f"{num_workers} workers."
+    )
+
+    # The result of each task, in the order of `tasks`. A task whose worker
+    # failed, e.g. a BrokenProcessPool after a worker was killed, has no
+    # results like a task whose driver failed.
+    task_outputs: List[List[CoreParameter]] = [[] for _ in tasks]
+    # The render pool is started before the workers are forked, so they send
+    # their plots to it and the plots of all of the tasks are rendered by the
+    # same `num_render_workers` processes. They're all saved before returning.
+    plot.start_render_pool(getattr(parameters[0], "num_render_workers", 0))
+    try:
+        context = multiprocessing.get_context("fork")
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers, mp_context=context
+        ) as executor:
+            futures = {
+                executor.submit(run_diag, tasks[task_idx][2]): task_idx
+                for task_idx in ordered_task_idxs
+            }
+            for future in concurrent.futures.as_completed(futures):
+                task_idx = futures[future]
+                try:
+                    task_outputs[task_idx] = future.result()
+                except Exception:
+                    _, set_name, task_param = tasks[task_idx]
+                    logger.exception(
+                        f"Error in the task for the {set_name} set, "
+                        f"variables: {task_param.variables}.",
+                        exc_info=True,
+                    )
+    finally:
+        plot.stop_render_pool()
+
+    # The results are grouped in the order of `tasks`, so the merged parameter
+    # doesn't depend on which of the tasks completed first.
+    task_results: Dict[
+        Tuple[int, str], List[List[CoreParameter]]
+    ] = collections.defaultdict(list)
+    for (param_idx, set_name, _), output in zip(tasks, task_outputs):
+        task_results[(param_idx, set_name)].append(output)
 
-    # `results` becomes a list of lists of parameters so it needs to be
-    # collapsed a level.
-    collapsed_results = _collapse_results(results)
+    results = []
+    for param_idx, parameter in enumerate(parameters):
+        for set_name in parameter.sets:
+            merged = _merge_task_results(
+                parameter, set_name, task_results[(param_idx, set_name)]
+            )
+            if merged is not None:
+                results.append(merged)
+
+    return results
 
-    return collapsed_results
+
+def _expand_tasks(
+    parameters: List[CoreParameter],
+) -> List[Tuple[int, str, CoreParameter]]:
+    """Expands the parameters into fine-grained diagnostic tasks.
+
+    A task is a copy of a CoreParameter object with a single set and a single
+    value for each of the attributes in its ``granulate`` attribute (e.g.,
+    variables, seasons, plevs and regions). Attributes that are not
+    granulated for a set (e.g., ``plevs`` for ``zonal_mean_2d``) are kept
+    intact, because the driver needs all of their values at once. The
+    seasons are also kept together for the sets that compute them in one
+    pass over the data, see ``_batches_seasons``.
+
+    Parameters
+    ----------
+    parameters : List[CoreParameter]
+        The list of CoreParameter objects to expand.
+
+    Returns
+    -------
+    List[Tuple[int, str, CoreParameter]]
+        A list of (index of the original parameter, set name, task parameter)
+        tuples.
+    """
+    tasks = []
+
+    for param_idx, parameter in enumerate(parameters):
+        # Empty lists (e.g., `plevs` for a 2D variable) are kept as is so the
+        # task still runs once.
+        granulated = {
+            attr: [[value] for value in getattr(parameter, attr)]
+            for attr in parameter.granulate
+            if isinstance(getattr(parameter, attr, None), list)
+            and len(getattr(parameter, attr)) > 1
+        }
+
+        for set_name in parameter.sets:
+            set_granulated = {
+                attr: values
+                for attr, values in granulated.items()
+                if attr != "seasons" or not _batches_seasons(parameter, set_name)
+            }
+
+            for values in itertools.product(*set_granulated.values()):
+                task_param = copy.deepcopy(parameter)
+                task_param.sets = [set_name]
+
+                for attr, value in zip(set_granulated.keys(), values):
+                    setattr(task_param, attr, value)
+
+                tasks.append((param_idx, set_name, task_param))
+
+    return tasks
+
+
+# Sets whose drivers compute all of the seasons in one pass over the data,
+# e.g. the diurnal cycle composites of every season from one read of the
+# timeseries.
+SETS_WITH_BATCHED_SEASONS = ["diurnal_cycle", "arm_diags"]
+
+
+def _batches_seasons(parameter: CoreParameter, set_name: str) -> bool:
+    """Checks if the driver of a set computes the seasons in one pass.
+
+    The seasons are computed in one pass for the sets in
+    ``SETS_WITH_BATCHED_SEASONS``, and for any set with timeseries inputs,
+    whose climatologies of all of the seasons reuse the same monthly sums.
+    Splitting them into tasks would read the data once per season.
+
+    Parameters
+    ----------
+    parameter : CoreParameter
+        The CoreParameter object to expand.
+    set_name : str
+        The name of the set.
+
+    Returns
+    -------
+    bool
+        True if the seasons are kept together in the tasks of the set.
+    """
+    return (
+        set_name in SETS_WITH_BATCHED_SEASONS
+        or getattr(parameter, "test_timeseries_input", False)
+        or getattr(parameter, "ref_timeseries_input", False)
+    )
+
+
+# Relative cost of a single task for each set, used to order the tasks
+# longest-first. Sets that read long timeseries or loop over many storms,
+# gauges or sites are more expensive than a single 2D climatology map.
+SET_TO_TASK_COST = {
+    "zonal_mean_xy": 1.0,
+    "zonal_mean_2d": 4.0,
+    "zonal_mean_2d_stratosphere": 4.0,
+    "meridional_mean_2d": 4.0,
+    "lat_lon": 1.0,
+    "polar": 1.0,
+    "area_mean_time_series": 6.0,
+    "cosp_histogram": 1.0,
+    "enso_diags": 8.0,
+    "qbo": 4.0,
+    "streamflow": 6.0,
+    "diurnal_cycle": 4.0,
+    "arm_diags": 4.0,
+    "tc_analysis": 10.0,
+    "annual_cycle_zonal_mean": 3.0,
+    "lat_lon_land": 1.0,
+    "lat_lon_river": 1.0,
+    "aerosol_aeronet": 1.0,
+    "aerosol_budget": 2.0,
+}
+
+
+def _estimate_task_cost(task_param: CoreParameter) -> float:
+    """Estimates the relative cost of running a diagnostic task.
+
+    The estimate only needs to rank tasks, not predict their runtime. It
+    starts from the cost of the set and scales it by the work that is known
+    before any data is read: the number of pressure levels to interpolate to,
+    the number of seasons, regions and variables in the task, whether the
+    climatology must be computed from timeseries files, and whether the
+    region requires a land/ocean mask.
+
+    Parameters
+    ----------
+    task_param : CoreParameter
+        The task CoreParameter object, which has a single set.
+
+    Returns
+    -------
+    float
+        The relative cost of the task.
+    """
+    cost = SET_TO_TASK_COST.get(task_param.sets[0], 1.0)
+
+    # Variables with a z-axis require hybrid-to-pressure interpolation.
+    plevs = getattr(task_param, "plevs", [])
+    if plevs:
+        cost *= 2.0 + 0.25 * len(plevs)
+
+    for attr in ["variables", "seasons", "regions"]:
+        cost *= max(len(getattr(task_param, attr, [])), 1)
+
+    if getattr(task_param, "test_timeseries_input", False):
+        cost *= 2.0
+    if getattr(task_param, "ref_timeseries_input", False):
+        cost *= 2.0
+
+    if any(
+        "land" in region or "ocean" in region
+        for region in getattr(task_param, "regions", [])
+    ):
+        cost *= 1.5
+
+    return cost
+
+
+def _merge_task_results(
+    parameter: CoreParameter,
+    set_name: str,
+    task_results: List[List[CoreParameter]],
+) -> Optional[CoreParameter]:
+    """Merges the results of the tasks for a parameter and set.
+
+    The merged CoreParameter object has the original values of the granulated
+    attributes, so the viewers find every output file produced by the tasks.
+    The ``viewer_descr`` attribute of all of the tasks is combined.
+
+    Parameters
+    ----------
+    parameter : CoreParameter
+        The original CoreParameter object the tasks were expanded from.
+    set_name : str
+        The name of the set the tasks ran.
+    task_results : List[List[CoreParameter]]
+        The results of ``run_diag`` for each of the tasks.
+
+    Returns
+    -------
+    Optional[CoreParameter]
+        The merged CoreParameter object, or None if any of the tasks failed.
+        This matches running the parameter as a whole, where an error in
+        the driver drops the parameter from the results.
+    """
+    if not task_results or any(len(result) == 0 for result in task_results):
+        logger.error(
+            f"Not all tasks for the {set_name} set completed successfully, "
+            f"variables: {parameter.variables}."
+        )
+        return None
+
+    merged = copy.deepcopy(task_results[0][0])
+    merged.sets = list(parameter.sets)
+    merged.current_set = set_name
+
+    for attr in parameter.granulate:
+        if hasattr(parameter, attr):
+            setattr(merged, attr, copy.deepcopy(getattr(parameter, attr)))
+
+    for result in task_results[1:]:
+        merged.viewer_descr.update(result[0].viewer_descr)
+
+    return merged
 
 
 def _collapse_results(parameters: List[List[CoreParameter]]) -> List[CoreParameter]:
@@ -413,10 +686,16 @@ def main(parameters=[]):
     if not parameters[0].no_viewer:  # Only save provenance for full runs.
         save_provenance(parameters[0].results_dir, parser)
 
+    # The variable cache is shared by all of the Datasets of a process, so its
+    # size is set once for the run, before the workers are forked.
+    dataset.variable_cache.max_bytes = getattr(
+        parameters[0], "variable_cache_max_bytes", dataset.VARIABLE_CACHE_MAX_BYTES
+    )
+
     # Perform the diagnostic run
     # --------------------------
     if parameters[0].multiprocessing:
-        parameters_results = _run_with_dask(parameters)
+        parameters_results = _run_in_parallel(parameters)
     else:
         parameters_results = _run_serially(parameters)
 
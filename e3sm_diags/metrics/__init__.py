@@ -1,11 +1,18 @@
+from typing import Dict, Optional, Tuple
+
 import cdutil
 import genutil
 import numpy
 
+from e3sm_diags.driver.utils import regrid
 from e3sm_diags.logger import custom_logger
 
 logger = custom_logger(__name__)
 
+# The latitude and longitude area weights of each grid, keyed by the
+# fingerprint of the grid.
+_AREA_WEIGHTS: Dict[str, Tuple[numpy.ndarray, numpy.ndarray]] = {}
+
 
 def corr(model, obs, axis="xy"):
     corr = -numpy.infty
@@ -48,3 +55,121 @@ def std(variable, axis="xy"):
         logger.error(err)
 
     return std
+
+
+def get_stats(variable) -> Dict[str, float]:
+    """Get the min, max, area-weighted mean and std of a variable.
+
+    For variables on a latitude/longitude grid, the weighted statistics are
+    computed together from the cached area weights of the grid. Otherwise,
+    they're computed with cdutil and genutil.
+    """
+    stats = {"min": min_cdms(variable), "max": max_cdms(variable)}
+
+    weights = get_area_weights(variable)
+    if weights is None:
+        stats["mean"] = float(mean(variable))
+        stats["std"] = std(variable)
+        return stats
+
+    data, valid = _get_data_and_valid(variable)
+    num, sum_x = _weighted_sums([valid, data], weights)
+    if num == 0:
+        stats["mean"] = stats["std"] = float("nan")
+        return stats
+
+    mean_x = sum_x / num
+    centered = numpy.where(valid, data - mean_x, 0.0)
+    (sum_xx,) = _weighted_sums([centered * centered], weights)
+
+    stats["mean"] = float(mean_x)
+    stats["std"] = float(numpy.sqrt(sum_xx / num))
+
+    return stats
+
+
+def get_pair_stats(model, obs) -> Dict[str, float]:
+    """Get the area-weighted rmse and corr of two variables on the same grid.
+
+    Points masked in either variable are excluded from both. For variables
+    on a latitude/longitude grid, the statistics are computed together from
+    the cached area weights of the grid. Otherwise, they're computed with
+    genutil.
+    """
+    weights = get_area_weights(model)
+    if weights is None or model.shape != obs.shape:
+        return {"rmse": rmse(model, obs), "corr": corr(model, obs)}
+
+    data_x, valid_x = _get_data_and_valid(model)
+    data_y, valid_y = _get_data_and_valid(obs)
+    valid = valid_x & valid_y
+    data_x = numpy.where(valid, data_x, 0.0)
+    data_y = numpy.where(valid, data_y, 0.0)
+
+    num, sum_x, sum_y = _weighted_sums([valid, data_x, data_y], weights)
+    if num == 0:
+        return {"rmse": float("nan"), "corr": float("nan")}
+
+    diff = data_x - data_y
+    centered_x = numpy.where(valid, data_x - sum_x / num, 0.0)
+    centered_y = numpy.where(valid, data_y - sum_y / num, 0.0)
+    sum_dd, sum_xx, sum_yy, sum_xy = _weighted_sums(
+        [
+            diff * diff,
+            centered_x * centered_x,
+            centered_y * centered_y,
+            centered_x * centered_y,
+        ],
+        weights,
+    )
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        corr = sum_xy / numpy.sqrt(sum_xx * sum_yy)
+
+    return {"rmse": float(numpy.sqrt(sum_dd / num)), "corr": float(corr)}
+
+
+def get_area_weights(variable) -> Optional[Tuple[numpy.ndarray, numpy.ndarray]]:
+    """
+    Get the (lat, lon) weights of the cell areas of a 2D latitude/longitude
+    variable, or None if it isn't one. The weights are computed once per grid.
+
+    These are the weights cdutil and genutil generate, i.e. the difference of
+    the sine of the latitude bounds and of the longitude bounds.
+    """
+    if variable.ndim != 2 or variable.getOrder() != "yx":
+        return None
+
+    bounds = regrid.get_rect_grid_bounds(variable.getGrid())
+    if bounds is None:
+        return None
+
+    key = regrid.get_grid_fingerprint(*bounds)
+    if key not in _AREA_WEIGHTS:
+        lat_bounds, lon_bounds = bounds
+        lat_weights = numpy.abs(numpy.diff(numpy.sin(numpy.radians(lat_bounds))))
+        lon_weights = numpy.abs(numpy.diff(lon_bounds))
+        _AREA_WEIGHTS[key] = (lat_weights[:, 0], lon_weights[:, 0])
+
+    return _AREA_WEIGHTS[key]
+
+
+def _get_data_and_valid(variable) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Get the data of a variable as float64, with 0 where it's masked."""
+    valid = ~numpy.ma.getmaskarray(variable)
+    data = numpy.where(
+        valid, numpy.ma.getdata(variable).astype(numpy.float64, copy=False), 0.0
+    )
+
+    return data, valid
+
+
+def _weighted_sums(arrays, weights: Tuple[numpy.ndarray, numpy.ndarray]) -> list:
+    """
+    Get the area-weighted sum of each of the 2D (lat, lon) arrays, in a single
+    contraction over the stacked arrays.
+    """
+    lat_weights, lon_weights = weights
+    stacked = numpy.stack([numpy.asarray(a, dtype=numpy.float64) for a in arrays])
+
+    return list(numpy.einsum("i,kij,j->k", lat_weights, stacked, lon_weights))
@@ -12,6 +12,8 @@ class AreaMeanTimeSeriesParameter(CoreParameter):
         self.ref_names = []
         self.ref_timeseries_input = True
         self.test_timeseries_input = True
+        # The number of timesteps to read at a time, 0 to read all of them.
+        self.time_chunk_size = 120
         # Granulating with regions doesn't make sense,
         # because we have multiple regions for each plot.
         # So keep all of the default values except regions.
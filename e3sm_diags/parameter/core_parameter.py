@@ -11,6 +11,12 @@ class CoreParameter(cdp.cdp_parameter.CDPParameter):
         # self.test_data_path = ''
         self.ref_timeseries_input = False
         self.test_timeseries_input = False
+        # The number of timesteps to read at a time when computing the
+        # climatology of timeseries. 0 reads all of the timesteps at once.
+        self.climo_time_chunk_size = 0
+        # Extend the reduced series of the timeseries sets stored in
+        # results_dir by a previous run, instead of reading all of the years.
+        self.incremental_timeseries = False
 
         self.sets = [
             "zonal_mean_xy",
@@ -54,6 +60,9 @@ class CoreParameter(cdp.cdp_parameter.CDPParameter):
         self.canvas_size_h = 1628
         self.figsize = [8.5, 11.0]
         self.dpi = 150
+        # Draw the lat_lon and polar maps as rasterized images, averaged down
+        # to the resolution of the figure, instead of filled contours.
+        self.raster_maps = False
         self.arrows = True
         self.logo = False
 
@@ -79,10 +88,19 @@ class CoreParameter(cdp.cdp_parameter.CDPParameter):
 
         self.multiprocessing = False
         self.num_workers = 4
+        # The number of processes that render the plots while the diagnostics
+        # are computed, 0 to render them in the drivers.
+        self.num_render_workers = 0
 
         self.no_viewer = False
         self.debug = False
 
+        self.no_variable_cache = False
+        self.variable_cache_max_bytes = 1024**3
+        # Plot again the plots whose data and parameters didn't change since
+        # they were saved in results_dir.
+        self.no_plot_cache = False
+
         self.granulate = ["variables", "seasons", "plevs", "regions"]
         self.selectors = ["sets", "seasons"]
         self.viewer_descr = {}
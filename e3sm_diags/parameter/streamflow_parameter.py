@@ -5,6 +5,7 @@ class StreamflowParameter(TimeSeriesParameter):
     def __init__(self):
         super(StreamflowParameter, self).__init__()
         self.gauges_path = None
+        self.gsim_cache_dir = ""
         self.main_title_seasonality_map = "Seasonality Map"
         self.main_title_annual_map = "Mean Annual Streamflow Map"
         self.main_title_annual_scatter = "Mean Annual Streamflow Scatter Plot"
@@ -8,6 +8,9 @@ class TCAnalysisParameter(CoreParameter):
         self.granulate.remove("seasons")
         self.test_timeseries_input = True
         self.ref_timeseries_input = True
+        # Save the parsed TE stitch files as .npz files next to them, and load
+        # them from there in the next runs.
+        self.te_stitch_cache = False
 
 
 #    def check_values(self):
@@ -56,3 +56,12 @@ class AreaMeanTimeSeriesParser(CoreParser):
             help="End year for the timeseries files.",
             required=False,
         )
+
+        self.add_argument(
+            "--time_chunk_size",
+            type=int,
+            dest="time_chunk_size",
+            help="The number of timesteps to read at a time. "
+            + "0 reads all of them at once.",
+            required=False,
+        )
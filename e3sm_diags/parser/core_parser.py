@@ -309,6 +309,16 @@ class CoreParser(cdp.cdp_parser.CDPParser):
             required=False,
         )
 
+        self.add_argument(
+            "--raster_maps",
+            dest="raster_maps",
+            help="Draw the lat_lon and polar maps as rasterized images at the "
+            + "resolution of the figure, instead of filled contours.",
+            action="store_const",
+            const=True,
+            required=False,
+        )
+
         self.add_argument(
             "--arrows",
             dest="arrows",
@@ -459,6 +469,15 @@ class CoreParser(cdp.cdp_parser.CDPParser):
             required=False,
         )
 
+        self.add_argument(
+            "--num_render_workers",
+            type=int,
+            dest="num_render_workers",
+            help="The number of processes that render the plots while "
+            + "the diags are computed. 0 renders them in the drivers.",
+            required=False,
+        )
+
         self.add_argument(
             "--save_netcdf",
             dest="save_netcdf",
@@ -477,6 +496,52 @@ class CoreParser(cdp.cdp_parser.CDPParser):
             required=False,
         )
 
+        self.add_argument(
+            "--climo_time_chunk_size",
+            type=int,
+            dest="climo_time_chunk_size",
+            help="The number of timesteps to read at a time when computing "
+            + "the climatology of timeseries. 0 reads all of them at once.",
+            required=False,
+        )
+
+        self.add_argument(
+            "--incremental_timeseries",
+            dest="incremental_timeseries",
+            help="Only read the years of the timeseries after the reduced "
+            + "series stored in results_dir by a previous run.",
+            action="store_const",
+            const=True,
+            required=False,
+        )
+
+        self.add_argument(
+            "--no_variable_cache",
+            dest="no_variable_cache",
+            help="Don't cache the variables that were read in memory.",
+            action="store_const",
+            const=True,
+            required=False,
+        )
+
+        self.add_argument(
+            "--no_plot_cache",
+            dest="no_plot_cache",
+            help="Plot again the plots that are already in results_dir, "
+            + "even if their data and parameters didn't change.",
+            action="store_const",
+            const=True,
+            required=False,
+        )
+
+        self.add_argument(
+            "--variable_cache_max_bytes",
+            type=int,
+            dest="variable_cache_max_bytes",
+            help="The maximum size of the variables cached in memory, in bytes.",
+            required=False,
+        )
+
         self.add_argument(
             "--debug",
             dest="debug",
@@ -23,6 +23,14 @@ class StreamflowParser(CoreParser):
             required=False,
         )
 
+        self.add_argument(
+            "--gsim_cache_dir",
+            dest="gsim_cache_dir",
+            help="A directory to store the GSIM reference data and the gauge data "
+            + "as .npy files, which are memory-mapped in the next runs.",
+            required=False,
+        )
+
         self.add_argument(
             "--max_num_gauges",
             dest="max_num_gauges",
@@ -13,3 +13,13 @@ class TCAnalysisParser(CoreParser):
     def load_default_args(self, files=[]):
         # This has '-p' and '--parameter' reserved.
         super().load_default_args(files)
+
+        self.add_argument(
+            "--te_stitch_cache",
+            dest="te_stitch_cache",
+            help="Save the parsed TE stitch files as .npz files next to them, "
+            + "and load them from there in the next runs.",
+            action="store_const",
+            const=True,
+            required=False,
+        )
@@ -2,13 +2,23 @@
 for different plots with different backends."""
 from __future__ import absolute_import, print_function
 
+import concurrent.futures
+import glob
+import hashlib
 import importlib
+import json
+import multiprocessing
 import os
+import pickle
 import sys
+import tempfile
+import threading
 import traceback
 
+import matplotlib.image
 import numpy
 from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.transforms import Bbox, TransformedBbox
 
 import e3sm_diags
 from e3sm_diags.logger import custom_logger
@@ -33,11 +43,111 @@ def _get_plot_fcn(backend, set_name):
         traceback.print_exc()
 
 
+# The pool of processes that render the plots of plot(), and the plots that
+# were submitted to it and aren't done yet.
+_render_pool = None
+_render_futures = []
+# The process that started the render pool. The processes forked from it, e.g.
+# the workers of a parallel run, send their plots to it through the queue,
+# which are submitted to the render pool by the thread.
+_render_pid = None
+_render_queue = None
+_render_thread = None
+
+
+def start_render_pool(num_workers):
+    """Render the plots of plot() in a pool of num_workers processes, so the
+    drivers compute the next plot while the previous ones are rendered.
+    With 0 workers, plot() renders the plots as it's called.
+
+    The plots of the processes forked afterwards are rendered by the same
+    pool, so it's started before the workers of a parallel run."""
+    global _render_pool, _render_pid, _render_queue, _render_thread
+    if num_workers and _render_pool is None:
+        context = multiprocessing.get_context("fork")
+        _render_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers, mp_context=context
+        )
+        _render_pid = os.getpid()
+        _render_queue = context.SimpleQueue()
+        _render_thread = threading.Thread(target=_submit_queued_plots, daemon=True)
+        _render_thread.start()
+
+
+def _submit_queued_plots():
+    """Submit the plots sent by the forked processes to the render pool, until
+    the render pool is stopped."""
+    while True:
+        job = _render_queue.get()
+        if job is None:
+            break
+        _render_futures.append(_render_pool.submit(_render, job))
+
+
+def wait_for_plots():
+    """Wait until all of the plots submitted to the render pool are saved.
+    The plots that failed are logged, and their number is returned."""
+    global _render_futures
+    futures, _render_futures = _render_futures, []
+    num_failed = 0
+    for future in futures:
+        try:
+            future.result()
+        except Exception:
+            logger.exception("Error while rendering a plot", exc_info=True)
+            num_failed += 1
+
+    return num_failed
+
+
+def stop_render_pool():
+    """Wait for the plots of the render pool and stop its processes. The
+    processes forked from this one must be done sending their plots."""
+    global _render_pool, _render_pid, _render_queue, _render_thread
+    if _render_pool is None:
+        return 0
+
+    _render_queue.put(None)
+    _render_thread.join()
+    num_failed = wait_for_plots()
+    _render_pool.shutdown()
+    _render_queue.close()
+    _render_pool = _render_pid = _render_queue = _render_thread = None
+
+    return num_failed
+
+
+def _render(job):
+    """Render the plot of a job pickled by plot()."""
+    _plot(*pickle.loads(job))
+
+
 def plot(set_name, ref, test, diff, metrics_dict, parameter):
     """Based on set_name and parameter.backend, call the correct plotting function.
 
+    If the render pool is started, the plot is only submitted to it. The
+    arguments are pickled right away, so the driver can keep changing the
+    parameter, e.g. its output_file, for the next plot.
+
     #TODO: Make metrics_dict a kwarg and update the other plot() functions
     """
+    if _render_pool is not None:
+        try:
+            job = pickle.dumps((set_name, ref, test, diff, metrics_dict, parameter))
+        except Exception:
+            # E.g. a custom parameter.plot() that can't be pickled.
+            job = None
+        if job is not None:
+            if os.getpid() == _render_pid:
+                _render_futures.append(_render_pool.submit(_render, job))
+            else:
+                _render_queue.put(job)
+            return
+
+    _plot(set_name, ref, test, diff, metrics_dict, parameter)
+
+
+def _plot(set_name, ref, test, diff, metrics_dict, parameter):
     if hasattr(parameter, "plot"):
         parameter.plot(ref, test, diff, metrics_dict, parameter)
     else:
@@ -46,8 +156,21 @@ def plot(set_name, ref, test, diff, metrics_dict, parameter):
 
         plot_fcn = _get_plot_fcn(parameter.backend, set_name)
         if plot_fcn:
+            manifest_path, plot_hash = _get_plot_manifest(
+                set_name, ref, test, diff, metrics_dict, parameter
+            )
+            if manifest_path and _is_plot_saved(manifest_path, plot_hash):
+                logger.info(
+                    "Skipping the plot {}, which is unchanged.".format(
+                        parameter.output_file
+                    )
+                )
+                return
+
             try:
                 plot_fcn(ref, test, diff, metrics_dict, parameter)
+                if manifest_path:
+                    _save_plot_manifest(manifest_path, plot_hash, parameter)
             except Exception as e:
                 logger.exception(
                     "Error while plotting {} with backend {}".format(
@@ -60,6 +183,191 @@ def plot(set_name, ref, test, diff, metrics_dict, parameter):
                     sys.exit()
 
 
+# The directory of each output directory with the manifests of its plots.
+PLOT_MANIFEST_DIR = ".plot_manifest"
+# The attributes of the parameters that don't change the plots, so changing
+# them doesn't plot them again.
+NON_PLOT_PARAMETERS = [
+    "sets",
+    "viewer_descr",
+    "multiprocessing",
+    "num_workers",
+    "num_render_workers",
+    "no_viewer",
+    "debug",
+    "fail_on_incomplete",
+    "no_variable_cache",
+    "variable_cache_max_bytes",
+    "no_plot_cache",
+    "climo_time_chunk_size",
+    "time_chunk_size",
+    "incremental_timeseries",
+]
+# The hash of the files of the installed package, computed once.
+_package_hash = None
+
+
+def _get_package_hash():
+    """Get the hash of the files of the installed e3sm_diags package, i.e.
+    the plot functions and all of the modules, colormaps and region specs
+    they use."""
+    global _package_hash
+    if _package_hash is None:
+        sha = hashlib.sha256()
+        package_dir = os.path.dirname(os.path.abspath(e3sm_diags.__file__))
+        for root, dirs, files in os.walk(package_dir):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            for fnm in sorted(files):
+                path = os.path.join(root, fnm)
+                sha.update(os.path.relpath(path, package_dir).encode())
+                with open(path, "rb") as f:
+                    sha.update(f.read())
+        _package_hash = sha.hexdigest()
+
+    return _package_hash
+
+
+def _get_plot_manifest(set_name, ref, test, diff, metrics_dict, parameter):
+    """Get the path of the manifest of the plot, and the hash of the data,
+    metrics and parameters it's plotted from and the files of the package.
+    (None, None) is returned if the plot isn't cached."""
+    if getattr(parameter, "no_plot_cache", False):
+        return None, None
+
+    from e3sm_diags.driver.utils.general import get_output_dir
+
+    try:
+        plot_parameters = sorted(
+            (attr, value)
+            for attr, value in vars(parameter).items()
+            if attr not in NON_PLOT_PARAMETERS
+        )
+        sha = hashlib.sha256()
+        sha.update(_get_package_hash().encode())
+        sha.update(
+            pickle.dumps((set_name, ref, test, diff, metrics_dict, plot_parameters))
+        )
+        output_dir = get_output_dir(parameter.current_set, parameter)
+    except Exception:
+        logger.debug("Not caching the plot {}".format(parameter.output_file))
+        return None, None
+
+    manifest_path = os.path.join(
+        output_dir, PLOT_MANIFEST_DIR, parameter.output_file + ".json"
+    )
+    return manifest_path, sha.hexdigest()
+
+
+def _is_plot_saved(manifest_path, plot_hash):
+    """Whether the files of the manifest exist and were plotted from the
+    data and parameters with plot_hash."""
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    output_dir = os.path.dirname(os.path.dirname(manifest_path))
+    return (
+        manifest.get("hash") == plot_hash
+        and len(manifest.get("files", [])) > 0
+        and all(
+            os.path.exists(os.path.join(output_dir, fnm)) for fnm in manifest["files"]
+        )
+    )
+
+
+def _save_plot_manifest(manifest_path, plot_hash, parameter):
+    """Save the hash of the plot, and the files it was saved in, which are
+    the output_file in each output_format and its subplots."""
+    manifest_dir = os.path.dirname(manifest_path)
+    output_dir = os.path.dirname(manifest_dir)
+
+    files = []
+    for f in parameter.output_format:
+        files.append(parameter.output_file + "." + f.lower().split(".")[-1])
+    for f in parameter.output_format_subplot:
+        subplots = glob.glob(
+            os.path.join(output_dir, glob.escape(parameter.output_file) + ".*." + f)
+        )
+        files.extend(sorted(os.path.basename(subplot) for subplot in subplots))
+    files = [fnm for fnm in files if os.path.exists(os.path.join(output_dir, fnm))]
+
+    os.makedirs(manifest_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=manifest_dir)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"hash": plot_hash, "files": files}, f)
+        os.replace(tmp_path, manifest_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+# The formats that FigureSaver saves from a single render of the figure.
+RASTER_FORMATS = ["png"]
+
+
+class FigureSaver(object):
+    """Saves a figure, and crops of its panels, to files.
+
+    The figure is only rendered once for all of the files in RASTER_FORMATS,
+    which are cut out of the pixels of that render. The other formats, e.g.
+    pdf, are saved with savefig(), which renders the figure for each file."""
+
+    def __init__(self, fig):
+        self.fig = fig
+        self._image = None
+
+    def save(self, path, extent=None):
+        """Save the figure to path, or only the part of it in extent, a Bbox
+        in inches like the bbox_inches of savefig()."""
+        fmt = os.path.splitext(path)[1][1:].lower()
+        if fmt not in RASTER_FORMATS or not hasattr(self.fig.canvas, "buffer_rgba"):
+            self.fig.savefig(path, bbox_inches=extent)
+            return
+
+        image = self._get_image()
+        if extent is not None:
+            height, width = image.shape[:2]
+            crop_width, crop_height = self._get_crop_size(extent)
+            # Like savefig(), the crop starts at the bottom left corner of the
+            # extent. The rows of the image are from the top of the figure down.
+            x0 = int(round(extent.x0 * self.fig.dpi))
+            x1 = x0 + crop_width
+            y1 = int(round(height - extent.y0 * self.fig.dpi))
+            y0 = y1 - crop_height
+            x0, x1 = [min(max(x, 0), width) for x in (x0, x1)]
+            y0, y1 = [min(max(y, 0), height) for y in (y0, y1)]
+            image = image[y0:y1, x0:x1]
+
+        matplotlib.image.imsave(path, image, format=fmt, dpi=self.fig.dpi)
+
+    def _get_crop_size(self, extent):
+        """Get the size in pixels of the figure saved by savefig() with
+        bbox_inches=extent. It's the size of the figure resized to the extent,
+        which the canvas rounds to pixels."""
+        bbox = self.fig.bbox
+        self.fig.bbox = TransformedBbox(
+            Bbox.from_bounds(0, 0, *extent.size), self.fig.dpi_scale_trans
+        )
+        try:
+            return self.fig.canvas.get_width_height(physical=True)
+        finally:
+            self.fig.bbox = bbox
+
+    def _get_image(self):
+        if self._image is None:
+            self.fig.canvas.draw()
+            self._image = numpy.asarray(self.fig.canvas.buffer_rgba()).copy()
+
+        return self._image
+
+
+# The colormaps loaded from .rgb files, for each path.
+_colormaps = {}
+
+
 def get_colormap(colormap, parameters):
     """Get the colormap (string or mpl colormap obj), which can be
     loaded from a local file in the cwd, installed file, or a predefined mpl one."""
@@ -80,12 +388,15 @@ def get_colormap(colormap, parameters):
         msg = "File {} isn't in the current working directory or installed in {}"
         raise IOError(msg.format(colormap, pth))
 
-    rgb_arr = numpy.loadtxt(colormap)
-    rgb_arr = rgb_arr / 255.0
-
     if parameters.backend in ["cartopy", "mpl", "matplotlib"]:
-        cmap = LinearSegmentedColormap.from_list(name=colormap, colors=rgb_arr)
-        return cmap
+        # The .rgb file of each colormap is only parsed once per process.
+        if colormap not in _colormaps:
+            rgb_arr = numpy.loadtxt(colormap)
+            rgb_arr = rgb_arr / 255.0
+            _colormaps[colormap] = LinearSegmentedColormap.from_list(
+                name=colormap, colors=rgb_arr
+            )
+        return _colormaps[colormap]
 
     else:
         raise RuntimeError("Invalid backend: {}".format(parameters.backend))
@@ -7,6 +7,7 @@ import numpy as np
 from e3sm_diags.driver.utils.general import get_output_dir
 from e3sm_diags.logger import custom_logger
 from e3sm_diags.metrics import mean
+from e3sm_diags.plot import FigureSaver
 from e3sm_diags.plot.cartopy.lat_lon_plot import plot_panel
 
 matplotlib.use("Agg")
@@ -93,13 +94,14 @@ def plot(test, test_site, ref_site, parameter):
     # legend
     plt.legend(frameon=False, prop={"size": 5})
 
+    saver = FigureSaver(fig)
     for f in parameter.output_format:
         f = f.lower().split(".")[-1]
         fnm = os.path.join(
             get_output_dir(parameter.current_set, parameter),
             f"{parameter.output_file}" + "." + f,
         )
-        plt.savefig(fnm)
+        saver.save(fnm)
         logger.info(f"Plot saved in: {fnm}")
 
     for f in parameter.output_format_subplot:
@@ -118,7 +120,7 @@ def plot(test, test_site, ref_site, parameter):
             extent = matplotlib.transforms.Bbox.from_extents(*subpage)
             # Save subplot
             fname = fnm + ".%i." % (i) + f
-            plt.savefig(fname, bbox_inches=extent)
+            saver.save(fname, extent)
 
             orig_fnm = os.path.join(
                 get_output_dir(parameter.current_set, parameter),
@@ -8,7 +8,7 @@ from cartopy.mpl.ticker import LatitudeFormatter
 
 from e3sm_diags.driver.utils.general import get_output_dir
 from e3sm_diags.logger import custom_logger
-from e3sm_diags.plot import get_colormap
+from e3sm_diags.plot import FigureSaver, get_colormap
 
 matplotlib.use("Agg")
 import matplotlib.colors as colors  # isort:skip  # noqa: E402
@@ -145,13 +145,14 @@ def plot(reference, test, diff, metrics_dict, parameter):
     fig.suptitle(parameter.main_title, x=0.5, y=0.96, fontsize=18)
 
     # Save figure
+    saver = FigureSaver(fig)
     for f in parameter.output_format:
         f = f.lower().split(".")[-1]
         fnm = os.path.join(
             get_output_dir(parameter.current_set, parameter),
             parameter.output_file + "." + f,
         )
-        plt.savefig(fnm)
+        saver.save(fnm)
         # Get the filename that the user has passed in and display that.
         fnm = os.path.join(
             get_output_dir(parameter.current_set, parameter),
@@ -176,7 +177,7 @@ def plot(reference, test, diff, metrics_dict, parameter):
             extent = matplotlib.transforms.Bbox.from_extents(*subpage)
             # Save subplot
             fname = fnm + ".%i." % (i) + f
-            plt.savefig(fname, bbox_inches=extent)
+            saver.save(fname, extent)
 
             orig_fnm = os.path.join(
                 get_output_dir(parameter.current_set, parameter),
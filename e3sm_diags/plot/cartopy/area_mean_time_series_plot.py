@@ -5,6 +5,7 @@ import numpy as np
 
 from e3sm_diags.driver.utils.general import get_output_dir
 from e3sm_diags.logger import custom_logger
+from e3sm_diags.plot import FigureSaver
 
 matplotlib.use("agg")
 import matplotlib.pyplot as plt  # isort:skip  # noqa: E402
@@ -99,13 +100,14 @@ def plot(var, regions_to_data, parameter):
 
     # Save the figure.
     output_file_name = var
+    saver = FigureSaver(fig)
     for f in parameter.output_format:
         f = f.lower().split(".")[-1]
         fnm = os.path.join(
             get_output_dir(parameter.current_set, parameter),
             output_file_name + "." + f,
         )
-        plt.savefig(fnm)
+        saver.save(fnm)
         # Get the filename that the user has passed in and display that.
         fnm = os.path.join(
             get_output_dir(parameter.current_set, parameter),
@@ -130,7 +132,7 @@ def plot(var, regions_to_data, parameter):
             extent = matplotlib.transforms.Bbox.from_extents(*subpage)
             # Save subplot
             fname = fnm + ".%i." % (i) + f
-            plt.savefig(fname, bbox_inches=extent)
+            saver.save(fname, extent)
 
             orig_fnm = os.path.join(
                 get_output_dir(parameter.current_set, parameter),
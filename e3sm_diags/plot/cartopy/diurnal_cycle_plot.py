@@ -2,8 +2,6 @@ from __future__ import print_function
 
 import os
 
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 import cdutil
 import matplotlib
 import numpy as np
@@ -14,11 +12,12 @@ from matplotlib.colors import hsv_to_rgb
 from e3sm_diags.derivations.default_regions import regions_specs
 from e3sm_diags.driver.utils.general import get_output_dir
 from e3sm_diags.logger import custom_logger
+from e3sm_diags.plot import FigureSaver
+from e3sm_diags.plot.cartopy import resources
 
 logger = custom_logger(__name__)
 
 matplotlib.use("Agg")  # noqa: E402
-import matplotlib.pyplot as plt  # isort:skip  # noqa: E402
 
 
 plotTitle = {"fontsize": 11.5}
@@ -132,7 +131,7 @@ def plot_panel(n, fig, proj, var, amp, amp_ref, title, parameter):
         xticks = [0, 60, 120, 180, 240, 300, 359.99]
     else:
         xticks = np.append(xticks, lon_east)
-        proj = ccrs.PlateCarree()
+        proj = resources.get_projection("PlateCarree")
 
     lat_covered = lat_north - lat_south
     lat_step = determine_tick_step(lat_covered)
@@ -143,14 +142,14 @@ def plot_panel(n, fig, proj, var, amp, amp_ref, title, parameter):
 
     # Full world would be aspect 360/(2*180) = 1
     # ax.set_aspect((lon_east - lon_west)/(2*(lat_north - lat_south)))
-    ax.coastlines(lw=0.3)
+    resources.add_coastlines(ax, lw=0.3)
     if title[0] is not None:
         ax.set_title(title[0], loc="left", fontdict=plotSideTitle)
     if title[1] is not None:
         ax.set_title(title[1], fontdict=plotTitle)
-    ax.set_xticks(xticks, crs=ccrs.PlateCarree())
+    ax.set_xticks(xticks, crs=resources.get_projection("PlateCarree"))
     # ax.set_xticks([0, 60, 120, 180, 240, 300, 359.99], crs=ccrs.PlateCarree())
-    ax.set_yticks(yticks, crs=ccrs.PlateCarree())
+    ax.set_yticks(yticks, crs=resources.get_projection("PlateCarree"))
     lon_formatter = LongitudeFormatter(zero_direction_label=True, number_format=".0f")
     lat_formatter = LatitudeFormatter()
     ax.xaxis.set_major_formatter(lon_formatter)
@@ -174,14 +173,9 @@ def plot_panel(n, fig, proj, var, amp, amp_ref, title, parameter):
     # ax.imshow(img, origin='lower', extent=img_extent, transform=ccrs.PlateCarree())
     ax.imshow(img, origin="lower", extent=img_extent, transform=proj)
     if region_str == "CONUS":
-        ax.coastlines(resolution="50m", color="black", linewidth=0.3)
-        state_borders = cfeature.NaturalEarthFeature(
-            category="cultural",
-            name="admin_1_states_provinces_lakes",
-            scale="50m",
-            facecolor="none",
-        )
-        ax.add_feature(state_borders, edgecolor="black")
+        resources.add_coastlines(ax, resolution="50m", color="black", linewidth=0.3)
+        state_borders = resources.get_feature("STATES", "50m")
+        ax.add_feature(state_borders, edgecolor="black", facecolor="none")
 
     # Color bar
     bar_ax = fig.add_axes(
@@ -243,8 +237,8 @@ def plot(test_tmax, test_amp, ref_tmax, ref_amp, parameter):
         return
 
     # Create figure, projection
-    fig = plt.figure(figsize=[8.5, 8.5], dpi=parameter.dpi)
-    proj = ccrs.PlateCarree(central_longitude=180)
+    fig = resources.get_figure([8.5, 8.5], parameter.dpi)
+    proj = resources.get_projection("PlateCarree", central_longitude=180)
 
     # First panel
     plot_panel(
@@ -291,11 +285,12 @@ def plot(test_tmax, test_amp, ref_tmax, ref_amp, parameter):
     original_file_path = os.path.join(original_output_dir, parameter.output_file)
 
     # Save figure
+    saver = FigureSaver(fig)
     for f in parameter.output_format:
         f = f.lower().split(".")[-1]
         plot_suffix = "." + f
         plot_file_path = file_path + plot_suffix
-        plt.savefig(plot_file_path)
+        saver.save(plot_file_path)
         # Get the filename that the user has passed in and display that.
         original_plot_file_path = original_file_path + plot_suffix
         logger.info(f"Plot saved in: {original_plot_file_path}")
@@ -314,10 +309,10 @@ def plot(test_tmax, test_amp, ref_tmax, ref_amp, parameter):
             # Save subplot
             subplot_suffix = ".%i." % (i) + f
             subplot_file_path = file_path + subplot_suffix
-            plt.savefig(subplot_file_path, bbox_inches=extent)
+            saver.save(subplot_file_path, extent)
             # Get the filename that the user has passed in and display that.
             original_subplot_file_path = original_file_path + subplot_suffix
             logger.info(f"Sub-plot saved in: {original_subplot_file_path}")
             i += 1
 
-    plt.close()
+    resources.release_figure(fig)
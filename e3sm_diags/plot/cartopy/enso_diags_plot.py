@@ -2,7 +2,6 @@ from __future__ import print_function
 
 import os
 
-import cartopy.crs as ccrs
 import cdutil
 import matplotlib
 import numpy as np
@@ -13,7 +12,8 @@ from numpy.polynomial.polynomial import polyfit
 from e3sm_diags.derivations.default_regions import regions_specs
 from e3sm_diags.driver.utils.general import get_output_dir
 from e3sm_diags.logger import custom_logger
-from e3sm_diags.plot import get_colormap
+from e3sm_diags.plot import FigureSaver, get_colormap
+from e3sm_diags.plot.cartopy import resources
 
 matplotlib.use("Agg")
 import matplotlib.colors as colors  # isort:skip  # noqa: E402
@@ -109,7 +109,7 @@ def plot_panel_map(
         lon,
         lat,
         var,
-        transform=ccrs.PlateCarree(),
+        transform=resources.get_projection("PlateCarree"),
         norm=norm,
         levels=levels,
         cmap=cmap,
@@ -126,7 +126,7 @@ def plot_panel_map(
             lat,
             conf,
             2,
-            transform=ccrs.PlateCarree(),
+            transform=resources.get_projection("PlateCarree"),
             norm=norm,
             colors="none",
             extend="both",
@@ -134,15 +134,15 @@ def plot_panel_map(
         )
     # Full world would be aspect 360/(2*180) = 1
     ax.set_aspect((lon_east - lon_west) / (2 * (lat_north - lat_south)))
-    ax.coastlines(lw=0.3)
+    resources.add_coastlines(ax, lw=0.3)
     if title[0] is not None:
         ax.set_title(title[0], loc="left", fontdict=plotSideTitle)
     if title[1] is not None:
         ax.set_title(title[1], fontdict=plotTitle)
     if title[2] is not None:
         ax.set_title(title[2], loc="right", fontdict=plotSideTitle)
-    ax.set_xticks(xticks, crs=ccrs.PlateCarree())
-    ax.set_yticks(yticks, crs=ccrs.PlateCarree())
+    ax.set_xticks(xticks, crs=resources.get_projection("PlateCarree"))
+    ax.set_yticks(yticks, crs=resources.get_projection("PlateCarree"))
     lon_formatter = LongitudeFormatter(zero_direction_label=True, number_format=".0f")
     lat_formatter = LatitudeFormatter()
     ax.xaxis.set_major_formatter(lon_formatter)
@@ -242,10 +242,10 @@ def plot_map(
         return
 
     # Create figure, projection
-    fig = plt.figure(figsize=parameter.figsize, dpi=parameter.dpi)
+    fig = resources.get_figure(parameter.figsize, parameter.dpi)
     # Use 179.99 as central longitude due to https://github.com/SciTools/cartopy/issues/946
     # proj = ccrs.PlateCarree(central_longitude=180)
-    proj = ccrs.PlateCarree(central_longitude=179.99)
+    proj = resources.get_projection("PlateCarree", central_longitude=179.99)
 
     # Use non-regridded test and ref for stats,
     # so we have the original stats displayed
@@ -312,11 +312,12 @@ def plot_map(
     original_file_path = os.path.join(original_output_dir, parameter.output_file)
 
     # Save figure
+    saver = FigureSaver(fig)
     for f in parameter.output_format:
         f = f.lower().split(".")[-1]
         plot_suffix = "." + f
         plot_file_path = file_path + plot_suffix
-        plt.savefig(plot_file_path)
+        saver.save(plot_file_path)
         # Get the filename that the user has passed in and display that.
         original_plot_file_path = original_file_path + plot_suffix
         logger.info(f"Plot saved in: {original_plot_file_path}")
@@ -335,13 +336,13 @@ def plot_map(
             # Save subplot
             subplot_suffix = ".%i." % (i) + f
             subplot_file_path = file_path + subplot_suffix
-            plt.savefig(subplot_file_path, bbox_inches=extent)
+            saver.save(subplot_file_path, extent)
             # Get the filename that the user has passed in and display that.
             original_subplot_file_path = original_file_path + subplot_suffix
             logger.info(f"Sub-plot saved in: {original_subplot_file_path}")
             i += 1
 
-    plt.close()
+    resources.release_figure(fig)
 
 
 def plot_scatter(x, y, parameter):
@@ -2,8 +2,6 @@ from __future__ import print_function
 
 import os
 
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 import cdutil
 import matplotlib
 import numpy as np
@@ -13,11 +11,11 @@ from cartopy.mpl.ticker import LatitudeFormatter, LongitudeFormatter
 from e3sm_diags.derivations.default_regions import regions_specs
 from e3sm_diags.driver.utils.general import get_output_dir
 from e3sm_diags.logger import custom_logger
-from e3sm_diags.plot import get_colormap
+from e3sm_diags.plot import FigureSaver, get_colormap
+from e3sm_diags.plot.cartopy import raster, resources
 
 matplotlib.use("Agg")
 import matplotlib.colors as colors  # isort:skip  # noqa: E402
-import matplotlib.pyplot as plt  # isort:skip  # noqa: E402
 
 logger = custom_logger(__name__)
 
@@ -110,7 +108,7 @@ def plot_panel(  # noqa: C901
     # If a number is added, then the value won't show up at all.
     if global_domain or full_lon:
         xticks = np.append(xticks, lon_east - 0.50)
-        proj = ccrs.PlateCarree(central_longitude=180)
+        proj = resources.get_projection("PlateCarree", central_longitude=180)
     else:
         xticks = np.append(xticks, lon_east)
     lat_covered = lat_north - lat_south
@@ -122,38 +120,45 @@ def plot_panel(  # noqa: C901
     ax = fig.add_axes(panel[n], projection=proj)
     ax.set_extent([lon_west, lon_east, lat_south, lat_north], crs=proj)
     cmap = get_colormap(cmap, parameters)
-    p1 = ax.contourf(
-        lon,
-        lat,
-        var,
-        transform=ccrs.PlateCarree(),
-        norm=norm,
-        levels=levels,
-        cmap=cmap,
-        extend="both",
-    )
+    if parameters.raster_maps:
+        p1 = raster.pcolormesh(
+            ax,
+            lon,
+            lat,
+            var,
+            levels,
+            norm,
+            cmap,
+            transform=resources.get_projection("PlateCarree"),
+        )
+    else:
+        p1 = ax.contourf(
+            lon,
+            lat,
+            var,
+            transform=resources.get_projection("PlateCarree"),
+            norm=norm,
+            levels=levels,
+            cmap=cmap,
+            extend="both",
+        )
 
     # ax.set_aspect('auto')
     # Full world would be aspect 360/(2*180) = 1
     ax.set_aspect((lon_east - lon_west) / (2 * (lat_north - lat_south)))
-    ax.coastlines(lw=0.3)
+    resources.add_coastlines(ax, lw=0.3)
     if not global_domain and "RRM" in region_str:
-        ax.coastlines(resolution="50m", color="black", linewidth=1)
-        state_borders = cfeature.NaturalEarthFeature(
-            category="cultural",
-            name="admin_1_states_provinces_lakes",
-            scale="50m",
-            facecolor="none",
-        )
-        ax.add_feature(state_borders, edgecolor="black")
+        resources.add_coastlines(ax, resolution="50m", color="black", linewidth=1)
+        state_borders = resources.get_feature("STATES", "50m")
+        ax.add_feature(state_borders, edgecolor="black", facecolor="none")
     if title[0] is not None:
         ax.set_title(title[0], loc="left", fontdict=plotSideTitle)
     if title[1] is not None:
         ax.set_title(title[1], fontdict=plotTitle)
     if title[2] is not None:
         ax.set_title(title[2], loc="right", fontdict=plotSideTitle)
-    ax.set_xticks(xticks, crs=ccrs.PlateCarree())
-    ax.set_yticks(yticks, crs=ccrs.PlateCarree())
+    ax.set_xticks(xticks, crs=resources.get_projection("PlateCarree"))
+    ax.set_yticks(yticks, crs=resources.get_projection("PlateCarree"))
     lon_formatter = LongitudeFormatter(zero_direction_label=True, number_format=".0f")
     lat_formatter = LatitudeFormatter()
     ax.xaxis.set_major_formatter(lon_formatter)
@@ -251,8 +256,8 @@ def plot_panel(  # noqa: C901
 def plot(reference, test, diff, metrics_dict, parameter):
 
     # Create figure, projection
-    fig = plt.figure(figsize=parameter.figsize, dpi=parameter.dpi)
-    proj = ccrs.PlateCarree()
+    fig = resources.get_figure(parameter.figsize, parameter.dpi)
+    proj = resources.get_projection("PlateCarree")
 
     # Figure title
     fig.suptitle(parameter.main_title, x=0.5, y=0.96, fontsize=18)
@@ -310,13 +315,14 @@ def plot(reference, test, diff, metrics_dict, parameter):
         )
 
     # Save figure
+    saver = FigureSaver(fig)
     for f in parameter.output_format:
         f = f.lower().split(".")[-1]
         fnm = os.path.join(
             get_output_dir(parameter.current_set, parameter),
             parameter.output_file + "." + f,
         )
-        plt.savefig(fnm)
+        saver.save(fnm)
         logger.info(f"Plot saved in: {fnm}")
 
     # Save individual subplots
@@ -341,7 +347,7 @@ def plot(reference, test, diff, metrics_dict, parameter):
             extent = matplotlib.transforms.Bbox.from_extents(*subpage)
             # Save subplot
             fname = fnm + ".%i." % (i) + f
-            plt.savefig(fname, bbox_inches=extent)
+            saver.save(fname, extent)
 
             orig_fnm = os.path.join(
                 get_output_dir(parameter.current_set, parameter),
@@ -352,4 +358,4 @@ def plot(reference, test, diff, metrics_dict, parameter):
 
             i += 1
 
-    plt.close()
+    resources.release_figure(fig)
@@ -2,15 +2,14 @@ from __future__ import print_function
 
 import os
 
-import cartopy.crs as ccrs
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import numpy.ma as ma
 
 from e3sm_diags.driver.utils.general import get_output_dir
 from e3sm_diags.logger import custom_logger
-from e3sm_diags.plot import get_colormap
+from e3sm_diags.plot import FigureSaver, get_colormap
+from e3sm_diags.plot.cartopy import raster, resources
 
 matplotlib.use("Agg")
 import matplotlib.colors as colors  # isort:skip  # noqa: E402
@@ -66,9 +65,11 @@ def plot_panel(n, fig, proj, pole, var, clevels, cmap, title, parameters, stats=
 
     ax.gridlines()
     if pole == "N":
-        ax.set_extent([-180, 180, 50, 90], crs=ccrs.PlateCarree())
+        ax.set_extent([-180, 180, 50, 90], crs=resources.get_projection("PlateCarree"))
     elif pole == "S":
-        ax.set_extent([-180, 180, -55, -90], crs=ccrs.PlateCarree())
+        ax.set_extent(
+            [-180, 180, -55, -90], crs=resources.get_projection("PlateCarree")
+        )
 
     cmap = get_colormap(cmap, parameters)
 
@@ -78,18 +79,30 @@ def plot_panel(n, fig, proj, pole, var, clevels, cmap, title, parameters, stats=
     circle = mpath.Path(verts * radius + center)
     ax.set_boundary(circle, transform=ax.transAxes)
 
-    p1 = ax.contourf(
-        lon,
-        lat,
-        var,
-        transform=ccrs.PlateCarree(),
-        norm=norm,
-        levels=levels,
-        cmap=cmap,
-        extend="both",
-    )
+    if parameters.raster_maps:
+        p1 = raster.pcolormesh(
+            ax,
+            lon,
+            lat,
+            var,
+            levels,
+            norm,
+            cmap,
+            transform=resources.get_projection("PlateCarree"),
+        )
+    else:
+        p1 = ax.contourf(
+            lon,
+            lat,
+            var,
+            transform=resources.get_projection("PlateCarree"),
+            norm=norm,
+            levels=levels,
+            cmap=cmap,
+            extend="both",
+        )
     ax.set_aspect("auto")
-    ax.coastlines(lw=0.3)
+    resources.add_coastlines(ax, lw=0.3)
 
     # Plot titles
     if title[0] is not None:
@@ -160,15 +173,15 @@ def plot_panel(n, fig, proj, pole, var, clevels, cmap, title, parameters, stats=
 def plot(reference, test, diff, metrics_dict, parameter):
 
     # Create figure, projection
-    fig = plt.figure(figsize=parameter.figsize, dpi=parameter.dpi)
+    fig = resources.get_figure(parameter.figsize, parameter.dpi)
 
     # Create projection
     if parameter.var_region.find("N") != -1:
         pole = "N"
-        proj = ccrs.NorthPolarStereo(central_longitude=0)
+        proj = resources.get_projection("NorthPolarStereo", central_longitude=0)
     elif parameter.var_region.find("S") != -1:
         pole = "S"
-        proj = ccrs.SouthPolarStereo(central_longitude=0)
+        proj = resources.get_projection("SouthPolarStereo", central_longitude=0)
 
     # First two panels
     min1 = metrics_dict["test"]["min"]
@@ -235,13 +248,14 @@ def plot(reference, test, diff, metrics_dict, parameter):
     fig.suptitle(parameter.main_title, x=0.5, y=0.97, fontsize=18)
 
     # Save figure
+    saver = FigureSaver(fig)
     for f in parameter.output_format:
         f = f.lower().split(".")[-1]
         fnm = os.path.join(
             get_output_dir(parameter.current_set, parameter),
             parameter.output_file + "." + f,
         )
-        plt.savefig(fnm)
+        saver.save(fnm)
         # Get the filename that the user has passed in and display that.
         fnm = os.path.join(
             get_output_dir(parameter.current_set, parameter),
@@ -266,7 +280,7 @@ def plot(reference, test, diff, metrics_dict, parameter):
             extent = matplotlib.transforms.Bbox.from_extents(*subpage)
             # Save subplot
             fname = fnm + ".%i." % (i) + f
-            plt.savefig(fname, bbox_inches=extent)
+            saver.save(fname, extent)
 
             orig_fnm = os.path.join(
                 get_output_dir(parameter.current_set, parameter),
@@ -277,4 +291,4 @@ def plot(reference, test, diff, metrics_dict, parameter):
 
             i += 1
 
-    plt.close()
+    resources.release_figure(fig)
@@ -7,6 +7,7 @@ import numpy as np
 
 from e3sm_diags.driver.utils.general import get_output_dir
 from e3sm_diags.logger import custom_logger
+from e3sm_diags.plot import FigureSaver
 
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt  # isort:skip  # noqa: E402
@@ -198,11 +199,12 @@ def plot(parameter, test, ref):
     original_file_path = os.path.join(original_output_dir, parameter.output_file)
 
     # Save figure
+    saver = FigureSaver(fig)
     for f in parameter.output_format:
         f = f.lower().split(".")[-1]
         plot_suffix = "." + f
         plot_file_path = file_path + plot_suffix
-        plt.savefig(plot_file_path)
+        saver.save(plot_file_path)
         # Get the filename that the user has passed in and display that.
         original_plot_file_path = original_file_path + plot_suffix
         logger.info(f"Plot saved in: {original_plot_file_path}")
@@ -236,7 +238,7 @@ def plot(parameter, test, ref):
             # Save subplot
             subplot_suffix = (".%i." % i) + f
             subplot_file_path = file_path + subplot_suffix
-            plt.savefig(subplot_file_path, bbox_inches=extent)
+            saver.save(subplot_file_path, extent)
             # Get the filename that the user has passed in and display that.
             original_subplot_file_path = original_file_path + subplot_suffix
             logger.info(f"Sub-plot saved in: {original_subplot_file_path}")
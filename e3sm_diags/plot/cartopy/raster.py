@@ -0,0 +1,168 @@
+"""
+The fast rendering of the maps with raster_maps. The field is drawn with a
+rasterized pcolormesh() instead of filled contours, averaged down to about the
+resolution of the figure, with the colors contourf() gives each contour level.
+"""
+import matplotlib
+import numpy as np
+import numpy.ma as ma
+
+matplotlib.use("Agg")
+import matplotlib.colors as colors  # isort:skip  # noqa: E402
+import matplotlib.pyplot as plt  # isort:skip  # noqa: E402
+import matplotlib.ticker as ticker  # isort:skip  # noqa: E402
+
+# The number of rows and columns of the grid whose spacing in pixels is
+# sampled to choose the size of the averaged blocks.
+NUM_SAMPLES = 50
+
+
+def pcolormesh(ax, lon, lat, var, levels, norm, cmap, transform=None):
+    """
+    Draw the 2D field var on the lat x lon grid on ax, like
+    ax.contourf(lon, lat, var, levels=levels, norm=norm, cmap=cmap,
+    extend="both"). If levels is None, they're chosen like contourf() does.
+
+    The grid is averaged in blocks of about a pixel of the map, ignoring the
+    masked values.
+    """
+    lon = np.asarray(lon[:], dtype=np.float64)
+    lat = np.asarray(lat[:], dtype=np.float64)
+    if levels is None:
+        levels = get_levels(var)
+
+    ny, nx = get_block_shape(ax, lon, lat, transform)
+    if ny > 1 or nx > 1:
+        var = block_mean(var, ny, nx)
+        lat = block_mean(lat, ny, 1).filled()
+        lon = block_mean(lon, nx, 1).filled()
+
+    band_cmap, band_norm = get_band_colormap(cmap, levels, norm)
+    kwargs = {} if transform is None else {"transform": transform}
+    return ax.pcolormesh(
+        lon,
+        lat,
+        var,
+        cmap=band_cmap,
+        norm=band_norm,
+        shading="nearest",
+        rasterized=True,
+        **kwargs,
+    )
+
+
+def get_levels(var):
+    """
+    Get the contour levels contourf() chooses for var with extend="both".
+    """
+    zmin = float(ma.min(var))
+    zmax = float(ma.max(var))
+    levels = ticker.MaxNLocator(8, min_n_ticks=1).tick_values(zmin, zmax)
+
+    # Trim the levels outside of the data, which are covered by the extensions.
+    under = np.nonzero(levels < zmin)[0]
+    i0 = (under[-1] if len(under) else 0) + 1
+    over = np.nonzero(levels > zmax)[0]
+    i1 = (over[0] + 1 if len(over) else len(levels)) - 1
+    if i1 - i0 < 3:
+        i0, i1 = 0, len(levels)
+
+    return list(levels[i0:i1])
+
+
+def get_band_colormap(cmap, levels, norm=None):
+    """
+    Get a colormap and norm that give each value the color of the filled
+    contour between levels it's in, like contourf(levels=levels, norm=norm,
+    cmap=cmap, extend="both").
+    """
+    cmap = plt.get_cmap(cmap)
+    levels = np.asarray(levels, dtype=np.float64)
+    if norm is None:
+        norm = colors.Normalize(vmin=levels[0], vmax=levels[-1])
+
+    # contourf() colors each band with the color of its midpoint.
+    midpoints = (levels[:-1] + levels[1:]) / 2
+    band_cmap = colors.ListedColormap(cmap(norm(midpoints))).with_extremes(
+        under=cmap(norm(levels[0] - 1)), over=cmap(norm(levels[-1] + 1))
+    )
+    # The colorbar has the extensions of extend="both", like contourf().
+    band_cmap.colorbar_extend = "both"
+
+    return band_cmap, colors.BoundaryNorm(levels, band_cmap.N)
+
+
+def get_block_shape(ax, lon, lat, transform=None):
+    """
+    Get the number of points along lat and lon of the blocks of the grid,
+    so a block is about a pixel wide where the grid is the coarsest on ax.
+    The blocks are then at most about a pixel wide anywhere on the map.
+    """
+    if len(lat) < 2 or len(lon) < 2:
+        return 1, 1
+
+    ilat = np.unique(np.linspace(0, len(lat) - 2, NUM_SAMPLES).astype(int))
+    ilon = np.unique(np.linspace(0, len(lon) - 2, NUM_SAMPLES).astype(int))
+    lon_2d, lat_2d = np.meshgrid(lon[ilon], lat[ilat])
+    next_lon_2d, next_lat_2d = np.meshgrid(lon[ilon + 1], lat[ilat + 1])
+
+    def to_pixels(x, y):
+        if transform is not None:
+            x, y = ax.projection.transform_points(transform, x, y)[..., :2].T
+            x, y = x.T, y.T
+        xy = ax.transData.transform(np.stack([x.ravel(), y.ravel()], axis=1))
+        return xy.reshape(x.shape + (2,))
+
+    with np.errstate(invalid="ignore"):
+        points = to_pixels(lon_2d, lat_2d)
+        bbox = ax.bbox
+        inside = (
+            (points[..., 0] >= bbox.x0)
+            & (points[..., 0] <= bbox.x1)
+            & (points[..., 1] >= bbox.y0)
+            & (points[..., 1] <= bbox.y1)
+        )
+        if not inside.any():
+            return 1, 1
+
+        block_shape = []
+        for next_points in [
+            to_pixels(lon_2d, next_lat_2d),
+            to_pixels(next_lon_2d, lat_2d),
+        ]:
+            pixels = np.hypot(*(next_points - points).transpose(2, 0, 1))
+            # Steps that wrap around the map aren't the spacing of the grid.
+            pixels = pixels[inside & np.isfinite(pixels) & (pixels < bbox.width / 2)]
+            spacing = pixels.max() if pixels.size else 0.0
+            block_shape.append(max(int(round(1 / spacing)), 1) if spacing > 0 else 1)
+
+    return tuple(block_shape)
+
+
+def block_mean(var, ny, nx):
+    """
+    Average the 2D var, or a 1D var if nx is 1, over blocks of ny x nx
+    points. Masked values aren't averaged, and the blocks without any valid
+    values are masked. The blocks at the ends can have fewer points.
+    """
+    var = ma.asarray(var)
+    if var.ndim == 1:
+        var = var[:, np.newaxis]
+        squeeze = True
+    else:
+        squeeze = False
+
+    height, width = var.shape
+    num_y = -(-height // ny)
+    num_x = -(-width // nx)
+
+    data = np.zeros((num_y * ny, num_x * nx))
+    valid = np.zeros((num_y * ny, num_x * nx), dtype=bool)
+    data[:height, :width] = ma.getdata(var)
+    valid[:height, :width] = ~ma.getmaskarray(var)
+
+    sums = np.where(valid, data, 0.0).reshape(num_y, ny, num_x, nx).sum(axis=(1, 3))
+    counts = valid.reshape(num_y, ny, num_x, nx).sum(axis=(1, 3))
+    means = ma.masked_where(counts == 0, sums / np.maximum(counts, 1))
+
+    return means[:, 0] if squeeze else means
@@ -0,0 +1,102 @@
+"""
+Per-process caches of the resources that the cartopy plots use for every
+output file: the projections, the Natural Earth features, and the figures,
+which are cleared and reused instead of created again.
+"""
+import cartopy.crs as ccrs
+import cartopy.feature as cfeature
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # isort:skip  # noqa: E402
+
+_projections = {}
+_features = {}
+_figures = {}
+
+
+def get_projection(name, **kwargs):
+    """
+    Get the projection ccrs.<name>(**kwargs), e.g.
+    get_projection("PlateCarree", central_longitude=180).
+    """
+    key = (name, tuple(sorted(kwargs.items())))
+    if key not in _projections:
+        _projections[key] = getattr(ccrs, name)(**kwargs)
+
+    return _projections[key]
+
+
+class CachedFeature(cfeature.Feature):
+    """
+    A cartopy feature whose geometries are only selected once for each
+    extent it's drawn in.
+    """
+
+    def __init__(self, feature):
+        super(CachedFeature, self).__init__(feature.crs, **feature.kwargs)
+        self._feature = feature
+        self._geometries = {}
+
+    def geometries(self):
+        return self._feature.geometries()
+
+    def intersecting_geometries(self, extent):
+        key = None if extent is None else tuple(np.round(extent, 6))
+        if key not in self._geometries:
+            self._geometries[key] = list(self._feature.intersecting_geometries(extent))
+
+        return iter(self._geometries[key])
+
+
+def get_feature(name, scale=None):
+    """
+    Get the Natural Earth feature cfeature.<name>, e.g. "COASTLINE", with the
+    scale if it's set. Otherwise, the scale is chosen from the extent.
+    """
+    key = (name, scale)
+    if key not in _features:
+        feature = getattr(cfeature, name)
+        if scale:
+            feature = feature.with_scale(scale)
+        _features[key] = CachedFeature(feature)
+
+    return _features[key]
+
+
+def add_coastlines(ax, resolution=None, color="black", **kwargs):
+    """
+    Add the coastlines to ax, like ax.coastlines().
+    """
+    return ax.add_feature(
+        get_feature("COASTLINE", resolution),
+        edgecolor=color,
+        facecolor="none",
+        **kwargs,
+    )
+
+
+def get_figure(figsize, dpi):
+    """
+    Get a cleared figure of figsize and dpi, which is the current figure.
+    The figure is reused by the next plot of the same size and dpi, so it's
+    released with release_figure() instead of plt.close().
+    """
+    key = (tuple(figsize), dpi)
+    fig = _figures.get(key)
+    if fig is None or not plt.fignum_exists(fig.number):
+        fig = plt.figure(figsize=figsize, dpi=dpi)
+        _figures[key] = fig
+    else:
+        fig.clf()
+        plt.figure(fig.number)
+
+    return fig
+
+
+def release_figure(fig):
+    """
+    Clear the figure, so the data of the plot isn't kept until it's reused.
+    """
+    fig.clf()
@@ -3,7 +3,6 @@ from __future__ import print_function
 import os
 
 import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 import cdutil
 import matplotlib
 import numpy as np
@@ -13,6 +12,8 @@ from cartopy.mpl.ticker import LatitudeFormatter, LongitudeFormatter
 from e3sm_diags.derivations.default_regions import regions_specs
 from e3sm_diags.driver.utils.general import get_output_dir
 from e3sm_diags.logger import custom_logger
+from e3sm_diags.plot import FigureSaver
+from e3sm_diags.plot.cartopy import resources
 
 matplotlib.use("Agg")
 import matplotlib.colors as colors  # isort:skip  # noqa: E402
@@ -186,8 +187,8 @@ def plot_panel_seasonality_map(
 
     # Full world would be aspect 360/(2*180) = 1
     ax.set_aspect((lon_east - lon_west) / (2 * (lat_north - lat_south)))
-    ax.coastlines(lw=0.3)
-    ax.add_feature(cfeature.RIVERS)
+    resources.add_coastlines(ax, lw=0.3)
+    ax.add_feature(resources.get_feature("RIVERS"))
     if title[0] is not None:
         ax.set_title(title[0], loc="left", fontdict=plotSideTitle)
     if title[1] is not None:
@@ -322,11 +323,12 @@ def plot_seasonality_map(export, parameter):
     )
 
     # Save figure
+    saver = FigureSaver(fig)
     for f in parameter.output_format:
         f = f.lower().split(".")[-1]
         plot_suffix = "." + f
         plot_file_path = file_path + plot_suffix
-        plt.savefig(plot_file_path)
+        saver.save(plot_file_path)
         # Get the filename that the user has passed in and display that.
         original_plot_file_path = original_file_path + plot_suffix
         # Always print, even without `parameter.print_statements`
@@ -346,7 +348,7 @@ def plot_seasonality_map(export, parameter):
             # Save subplot
             subplot_suffix = ".%i." % i + f
             subplot_file_path = file_path + subplot_suffix
-            plt.savefig(subplot_file_path, bbox_inches=extent)
+            saver.save(subplot_file_path, extent)
             # Get the filename that the user has passed in and display that.
             original_subplot_file_path = original_file_path + subplot_suffix
             # Always print, even without `parameter.print_statements`
@@ -416,8 +418,8 @@ def plot_panel_annual_map(panel_index, fig, proj, export, bias_array, panel, par
 
     # Full world would be aspect 360/(2*180) = 1
     ax.set_aspect((lon_east - lon_west) / (2 * (lat_north - lat_south)))
-    ax.coastlines(lw=0.3)
-    ax.add_feature(cfeature.RIVERS)
+    resources.add_coastlines(ax, lw=0.3)
+    ax.add_feature(resources.get_feature("RIVERS"))
     if panel_type == "test":
         title = parameter.test_title
     elif panel_type == "ref":
@@ -604,11 +606,12 @@ def plot_annual_map(export, bias, parameter):
     )
 
     # Save figure
+    saver = FigureSaver(fig)
     for f in parameter.output_format:
         f = f.lower().split(".")[-1]
         plot_suffix = "." + f
         plot_file_path = file_path + plot_suffix
-        plt.savefig(plot_file_path)
+        saver.save(plot_file_path)
         # Get the filename that the user has passed in and display that.
         original_plot_file_path = original_file_path + plot_suffix
         # Always print, even without `parameter.print_statements`
@@ -628,7 +631,7 @@ def plot_annual_map(export, bias, parameter):
             # Save subplot
             subplot_suffix = ".%i." % i + f
             subplot_file_path = file_path + subplot_suffix
-            plt.savefig(subplot_file_path, bbox_inches=extent)
+            saver.save(subplot_file_path, extent)
             # Get the filename that the user has passed in and display that.
             original_subplot_file_path = original_file_path + subplot_suffix
             # Always print, even without `parameter.print_statements`
@@ -1,13 +1,12 @@
 import os
 
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 import matplotlib
 import numpy as np
 from cartopy.mpl.ticker import LatitudeFormatter, LongitudeFormatter
 
 from e3sm_diags.driver.utils.general import get_output_dir
 from e3sm_diags.logger import custom_logger
+from e3sm_diags.plot.cartopy import resources
 
 matplotlib.use("agg")
 import matplotlib.pyplot as plt  # isort:skip  # noqa: E402
@@ -65,27 +64,27 @@ def get_ax_size(fig, ax):
 def plot_panel(n, fig, proj, var, var_num_years, region, title):
 
     ax = fig.add_axes(panel[n], projection=proj)
-    ax.set_extent(plot_info[region][0], ccrs.PlateCarree())
+    ax.set_extent(plot_info[region][0], resources.get_projection("PlateCarree"))
 
     clevs = plot_info[region][4]
     p1 = ax.contourf(
         var.getLongitude(),
         var.getLatitude(),
         var / var_num_years / plot_info[region][6],
-        transform=ccrs.PlateCarree(),
+        transform=resources.get_projection("PlateCarree"),
         levels=clevs,
         extend="both",
         cmap="jet",
     )
-    ax.coastlines(lw=0.3)
-    ax.add_feature(cfeature.LAND, zorder=100, edgecolor="k")
+    resources.add_coastlines(ax, lw=0.3)
+    ax.add_feature(resources.get_feature("LAND"), zorder=100, edgecolor="k")
 
     if title != "Observation":
         ax.set_title("{}".format(title), fontdict=plotTitle)
     else:
         ax.set_title("{}".format(plot_info[region][5]), fontdict=plotTitle)
-    ax.set_xticks(plot_info[region][1], crs=ccrs.PlateCarree())
-    ax.set_yticks(plot_info[region][2], crs=ccrs.PlateCarree())
+    ax.set_xticks(plot_info[region][1], crs=resources.get_projection("PlateCarree"))
+    ax.set_yticks(plot_info[region][2], crs=resources.get_projection("PlateCarree"))
     lon_formatter = LongitudeFormatter(zero_direction_label=True, number_format=".0f")
     lat_formatter = LatitudeFormatter()
     ax.xaxis.set_major_formatter(lon_formatter)
@@ -109,8 +108,8 @@ def plot_map(test_data, ref_data, region, parameter):
     ref = ref_data["{}_density".format(region)]
     ref_num_years = ref_data["{}_num_years".format(region)]
 
-    fig = plt.figure(figsize=[8.5, 8.5], dpi=parameter.dpi)
-    proj = ccrs.PlateCarree(central_longitude=180)
+    fig = resources.get_figure([8.5, 8.5], parameter.dpi)
+    proj = resources.get_projection("PlateCarree", central_longitude=180)
 
     # First panel
     plot_panel(
@@ -147,7 +146,8 @@ def plot_map(test_data, ref_data, region, parameter):
         )
         plt.savefig(fnm)
         logger.info(f"Plot saved in: {fnm}")
-        plt.close()
+
+    resources.release_figure(fig)
 
 
 def plot(test, ref, parameter, basin_dict):
@@ -0,0 +1,172 @@
+from unittest import TestCase
+
+import cdms2
+import cdutil
+import numpy as np
+import numpy.ma as ma
+
+from e3sm_diags.driver.area_mean_time_series_driver import (
+    AnnualMeans,
+    get_area_means,
+    get_axis_indices,
+    get_region_weights,
+)
+from e3sm_diags.driver.utils.general import select_region
+
+# The days in each month of a noleap calendar.
+MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def _get_monthly_bounds(first_year, first_month, num_months):
+    """Get the years and the time bounds in days of a monthly series."""
+    months = np.arange(num_months) + first_month - 1
+    days = MONTH_DAYS[months % 12]
+    ends = np.cumsum(days).astype(np.float64)
+    years = first_year + months // 12
+
+    return years, np.stack([ends - days, ends], axis=1)
+
+
+class TestGetAxisIndices(TestCase):
+    def test_returns_the_index_of_each_value(self):
+        axis = np.arange(-87.5, 90, 5)
+
+        np.testing.assert_array_equal(
+            get_axis_indices(axis, [-27.5, -22.5, 87.5]), [12, 13, 35]
+        )
+
+    def test_wraps_the_values_around_the_period(self):
+        axis = np.arange(0.0, 360, 5)
+
+        np.testing.assert_array_equal(
+            get_axis_indices(axis, [-10.0, 360.0, 365.0], period=360.0), [70, 0, 1]
+        )
+
+    def test_raises_error_if_a_value_isnt_on_the_axis(self):
+        with self.assertRaises(RuntimeError):
+            get_axis_indices(np.arange(0.0, 360, 5), [2.5])
+
+
+class TestGetAreaMeans(TestCase):
+    def test_averages_the_valid_values_of_each_region(self):
+        # 2 regions x (2 lat * 2 lon)
+        region_weights = np.array([[1.0, 1.0, 3.0, 3.0], [0.0, 2.0, 0.0, 2.0]])
+        var = ma.masked_array(
+            [
+                [[1.0, 2.0], [3.0, 4.0]],
+                [[1.0, 2.0], [3.0, 4.0]],
+            ],
+            mask=[
+                [[False, False], [False, False]],
+                [[False, True], [True, True]],
+            ],
+        )
+
+        result = get_area_means(var, region_weights)
+
+        np.testing.assert_allclose(result[0], [(1 + 2 + 9 + 12) / 8, (4 + 8) / 4])
+        np.testing.assert_allclose(result[1, 0], 1.0)
+        self.assertIs(result[1, 1], ma.masked)
+
+
+class TestAnnualMeans(TestCase):
+    def setUp(self):
+        # Jul 2000 to Mar 2002, so the first and last years are partial.
+        self.years, self.tbounds = _get_monthly_bounds(2000, 7, 21)
+        rng = np.random.default_rng(0)
+        self.means = ma.masked_array(
+            rng.normal(size=(21, 2)), mask=np.zeros((21, 2), dtype=bool)
+        )
+        # A masked month, and a year without any valid month in region 1.
+        self.means[8, 0] = ma.masked
+        self.means[18:, 1] = ma.masked
+
+    def _get_expected(self):
+        expected = []
+        for year in [2000, 2001, 2002]:
+            in_year = self.years == year
+            dt = self.tbounds[in_year, 1] - self.tbounds[in_year, 0]
+            expected.append(ma.average(self.means[in_year], axis=0, weights=dt))
+
+        return ma.stack(expected)
+
+    def test_weights_the_months_by_their_length(self):
+        annual_means = AnnualMeans()
+        annual_means.add(self.means, self.tbounds, self.years)
+
+        result, bounds = annual_means.get()
+
+        expected = self._get_expected()
+        np.testing.assert_array_equal(
+            ma.getmaskarray(result), [[False, False], [False, False], [False, True]]
+        )
+        np.testing.assert_array_equal(
+            ma.getmaskarray(expected), ma.getmaskarray(result)
+        )
+        np.testing.assert_allclose(result.compressed(), expected.compressed())
+        # The bounds of the partial years are the bounds of their months.
+        np.testing.assert_array_equal(
+            bounds, [[0.0, 184.0], [184.0, 549.0], [549.0, 639.0]]
+        )
+
+    def test_accumulates_the_years_split_between_chunks(self):
+        annual_means = AnnualMeans()
+        for chunk in [slice(0, 4), slice(4, 11), slice(11, 21)]:
+            annual_means.add(self.means[chunk], self.tbounds[chunk], self.years[chunk])
+
+        result, bounds = annual_means.get()
+
+        np.testing.assert_allclose(
+            result.compressed(), self._get_expected().compressed()
+        )
+        self.assertEqual(bounds.shape, (3, 2))
+
+    def test_matches_cdutil_year(self):
+        time = cdms2.createAxis(self.tbounds.mean(axis=1))
+        time.designateTime()
+        time.id = "time"
+        time.units = "days since 2000-07-01"
+        time.calendar = "noleap"
+
+        annual_means = AnnualMeans()
+        annual_means.add(self.means, self.tbounds, self.years)
+        result, _ = annual_means.get()
+
+        for i in range(self.means.shape[1]):
+            series = cdms2.createVariable(self.means[:, i], axes=[time], id="TS")
+            cdutil.setTimeBoundsMonthly(series)
+            expected = cdutil.YEAR(series)
+
+            np.testing.assert_array_equal(
+                ma.getmaskarray(result[:, i]), ma.getmaskarray(expected)
+            )
+            np.testing.assert_allclose(result[:, i].compressed(), expected.compressed())
+
+
+class TestGetRegionWeights(TestCase):
+    def setUp(self):
+        lat = cdms2.createAxis(np.arange(-87.5, 90, 5))
+        lat.designateLatitude()
+        lat.id = "lat"
+        lat.units = "degrees_north"
+        lon = cdms2.createAxis(np.arange(0.0, 360, 5))
+        lon.designateLongitude()
+        lon.id = "lon"
+        lon.units = "degrees_east"
+
+        data = np.random.default_rng(0).normal(size=(36, 72))
+        self.var = cdms2.createVariable(
+            ma.masked_where(data > 1.5, data), axes=[lat, lon], id="TS"
+        )
+        self.var.units = "K"
+
+    def test_averages_like_cdutil_averager_over_the_selected_region(self):
+        regions = ["global", "TROPICS", "NHEX", "20S20N"]
+
+        region_weights = get_region_weights(self.var, regions, None, None, None)
+        result = get_area_means(ma.asarray(self.var)[np.newaxis], region_weights)
+
+        for i, region in enumerate(regions):
+            domain = select_region(region, self.var, None, None, None)
+            expected = cdutil.averager(domain, axis="xy")
+            np.testing.assert_allclose(result[0, i], expected)
@@ -0,0 +1,74 @@
+import warnings
+from unittest import TestCase
+
+import numpy as np
+import numpy.ma as ma
+import scipy.stats
+
+from e3sm_diags.driver.enso_diags_driver import _linregress_grid
+
+
+class TestLinregressGrid(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = rng.normal(size=40)
+        self.y = ma.masked_array(
+            0.5 * self.x[:, np.newaxis, np.newaxis] + rng.normal(size=(40, 4, 5)),
+            mask=np.zeros((40, 4, 5), dtype=bool),
+        )
+
+    def _assert_matches_linregress(self, slope, pvalue):
+        for index in np.ndindex(*self.y.shape[1:]):
+            valid = ~ma.getmaskarray(self.y)[(slice(None),) + index]
+            if valid.sum() < 3:
+                self.assertIs(slope[index], ma.masked)
+                self.assertIs(pvalue[index], ma.masked)
+                continue
+
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                expected = scipy.stats.linregress(
+                    self.x[valid], ma.getdata(self.y)[(valid,) + index]
+                )
+            np.testing.assert_allclose(slope[index], expected.slope, atol=1e-12)
+            # Newer versions of scipy return a NaN p-value instead of 1 for a
+            # constant series, which isn't significant either way.
+            if not np.isnan(expected.pvalue):
+                np.testing.assert_allclose(pvalue[index], expected.pvalue, atol=1e-12)
+
+    def test_matches_linregress_at_each_grid_point(self):
+        slope, pvalue = _linregress_grid(self.x, self.y)
+
+        self.assertEqual(slope.shape, (4, 5))
+        self.assertFalse(ma.getmaskarray(slope).any())
+        self._assert_matches_linregress(slope, pvalue)
+
+    def test_matches_linregress_with_chunks_smaller_than_the_grid(self):
+        self.y[::3, 1, 2] = ma.masked
+
+        slope, pvalue = _linregress_grid(self.x, self.y, chunk_size=3)
+
+        self._assert_matches_linregress(slope, pvalue)
+
+    def test_excludes_masked_values_and_masks_points_with_fewer_than_3(self):
+        self.y[5:, 0, 0] = ma.masked
+        self.y[2:, 0, 1] = ma.masked
+        self.y[:, 3, 4] = ma.masked
+
+        slope, pvalue = _linregress_grid(self.x, self.y, chunk_size=7)
+
+        np.testing.assert_array_equal(
+            ma.getmaskarray(slope).nonzero(), ([0, 3], [1, 4])
+        )
+        self._assert_matches_linregress(slope, pvalue)
+
+    def test_matches_linregress_for_constant_and_perfectly_linear_series(self):
+        self.y[:, 0, 0] = 3.0
+        self.y[:, 0, 1] = 2.0 * self.x + 1.0
+        self.y[:, 0, 2] = -self.x
+
+        slope, pvalue = _linregress_grid(self.x, self.y)
+
+        np.testing.assert_allclose(slope[0, :3], [0.0, 2.0, -1.0], atol=1e-12)
+        np.testing.assert_allclose(pvalue[0, 0], 1.0)
+        self._assert_matches_linregress(slope, pvalue)
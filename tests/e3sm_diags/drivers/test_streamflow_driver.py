@@ -0,0 +1,180 @@
+from unittest import TestCase
+
+import numpy as np
+
+from e3sm_diags.driver.streamflow_driver import (
+    GAUGES_CHUNK_SIZE,
+    generate_export,
+    get_seasonality,
+)
+from e3sm_diags.parameter.streamflow_parameter import StreamflowParameter
+
+RESOLUTION = 0.5
+
+
+def _get_grid_index(lon, lat):
+    x = int(1 + (lon - (-180 + RESOLUTION / 2)) / RESOLUTION)
+    y = int(1 + (lat - (-90 + RESOLUTION / 2)) / RESOLUTION)
+    return x - 1, y - 1
+
+
+def _get_loop_seasonality(mmat):
+    """The annual mean and seasonality of a 12 x num_years matrix."""
+    annual_mean = np.mean(np.nanmean(mmat, axis=1))
+    if np.isnan(annual_mean):
+        # The identified grid is in the ocean
+        return (annual_mean,) + get_seasonality(np.ones((12, 1)))
+    return (annual_mean,) + get_seasonality(mmat)
+
+
+def _generate_export_per_gauge(
+    lat_lon, area_upstream, gauges, using_ref_mat_file, ref_array, test_array
+):
+    """The export of each gauge, computed one gauge at a time."""
+    export = np.zeros((lat_lon.shape[0], 9))
+    for i in range(lat_lon.shape[0]):
+        lat_ref, lon_ref = lat_lon[i, 1], lat_lon[i, 0]
+        x, y = _get_grid_index(lon_ref, lat_ref)
+        area_ref = gauges[i, 13]
+        drainage_area_error = (
+            np.abs(area_upstream[x, y] / 1000000 - area_ref) / area_ref
+        )
+
+        if using_ref_mat_file:
+            origin_id = int(gauges[i, 1])
+            months = ref_array[:, 1]
+            flow = ref_array[:, origin_id + 1]
+            monthly_mean = np.full(12, np.nan)
+            for month in range(12):
+                if np.any(~np.isnan(flow[months == month + 1])):
+                    monthly_mean[month] = np.nanmean(flow[months == month + 1])
+            annual_mean_ref = np.mean(monthly_mean)
+            if np.isnan(annual_mean_ref):
+                export[i, :] = np.nan
+                continue
+            mmat = np.reshape(flow, (-1, 12)).T
+            with_record = ~np.isnan(np.sum(mmat, axis=0))
+            if np.any(with_record):
+                monthly = mmat[:, with_record]
+            else:
+                monthly = monthly_mean[:, np.newaxis]
+            seasonality_index_ref, peak_month_ref = get_seasonality(monthly)
+        else:
+            (
+                annual_mean_ref,
+                seasonality_index_ref,
+                peak_month_ref,
+            ) = _get_loop_seasonality(np.reshape(ref_array[x, y, :], (-1, 12)).T)
+
+        (
+            annual_mean_test,
+            seasonality_index_test,
+            peak_month_test,
+        ) = _get_loop_seasonality(np.reshape(test_array[x, y, :], (-1, 12)).T)
+
+        export[i] = [
+            annual_mean_ref,
+            annual_mean_test,
+            drainage_area_error * 100,
+            seasonality_index_ref,
+            peak_month_ref,
+            seasonality_index_test,
+            peak_month_test,
+            lat_ref,
+            lon_ref,
+        ]
+    return export
+
+
+class TestGenerateExport(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.num_gauges = 7
+        num_years = 4
+
+        # Gauges at the center of distinct grid cells.
+        cells = rng.choice(720 * 360, size=self.num_gauges, replace=False)
+        lon = -180 + RESOLUTION * (cells // 360 + 0.5)
+        lat = -90 + RESOLUTION * (cells % 360 + 0.5)
+        self.lat_lon = np.stack([lon, lat], axis=1)
+
+        # Column 1 is the origin id of the gauge, column 13 its drainage area.
+        self.gauges = np.zeros((self.num_gauges, 14))
+        self.gauges[:, 1] = rng.permutation(self.num_gauges) + 1
+        self.gauges[:, 13] = rng.uniform(100, 1000, size=self.num_gauges)
+        self.area_upstream = rng.uniform(1e8, 1e9, size=(720, 360))
+
+        # GSIM: year, month, then the streamflow of each origin id from 1.
+        flow = rng.gamma(2.0, size=(num_years * 12, self.num_gauges))
+        # Years with a missing month, and gauges without any record.
+        flow[3, 0] = np.nan
+        flow[12:30, 1] = np.nan
+        flow[:, 2] = np.nan
+        flow[::12, 3] = np.nan
+        flow[:14, 4] = np.nan
+        flow[15:, 4] = np.nan
+        self.ref_mat = np.column_stack(
+            [
+                np.repeat(np.arange(2000, 2000 + num_years), 12),
+                np.tile(np.arange(1, 13), num_years),
+                flow,
+            ]
+        )
+
+        self.test_array = np.full((720, 360, num_years * 12), np.nan)
+        self.ref_grid = np.full((720, 360, num_years * 12), np.nan)
+        for lon, lat in self.lat_lon:
+            x, y = _get_grid_index(lon, lat)
+            self.test_array[x, y] = rng.gamma(2.0, size=num_years * 12)
+            self.ref_grid[x, y] = rng.gamma(2.0, size=num_years * 12)
+        # A gauge in the ocean of the model.
+        x, y = _get_grid_index(*self.lat_lon[5])
+        self.test_array[x, y] = np.nan
+
+        self.parameter = StreamflowParameter()
+        self.parameter.max_num_gauges = None
+
+    def _assert_matches_the_per_gauge_export(self, using_ref_mat_file, ref_array):
+        result = generate_export(
+            self.parameter,
+            self.lat_lon,
+            self.area_upstream,
+            self.gauges,
+            RESOLUTION,
+            using_ref_mat_file,
+            ref_array,
+            self.test_array,
+        )
+        expected = _generate_export_per_gauge(
+            self.lat_lon,
+            self.area_upstream,
+            self.gauges,
+            using_ref_mat_file,
+            ref_array,
+            self.test_array,
+        )
+
+        np.testing.assert_allclose(result, expected, rtol=1e-12)
+        return result
+
+    def test_matches_the_per_gauge_export_with_gsim(self):
+        result = self._assert_matches_the_per_gauge_export(True, self.ref_mat)
+
+        # The gauge whose origin id has no record.
+        self.assertTrue(np.isnan(result[self.gauges[:, 1] == 3]).all())
+
+    def test_matches_the_per_gauge_export_with_a_model_reference(self):
+        self._assert_matches_the_per_gauge_export(False, self.ref_grid)
+
+    def test_matches_the_per_gauge_export_across_chunks(self):
+        num_gauges = GAUGES_CHUNK_SIZE + 3
+        self.lat_lon = np.resize(self.lat_lon, (num_gauges, 2))
+        self.gauges = np.resize(self.gauges, (num_gauges, 14))
+
+        self._assert_matches_the_per_gauge_export(True, self.ref_mat)
+
+    def test_raises_error_if_the_gsim_months_are_out_of_order(self):
+        self.ref_mat[[0, 1]] = self.ref_mat[[1, 0]]
+
+        with self.assertRaises(Exception):
+            self._assert_matches_the_per_gauge_export(True, self.ref_mat)
@@ -1,26 +1,24 @@
+import os
 import shutil
 import tempfile
-from typing import TYPE_CHECKING, Dict, Union
+from typing import Dict, Union
 from unittest import TestCase
-from unittest.mock import MagicMock
+from unittest.mock import patch
 
 import numpy as np
 from netCDF4 import Dataset
 
 from e3sm_diags.driver.tc_analysis_driver import (
-    BASIN_DICT,
     _calc_mean_ace,
-    _calc_num_storms_and_max_len,
     _calc_seasonal_cycle,
     _calc_ts_intensity_dist,
+    _derive_metrics_per_basin,
     _get_mon_wind,
     _get_monthmc_yearic,
-    _get_vars_from_te_stitch,
+    _nearest_index,
+    read_te_stitch_file,
 )
 
-if TYPE_CHECKING:
-    from cdms2.dataset import DatasetVariable
-
 
 class TestRunDiags(TestCase):
     # TODO: Add tests
@@ -32,75 +30,101 @@ class TestGenerateTCMetricsFromTEStitchFile(TestCase):
     pass
 
 
-class TestCalcNumStormAndMaxLen(TestCase):
-    def test_correct_output(self):
-        lines = ["s", "a", "a", "s"]
-
-        expected_num_storms = 2
-        expected_max_len = 2
-        num_storms, max_len = _calc_num_storms_and_max_len(lines)
-
-        self.assertEqual(num_storms, expected_num_storms)
-        self.assertEqual(max_len, expected_max_len)
-
-
-class TestGetVarsFromTEStitch(TestCase):
-    def test_correct_output(self):
-        lines = [
-            "storm\tfoo\t90\t180\tfoo\t1\t1\t1",
-            "test\tfoo\t90\t180\tfoo\t1\t1\t1",
-        ]
-        max_len = 2
-        num_storms = 2
-
-        expected: Dict[str, Union[np.ndarray, int]] = {
-            "longmc": np.array([[90, np.nan]]),
-            "latmc": np.array([[180, np.nan]]),
-            "vsmc": np.array([[1.94, np.nan]]),
-            "yearmc": np.array([[1, np.nan]]),
-            "monthmc": np.array([[1, np.nan]]),
-            "year_start": 90,
-            "year_end": 90,
-            "num_years": 1,
-        }
-        result = _get_vars_from_te_stitch(lines, max_len, num_storms)
+class TestNearestIndex(TestCase):
+    def test_finds_the_nearest_index_of_each_value(self):
+        axis = np.array([-10.0, 0.0, 10.0, 20.0])
+        values = np.array([-50.0, 4.0, 16.0, 30.0])
 
-        np.array_equal(result["longmc"], expected["longmc"])
-        np.array_equal(result["latmc"], expected["latmc"])
-        np.array_equal(result["vsmc"], expected["vsmc"])
-        np.array_equal(result["yearmc"], expected["yearmc"])
-        np.array_equal(result["monthmc"], expected["monthmc"])
-        self.assertEqual(result["year_start"], expected["year_start"])
-        self.assertEqual(result["year_end"], expected["year_end"])
-        self.assertEqual(result["num_years"], expected["num_years"])
+        result = _nearest_index(axis, values)
+        np.testing.assert_array_equal(result, [0, 1, 3, 3])
 
+    def test_uses_the_lowest_index_of_equally_near_values(self):
+        axis = np.array([20.0, 10.0, 0.0, -10.0])
+        values = np.array([5.0, 15.0])
 
-class TestDeriveMetricsPerBasin(TestCase):
-    def test_correct_output(self):
-        te_stitch_vars: Dict[str, Union[np.ndarray, int]] = {  # noqa
-            "longmc": np.array([[90, np.nan]]),
-            "latmc": np.array([[180, np.nan]]),
-            "vsmc": np.array([[1.94, np.nan]]),
-            "yearmc": np.array([[1, np.nan]]),
-            "monthmc": np.array([[1, np.nan]]),
-            "year_start": 90,
-            "year_end": 90,
-            "num_years": 1,
-        }
-        num_storms = 2  # noqa
-        basin_info = BASIN_DICT["NA"]  # noqa
+        result = _nearest_index(axis, values)
+        np.testing.assert_array_equal(result, [1, 0])
+
+
+class TestReadTEStitchFile(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.te_stitch_file = os.path.join(self.test_dir, "cyclones_stitch.dat")
+
+        with open(self.te_stitch_file, "w") as f:
+            f.write("start\t2\t1990\t1\t1\t0\n")
+            f.write("\t0\t90\t10\t1000\t1\t1990\t1\t1\n")
+            f.write("\t0\t91\t11\t1000\t2\t1990\t2\t1\n")
+            f.write("start\t1\t1991\t1\t1\t0\n")
+            f.write("\t0\t200\t-20\t1000\t3\t1991\t3\t1\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_reads_tracks_into_flat_arrays_with_storm_offsets(self):
+        result = read_te_stitch_file(self.te_stitch_file)
+
+        np.testing.assert_array_equal(result["longmc"], [90, 91, 200])
+        np.testing.assert_array_equal(result["latmc"], [10, 11, -20])
+        np.testing.assert_allclose(result["vsmc"], [1.94, 3.88, 5.82])
+        np.testing.assert_array_equal(result["yearmc"], [1990, 1990, 1991])
+        np.testing.assert_array_equal(result["monthmc"], [1, 2, 3])
+        np.testing.assert_array_equal(result["offsets"], [0, 2, 3])
+        self.assertEqual(result["num_storms"], 2)
+        self.assertEqual(result["max_len"], 2)
+        self.assertEqual(result["year_start"], 1990)
+        self.assertEqual(result["year_end"], 1991)
+        self.assertEqual(result["num_years"], 2)
+
+    def test_saves_and_loads_the_cache_file(self):
+        expected = read_te_stitch_file(self.te_stitch_file, use_cache=True)
+        self.assertTrue(os.path.exists(f"{self.te_stitch_file}.npz"))
+
+        result = read_te_stitch_file(self.te_stitch_file, use_cache=True)
+
+        self.assertEqual(result.keys(), expected.keys())
+        for key in expected:
+            np.testing.assert_array_equal(result[key], expected[key])
 
-        # FIXME: Figure out how to add return value when calling a DatasetVariable
-        # For example, ocnfranc[0,0]
-        ocnfranc: "DatasetVariable" = MagicMock()
-        ocnfranc.getLatitude.return_value = np.array([-90, -45, 0, 45, 90])
-        ocnfranc.getLongitude.return_value = np.array([-180, -90, 0, 90, 180])
+    def test_raises_error_if_file_doesnt_start_with_a_storm(self):
+        with open(self.te_stitch_file, "w") as f:
+            f.write("\t0\t90\t10\t1000\t1\t1990\t1\t1\n")
 
-        # TODO: Add an expected value
-        expected = None  # noqa
-        # result = _derive_metrics_per_basin(num_storms, te_stitch_vars, ocnfranc, basin_info)  # noqa
+        with self.assertRaises(ValueError):
+            read_te_stitch_file(self.te_stitch_file)
+
+
+class TestDeriveMetricsPerBasin(TestCase):
+    def setUp(self):
+        # A storm that starts over the ocean and one over land in North Atlantic.
+        self.te_stitch_vars: Dict[str, Union[np.ndarray, int]] = {
+            "longmc": np.array([300.0, 301.0, 280.0]),
+            "latmc": np.array([20.0, 21.0, 30.0]),
+            "vsmc": np.array([40.0, 50.0, 60.0]),
+            "yearmc": np.array([2000.0, 2000.0, 2001.0]),
+            "monthmc": np.array([8.0, 8.0, 9.0]),
+            "offsets": np.array([0, 2, 3]),
+            "num_storms": 2,
+            "year_start": 2000,
+            "year_end": 2001,
+            "num_years": 2,
+        }
 
-        # self.assertEqual(result, expected)
+    @patch(
+        "e3sm_diags.driver.tc_analysis_driver.get_ocean_frac_at",
+        return_value=np.array([1.0, 0.0]),
+    )
+    def test_correct_output(self, get_ocean_frac_at):
+        result = _derive_metrics_per_basin(self.te_stitch_vars)
+
+        np.testing.assert_array_equal(result["NA"]["mod_mon"], [8.0])
+        np.testing.assert_array_equal(result["NA"]["mod_wnd"], [50.0])
+        self.assertEqual(result["NA"]["mod_num"], 2)
+        self.assertEqual(result["NA"]["mod_num_ocn"], 1)
+        self.assertAlmostEqual(result["NA"]["mod_ace_mean"], 0.205)
+
+        self.assertEqual(result["WP"]["mod_num"], 0)
+        self.assertEqual(result["WP"]["mod_ace_mean"], 0.0)
 
 
 class TestGenerateTCMetricsFromObsFiles(TestCase):
@@ -0,0 +1,124 @@
+from unittest import TestCase
+
+import cdms2
+import numpy as np
+import numpy.ma as ma
+
+from e3sm_diags.driver.utils.climo import (
+    SEASON_IDX,
+    _accumulate_months,
+    _season_mean,
+    climo,
+)
+
+# The days in each month of a noleap calendar.
+MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+class TestAccumulateMonths(TestCase):
+    def setUp(self):
+        # 3 years and 2 months of monthly data on a 3 x 4 grid, from Nov.
+        num_times = 38
+        self.months = (np.arange(num_times) + 10) % 12
+        self.dt = MONTH_DAYS[self.months].astype(np.float64)
+
+        rng = np.random.default_rng(0)
+        data = rng.normal(size=(num_times, 3, 4)).astype(np.float32)
+        mask = rng.random((num_times, 3, 4)) < 0.2
+        # A point without any valid values in JJA.
+        mask[np.isin(self.months, [5, 6, 7]), 0, 0] = True
+        self.v = ma.masked_array(data, mask=mask)
+
+    def _get_climo(self, v, season):
+        """The climatology of the season, like climo() used to compute it."""
+        idx = np.array(
+            [SEASON_IDX[season][month] for month in self.months], dtype=bool
+        ).nonzero()
+        return ma.average(v[idx], axis=0, weights=self.dt[idx])
+
+    def test_season_means_match_the_climatology_of_the_timesteps(self):
+        monthly_sums, monthly_weights = _accumulate_months(self.v, self.months, self.dt)
+
+        self.assertEqual(monthly_sums.shape, (12, 3, 4))
+        for season in SEASON_IDX:
+            result = _season_mean(monthly_sums, monthly_weights, season)
+            expected = self._get_climo(self.v, season)
+
+            np.testing.assert_array_equal(
+                ma.getmaskarray(result), ma.getmaskarray(expected)
+            )
+            np.testing.assert_allclose(
+                result.compressed(), expected.compressed(), rtol=1e-6
+            )
+
+        self.assertIs(
+            _season_mean(monthly_sums, monthly_weights, "JJA")[0, 0], ma.masked
+        )
+
+    def test_sums_of_chunks_add_up_to_the_sums_of_the_timeseries(self):
+        monthly_sums, monthly_weights = _accumulate_months(self.v, self.months, self.dt)
+
+        chunk_sums = np.zeros((12, 3, 4))
+        chunk_weights = np.zeros((12, 3, 4))
+        for chunk in [slice(0, 5), slice(5, 20), slice(20, 38)]:
+            sums, weights = _accumulate_months(
+                self.v[chunk], self.months[chunk], self.dt[chunk]
+            )
+            chunk_sums += sums
+            chunk_weights += weights
+
+        np.testing.assert_allclose(chunk_sums, monthly_sums)
+        np.testing.assert_allclose(chunk_weights, monthly_weights)
+
+    def test_accumulates_data_without_a_mask(self):
+        v = ma.masked_array(ma.getdata(self.v))
+
+        monthly_sums, monthly_weights = _accumulate_months(v, self.months, self.dt)
+
+        for season in ["01", "DJF", "ANN"]:
+            np.testing.assert_allclose(
+                _season_mean(monthly_sums, monthly_weights, season),
+                self._get_climo(v, season),
+                rtol=1e-6,
+            )
+
+
+class TestClimo(TestCase):
+    def setUp(self):
+        # 2 years of monthly data on a 3 x 4 grid, from Nov 2000.
+        months = (np.arange(24) + 10) % 12
+        ends = np.cumsum(MONTH_DAYS[months]).astype(np.float64)
+        self.tbounds = np.stack([ends - MONTH_DAYS[months], ends], axis=1)
+        self.months = months
+
+        time = cdms2.createAxis(self.tbounds.mean(axis=1))
+        time.designateTime()
+        time.id = "time"
+        time.units = "days since 2000-11-01"
+        time.calendar = "noleap"
+        time.setBounds(self.tbounds)
+        lat = cdms2.createAxis(np.array([-30.0, 0.0, 30.0]))
+        lat.designateLatitude()
+        lat.id = "lat"
+        lon = cdms2.createAxis(np.array([0.0, 90.0, 180.0, 270.0]))
+        lon.designateLongitude()
+        lon.id = "lon"
+
+        rng = np.random.default_rng(0)
+        data = ma.masked_array(
+            rng.normal(size=(24, 3, 4)), mask=rng.random((24, 3, 4)) < 0.2
+        )
+        self.var = cdms2.createVariable(data, axes=[time, lat, lon], id="TS")
+        self.var.units = "K"
+        self.var.long_name = "Surface temperature"
+
+    def test_matches_the_weighted_average_of_the_timesteps_of_each_season(self):
+        dt = self.tbounds[:, 1] - self.tbounds[:, 0]
+        for season in ["ANN", "DJF", "JJA", "01"]:
+            result = climo(self.var, season)
+
+            idx = np.array(
+                [SEASON_IDX[season][month] for month in self.months], dtype=bool
+            )
+            expected = ma.average(self.var.asma()[idx], axis=0, weights=dt[idx])
+            np.testing.assert_allclose(result.asma(), expected, rtol=1e-6)
@@ -0,0 +1,185 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import cdms2
+import numpy as np
+import numpy.ma as ma
+
+from e3sm_diags.driver.utils import dataset
+from e3sm_diags.driver.utils.dataset import Dataset, VariableCache, _get_time_chunks
+from e3sm_diags.parameter.core_parameter import CoreParameter
+
+
+class TestVariableCache(TestCase):
+    def setUp(self):
+        # 80 bytes each.
+        self.var1 = np.arange(10, dtype=np.float64)
+        self.var2 = np.ones(10, dtype=np.float64)
+        self.var3 = np.zeros(10, dtype=np.float64)
+
+    def test_returns_none_and_counts_a_miss_for_an_uncached_key(self):
+        cache = VariableCache(max_bytes=1000)
+
+        self.assertIsNone(cache.get("PRECT"))
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 0)
+
+    def test_returns_copies_of_the_cached_variables(self):
+        cache = VariableCache(max_bytes=1000)
+        self.assertTrue(cache.put("PRECT", [self.var1]))
+
+        result = cache.get("PRECT")
+        np.testing.assert_array_equal(result[0], self.var1)
+        self.assertIsNot(result[0], self.var1)
+        self.assertEqual(cache.hits, 1)
+
+        # Modifying the returned variables doesn't change the cache.
+        result[0][:] = -1
+        np.testing.assert_array_equal(cache.get("PRECT")[0], np.arange(10))
+
+    def test_keeps_the_variables_it_is_given_without_copying_them(self):
+        cache = VariableCache(max_bytes=1000)
+        cache.put("PRECT", [self.var1])
+
+        self.assertIs(cache._entries["PRECT"][0][0], self.var1)
+
+    def test_evicts_the_least_recently_used_variables_over_max_bytes(self):
+        cache = VariableCache(max_bytes=160)
+        cache.put("var1", [self.var1])
+        cache.put("var2", [self.var2])
+        cache.get("var1")
+        cache.put("var3", [self.var3])
+
+        self.assertIsNotNone(cache.get("var1"))
+        self.assertIsNone(cache.get("var2"))
+        self.assertIsNotNone(cache.get("var3"))
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.nbytes, 160)
+
+    def test_counts_the_bytes_of_the_mask(self):
+        cache = VariableCache(max_bytes=1000)
+        cache.put("var1", [ma.masked_less(self.var1, 5)])
+
+        self.assertEqual(cache.nbytes, 90)
+
+    def test_doesnt_cache_variables_larger_than_max_bytes(self):
+        cache = VariableCache(max_bytes=100)
+        self.assertFalse(cache.put("var1_and_var2", [self.var1, self.var2]))
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_clear_removes_the_variables_and_resets_the_counters(self):
+        cache = VariableCache(max_bytes=1000)
+        cache.put("var1", [self.var1])
+        cache.get("var1")
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual((cache.nbytes, cache.hits, cache.misses), (0, 0, 0))
+
+
+class TestGetTimeChunks(TestCase):
+    def test_splits_the_timesteps_into_chunks(self):
+        self.assertEqual(
+            _get_time_chunks(10, 4), [slice(0, 4), slice(4, 8), slice(8, 10)]
+        )
+
+    def test_returns_a_single_chunk_if_chunk_size_is_larger(self):
+        self.assertEqual(_get_time_chunks(10, 12), [slice(0, 10)])
+
+    def test_merges_a_last_chunk_of_a_single_timestep(self):
+        self.assertEqual(_get_time_chunks(9, 4), [slice(0, 4), slice(4, 9)])
+
+    def test_chunks_have_at_least_two_timesteps(self):
+        self.assertEqual(_get_time_chunks(4, 1), [slice(0, 2), slice(2, 4)])
+
+
+def _write_timeseries_file(path, value):
+    """Write a year of monthly TS with a constant value in path."""
+    days = np.cumsum([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    time = cdms2.createAxis(0.5 * (days[:-1] + days[1:]))
+    time.designateTime()
+    time.id = "time"
+    time.units = "days since 2000-01-01"
+    time.calendar = "noleap"
+    time.setBounds(np.stack([days[:-1], days[1:]], axis=1).astype(np.float64))
+
+    var = cdms2.createVariable(np.full(12, value), axes=[time], id="TS")
+    var.units = "K"
+    f = cdms2.open(path, "w")
+    f.write(var)
+    f.close()
+
+
+class TestDatasetVariableCache(TestCase):
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        dataset.variable_cache.clear()
+
+        # The timeseries of two references and of two ARM sites.
+        for ref_name, value in [("ref_a", 1.0), ("ref_b", 2.0)]:
+            os.mkdir(os.path.join(self.data_path, ref_name))
+            _write_timeseries_file(
+                os.path.join(self.data_path, ref_name, "TS_200001_200012.nc"), value
+            )
+        for site, value in [("sgpc1", 3.0), ("nsac1", 4.0)]:
+            _write_timeseries_file(
+                os.path.join(self.data_path, f"TS_{site}_200001_200012.nc"), value
+            )
+
+        self.parameter = CoreParameter()
+        self.parameter.ref_timeseries_input = True
+        self.parameter.reference_data_path = self.data_path
+        self.parameter.start_yr = self.parameter.ref_start_yr = "2000"
+        self.parameter.end_yr = self.parameter.ref_end_yr = "2000"
+
+    def tearDown(self):
+        dataset.variable_cache.clear()
+        shutil.rmtree(self.data_path)
+
+    def _get_variable(self, **attrs):
+        for attr, value in attrs.items():
+            setattr(self.parameter, attr, value)
+        return Dataset(self.parameter, ref=True).get_timeseries_variable("TS")
+
+    def test_reads_the_variable_of_each_ref_name(self):
+        self.parameter.sets = ["area_mean_time_series"]
+
+        ref_a = self._get_variable(ref_name="ref_a")
+        ref_b = self._get_variable(ref_name="ref_b")
+
+        np.testing.assert_allclose(ref_a, 1.0)
+        np.testing.assert_allclose(ref_b, 2.0)
+        self.assertEqual(len(dataset.variable_cache), 2)
+
+    def test_reads_the_variable_of_each_arm_site(self):
+        self.parameter.sets = ["arm_diags"]
+
+        sgpc1 = self._get_variable(regions=["sgpc1"])
+        nsac1 = self._get_variable(regions=["nsac1"])
+
+        np.testing.assert_allclose(sgpc1, 3.0)
+        np.testing.assert_allclose(nsac1, 4.0)
+
+    def test_reuses_the_cached_variable_of_the_same_file(self):
+        self.parameter.sets = ["area_mean_time_series"]
+
+        self._get_variable(ref_name="ref_a")
+        self._get_variable(ref_name="ref_a")
+
+        self.assertEqual(len(dataset.variable_cache), 1)
+
+    def test_keys_the_variables_on_the_files_they_are_read_from(self):
+        self.parameter.sets = ["arm_diags"]
+        self.parameter.regions = ["sgpc1"]
+        ds = Dataset(self.parameter, ref=True)
+        ds.var = "TS"
+        ds.extra_vars = []
+
+        key = ds._get_variable_cache_key("", (), {})
+
+        fnm = os.path.join(self.data_path, "TS_sgpc1_200001_200012.nc")
+        self.assertEqual(key[0], ((fnm, os.stat(fnm).st_mtime_ns),))
@@ -0,0 +1,154 @@
+from unittest import TestCase
+
+import cdms2
+import numpy as np
+import numpy.ma as ma
+
+from e3sm_diags.driver.utils.diurnal_cycle import (
+    SEASON_IDX,
+    DiurnalCycleAccumulator,
+    _get_cycle_seasons,
+    get_composites,
+)
+
+# The days in each month of a noleap calendar.
+MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+# 3-hourly timesteps.
+TIME_FREQ = 8
+
+
+def _get_timeseries(first_hour=1.5, num_days=365):
+    """
+    Get the hours since 2000-01-01 (noleap) and the months of 3-hourly
+    timesteps, and random data on a 3 x 4 grid with masked values.
+    """
+    hours = first_hour + 3.0 * np.arange(num_days * TIME_FREQ)
+    days = (hours // 24).astype(int) % 365
+    months = np.searchsorted(np.cumsum(MONTH_DAYS), days, side="right") + 1
+
+    rng = np.random.default_rng(0)
+    v = ma.masked_array(
+        rng.random((len(hours), 3, 4)), mask=rng.random((len(hours), 3, 4)) < 0.1
+    )
+    # A point without any valid values in July.
+    v[months == 7, 0, 0] = ma.masked
+
+    return hours, months, v
+
+
+def _get_baseline_composites(v, months, seasons):
+    """
+    The composites of each season, from the timesteps of the season reshaped
+    into days, like composite_diurnal_cycle() used to compute them.
+    """
+    composites = []
+    for season in seasons:
+        v_season = v[np.array(SEASON_IDX[season], dtype=bool)[months - 1]]
+        composites.append(
+            ma.average(
+                v_season.reshape((-1, TIME_FREQ) + v_season.shape[1:]),
+                axis=0,
+            )
+        )
+
+    return ma.stack(composites)
+
+
+def _assert_masked_allclose(result, expected):
+    np.testing.assert_array_equal(ma.getmaskarray(result), ma.getmaskarray(expected))
+    np.testing.assert_allclose(result.compressed(), expected.compressed(), rtol=1e-12)
+
+
+class TestGetComposites(TestCase):
+    def setUp(self):
+        self.seasons = ["DJF", "MAM", "JJA", "SON", "ANN", "07"]
+
+    def test_matches_the_average_of_the_days_of_each_season(self):
+        _, months, v = _get_timeseries()
+
+        result = get_composites(v, months, TIME_FREQ, self.seasons)
+
+        self.assertEqual(result.shape, (6, TIME_FREQ, 3, 4))
+        _assert_masked_allclose(
+            result, _get_baseline_composites(v, months, self.seasons)
+        )
+        self.assertTrue(ma.getmaskarray(result)[5, :, 0, 0].all())
+
+    def test_matches_the_average_without_masked_values(self):
+        _, months, v = _get_timeseries()
+        v = ma.masked_array(ma.getdata(v))
+
+        result = get_composites(v, months, TIME_FREQ, self.seasons)
+
+        _assert_masked_allclose(
+            result, _get_baseline_composites(v, months, self.seasons)
+        )
+
+    def test_matches_the_average_when_days_straddle_months(self):
+        # The days of 8 timesteps from 12:00 straddle each change of month, so
+        # the timesteps of each season are averaged separately.
+        _, months, v = _get_timeseries(first_hour=12.0)
+
+        result = get_composites(v, months, TIME_FREQ, self.seasons)
+
+        _assert_masked_allclose(
+            result, _get_baseline_composites(v, months, self.seasons)
+        )
+
+
+def _create_variable(hours, data):
+    time = cdms2.createAxis(hours)
+    time.designateTime()
+    time.id = "time"
+    time.units = "hours since 2000-01-01 00:00:00"
+    time.calendar = "noleap"
+    lat = cdms2.createAxis(np.array([-30.0, 0.0, 30.0]))
+    lat.designateLatitude()
+    lat.id = "lat"
+    lon = cdms2.createAxis(np.array([0.0, 90.0, 180.0, 270.0]))
+    lon.designateLongitude()
+    lon.id = "lon"
+
+    var = cdms2.createVariable(data, axes=[time, lat, lon], id="PRECT")
+    var.units = "mm/day"
+
+    return var
+
+
+class TestDiurnalCycleAccumulator(TestCase):
+    def setUp(self):
+        self.hours, self.months, self.v = _get_timeseries()
+
+    def test_matches_the_baseline_composites_for_chunks_splitting_months_and_days(
+        self,
+    ):
+        var = _create_variable(self.hours, self.v)
+        seasons = ["ANNUALCYCLE", "DJF", "ANN"]
+        expected = _get_baseline_composites(
+            self.v, self.months, _get_cycle_seasons(seasons)
+        )
+
+        for chunk_size in [7, 245, 1000]:
+            chunks = [
+                var[start : start + chunk_size]
+                for start in range(0, var.shape[0], chunk_size)
+            ]
+            accumulator = DiurnalCycleAccumulator(chunks[0], seasons)
+            for chunk in chunks:
+                accumulator.add(chunk)
+
+            _assert_masked_allclose(accumulator.get_composites(), expected)
+
+    def test_matches_get_composites_without_masked_values(self):
+        data = ma.getdata(self.v)
+        var = _create_variable(self.hours, data)
+        seasons = ["JJA", "ANN"]
+
+        accumulator = DiurnalCycleAccumulator(var, seasons)
+        accumulator.add(var)
+
+        _assert_masked_allclose(
+            accumulator.get_composites(),
+            get_composites(ma.masked_array(data), self.months, TIME_FREQ, seasons),
+        )
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from e3sm_diags.driver.utils.file_catalog import clear_catalogs, get_catalog
+
+
+class TestGetCatalog(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for filename in [
+            "PRECC_185001_201412.nc",
+            "PRECL_185001_201412.nc",
+            "PRECT_sgpc1_200001_201412.nc",
+            "T_185001_201412.nc",
+            "20180129.DECKv1b_H1.ne30_oEC_ANN_climo.nc",
+            "GPCP_v2.3_JJA_climo.nc",
+        ]:
+            open(os.path.join(self.dir, filename), "w").close()
+
+    def tearDown(self):
+        clear_catalogs()
+        shutil.rmtree(self.dir)
+
+    def test_returns_timeseries_files_for_var(self):
+        catalog = get_catalog(self.dir)
+
+        self.assertEqual(
+            catalog.get_timeseries_files("T"),
+            [os.path.join(self.dir, "T_185001_201412.nc")],
+        )
+        self.assertEqual(catalog.get_timeseries_files("PRECT"), [])
+
+    def test_returns_timeseries_files_for_var_and_site(self):
+        catalog = get_catalog(self.dir)
+
+        self.assertEqual(
+            catalog.get_timeseries_files("PRECT_sgpc1"),
+            [os.path.join(self.dir, "PRECT_sgpc1_200001_201412.nc")],
+        )
+
+    def test_finds_climo_file_by_name_and_season(self):
+        catalog = get_catalog(self.dir)
+
+        self.assertEqual(
+            catalog.find_climo_file("GPCP_v2.3", "JJA"),
+            os.path.join(self.dir, "GPCP_v2.3_JJA_climo.nc"),
+        )
+        self.assertEqual(
+            catalog.find_climo_file("20180129.DECKv1b_H1", "ANN"),
+            os.path.join(self.dir, "20180129.DECKv1b_H1.ne30_oEC_ANN_climo.nc"),
+        )
+        self.assertEqual(catalog.find_climo_file("GPCP_v2.3", "DJF"), "")
+
+    def test_reuses_catalog_until_directory_is_modified(self):
+        catalog = get_catalog(self.dir)
+        self.assertIs(get_catalog(self.dir), catalog)
+
+        open(os.path.join(self.dir, "U_185001_201412.nc"), "w").close()
+        # Make sure the modification time changes on coarse-grained file systems.
+        stat = os.stat(self.dir)
+        os.utime(self.dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        new_catalog = get_catalog(self.dir)
+        self.assertIsNot(new_catalog, catalog)
+        self.assertEqual(len(new_catalog.get_timeseries_files("U")), 1)
+
+    def test_returns_empty_catalog_if_directory_does_not_exist(self):
+        catalog = get_catalog(os.path.join(self.dir, "missing"))
+
+        self.assertEqual(catalog.get_timeseries_files("T"), [])
+        self.assertEqual(catalog.find_climo_file("GPCP_v2.3", "JJA"), "")
@@ -0,0 +1,75 @@
+from unittest import TestCase, mock
+
+import numpy as np
+
+from e3sm_diags.driver.utils import general
+from e3sm_diags.parameter.core_parameter import CoreParameter
+
+
+class _Grid:
+    shape = (2, 3)
+
+
+class _Variable:
+    def __init__(self, grid):
+        self.grid = grid
+
+    def getGrid(self):
+        return self.grid
+
+
+class TestGetRegionMask(TestCase):
+    def setUp(self):
+        general._LAND_OCEAN_FRACS.clear()
+        general._REGION_MASKS.clear()
+        self.land_frac = np.array([[0.1, 0.6, 0.9], [0.0, 0.4, 1.0]])
+        self.ocean_frac = 1.0 - self.land_frac
+        general._LAND_OCEAN_FRACS[("model.nc",), "ANN"] = (
+            self.land_frac,
+            self.ocean_frac,
+        )
+        self.var = _Variable(_Grid())
+        self.parameter = CoreParameter()
+
+        patcher = mock.patch.multiple(
+            general.regrid,
+            get_grid_key=mock.Mock(return_value="grid"),
+            regrid=mock.Mock(side_effect=lambda frac, *args: frac),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        general._LAND_OCEAN_FRACS.clear()
+        general._REGION_MASKS.clear()
+
+    def test_regrids_each_fraction_once_per_grid_and_region(self):
+        for _ in range(2):
+            land_mask = general._get_region_mask(
+                self.var, self.land_frac, 0.5, self.parameter
+            )
+            ocean_mask = general._get_region_mask(
+                self.var, self.ocean_frac, 0.5, self.parameter
+            )
+
+        self.assertEqual(general.regrid.regrid.call_count, 2)
+        np.testing.assert_array_equal(land_mask, self.land_frac < 0.5)
+        np.testing.assert_array_equal(ocean_mask, self.ocean_frac < 0.5)
+
+    def test_does_not_cache_the_mask_of_other_fractions(self):
+        frac = self.land_frac.copy()
+
+        for _ in range(2):
+            general._get_region_mask(self.var, frac, 0.5, self.parameter)
+
+        self.assertEqual(general.regrid.regrid.call_count, 2)
+        self.assertEqual(len(general._REGION_MASKS), 0)
+
+    def test_removes_the_least_recently_used_mask(self):
+        for region_value in range(general.MAX_CACHED_REGION_MASKS + 1):
+            general._get_region_mask(
+                self.var, self.land_frac, region_value, self.parameter
+            )
+
+        self.assertEqual(len(general._REGION_MASKS), general.MAX_CACHED_REGION_MASKS)
+        self.assertNotIn(0, [key[3] for key in general._REGION_MASKS])
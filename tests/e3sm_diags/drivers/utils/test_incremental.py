@@ -0,0 +1,83 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, call, patch
+
+from e3sm_diags.driver.utils import incremental
+
+
+class TestGetSeries(TestCase):
+    def setUp(self):
+        self.dataset = MagicMock()
+        self.dataset.parameters.incremental_timeseries = True
+        self.dataset.get_start_and_end_years.return_value = ("2000", "2012", False)
+        self.new_series = {"global": MagicMock(), "TROPICS": MagicMock()}
+        self.reduce = MagicMock(return_value=self.new_series)
+
+        for name in ["load_series", "save_series", "append_series", "select_years"]:
+            patcher = patch.object(incremental, name)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+        get_store_path = patch.object(
+            incremental, "get_store_path", side_effect=lambda d, var, key: key
+        )
+        get_store_path.start()
+        self.addCleanup(get_store_path.stop)
+
+    def test_reduces_all_of_the_years_if_not_incremental(self):
+        self.dataset.parameters.incremental_timeseries = False
+
+        series = incremental.get_series(
+            self.dataset, "PRECT", ["global", "TROPICS"], self.reduce
+        )
+
+        self.assertIs(series, self.new_series)
+        self.reduce.assert_called_once_with(self.dataset)
+        self.load_series.assert_not_called()
+        self.save_series.assert_not_called()
+
+    def test_reduces_and_stores_all_of_the_years_if_nothing_is_stored(self):
+        self.load_series.return_value = (None, None)
+
+        series = incremental.get_series(
+            self.dataset, "PRECT", ["global", "TROPICS"], self.reduce
+        )
+
+        self.reduce.assert_called_once_with(self.dataset)
+        self.assertEqual(series, self.new_series)
+        self.save_series.assert_has_calls(
+            [
+                call("global", self.new_series["global"], 2000, 2012),
+                call("TROPICS", self.new_series["TROPICS"], 2000, 2012),
+            ]
+        )
+
+    def test_extends_the_stored_series_with_the_new_years(self):
+        stored = MagicMock()
+        self.load_series.side_effect = [(stored, 2010), (stored, 2009)]
+
+        series = incremental.get_series(
+            self.dataset, "PRECT", ["global", "TROPICS"], self.reduce
+        )
+
+        # The series are extended from the last year of all of them.
+        self.dataset.get_dataset_for_years.assert_called_once_with(2010, 2012)
+        self.reduce.assert_called_once_with(
+            self.dataset.get_dataset_for_years.return_value
+        )
+        self.select_years.assert_called_with(stored, 2000, 2009)
+        self.append_series.assert_called_with(
+            self.select_years.return_value, self.new_series["TROPICS"]
+        )
+        self.assertEqual(list(series.values()), [self.append_series.return_value] * 2)
+        self.assertEqual(self.save_series.call_count, 2)
+
+    def test_uses_the_stored_series_if_they_have_all_of_the_years(self):
+        stored = MagicMock()
+        self.load_series.return_value = (stored, 2012)
+
+        series = incremental.get_series(
+            self.dataset, "PRECT", ["global", "TROPICS"], self.reduce
+        )
+
+        self.assertEqual(series, {"global": stored, "TROPICS": stored})
+        self.reduce.assert_not_called()
+        self.save_series.assert_not_called()
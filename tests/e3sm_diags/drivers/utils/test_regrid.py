@@ -0,0 +1,117 @@
+from unittest import TestCase
+
+import cdms2
+import numpy as np
+import numpy.ma as ma
+
+from e3sm_diags.driver.utils import regrid
+
+
+def _create_grid(num_lat, num_lon, lon_start=0.0):
+    lat_edges = np.linspace(-90.0, 90.0, num_lat + 1)
+    lon_edges = np.linspace(lon_start, lon_start + 360.0, num_lon + 1)
+    lat = cdms2.createAxis(
+        (lat_edges[:-1] + lat_edges[1:]) / 2,
+        bounds=np.stack([lat_edges[:-1], lat_edges[1:]], axis=1),
+    )
+    lat.designateLatitude()
+    lat.id = "lat"
+    lat.units = "degrees_north"
+    lon = cdms2.createAxis(
+        (lon_edges[:-1] + lon_edges[1:]) / 2,
+        bounds=np.stack([lon_edges[:-1], lon_edges[1:]], axis=1),
+    )
+    lon.designateLongitude(persistent=1)
+    lon.id = "lon"
+    lon.units = "degrees_east"
+
+    return lat, lon
+
+
+def _create_variable(data, num_lat, num_lon):
+    lat, lon = _create_grid(num_lat, num_lon)
+    time = cdms2.createAxis(np.arange(data.shape[0], dtype=np.float64))
+    time.designateTime()
+    time.id = "time"
+    time.units = "days since 2000-01-01"
+
+    return cdms2.createVariable(data, axes=[time, lat, lon], id="TS")
+
+
+def _assert_matches_cdms2(result, expected):
+    np.testing.assert_array_equal(ma.getmaskarray(result), ma.getmaskarray(expected))
+    np.testing.assert_allclose(
+        ma.filled(result, 0.0), ma.filled(expected, 0.0), rtol=1e-12, atol=1e-12
+    )
+
+
+class TestRegrid(TestCase):
+    def setUp(self):
+        regrid._REGRIDDERS.clear()
+        rng = np.random.default_rng(0)
+        self.data = rng.normal(size=(3, 45, 90))
+        # A coarser destination grid, with unaligned cells across longitude 0.
+        self.grid = cdms2.createRectGrid(*_create_grid(9, 11, lon_start=-180.0))
+
+    def tearDown(self):
+        regrid._REGRIDDERS.clear()
+
+    def test_matches_the_esmf_conservative_regridding_of_cdms2(self):
+        var = _create_variable(self.data, 45, 90)
+
+        result = regrid.regrid(var, self.grid, "esmf", "conservative")
+
+        _assert_matches_cdms2(
+            result,
+            var.regrid(self.grid, regridTool="esmf", regridMethod="conservative"),
+        )
+
+    def test_matches_the_esmf_conservative_regridding_of_cdms2_with_a_mask(self):
+        data = ma.masked_where(self.data > 1.0, self.data)
+        var = _create_variable(data, 45, 90)
+
+        result = regrid.regrid(var, self.grid, "esmf", "conservative")
+
+        _assert_matches_cdms2(
+            result,
+            var.regrid(self.grid, regridTool="esmf", regridMethod="conservative"),
+        )
+
+    def test_reuses_the_regridder_for_the_same_grids_and_mask(self):
+        var1 = _create_variable(self.data, 45, 90)
+        var2 = _create_variable(2.0 * self.data + 1.0, 45, 90)
+
+        regrid.regrid(var1, self.grid, "esmf", "conservative")
+        regridder = list(regrid._REGRIDDERS.values())[0]
+        result = regrid.regrid(var2, self.grid, "esmf", "conservative")
+
+        self.assertEqual(len(regrid._REGRIDDERS), 1)
+        self.assertIs(list(regrid._REGRIDDERS.values())[0], regridder)
+        _assert_matches_cdms2(
+            result,
+            var2.regrid(self.grid, regridTool="esmf", regridMethod="conservative"),
+        )
+
+    def test_builds_a_regridder_for_each_mask(self):
+        var1 = _create_variable(ma.masked_where(self.data > 1.0, self.data), 45, 90)
+        var2 = _create_variable(ma.masked_where(self.data < -1.0, self.data), 45, 90)
+
+        regrid.regrid(var1, self.grid, "esmf", "conservative")
+        result = regrid.regrid(var2, self.grid, "esmf", "conservative")
+
+        self.assertEqual(len(regrid._REGRIDDERS), 2)
+        _assert_matches_cdms2(
+            result,
+            var2.regrid(self.grid, regridTool="esmf", regridMethod="conservative"),
+        )
+
+    def test_removes_the_least_recently_used_regridder(self):
+        for num_lat in range(regrid.MAX_CACHED_REGRIDDERS + 1):
+            var = _create_variable(self.data[:, : num_lat + 2], num_lat + 2, 90)
+            regrid.regrid(var, self.grid, "esmf", "conservative")
+
+        self.assertEqual(len(regrid._REGRIDDERS), regrid.MAX_CACHED_REGRIDDERS)
+        src_grid_key = regrid.get_grid_key(
+            _create_variable(self.data[:, :2], 2, 90).getGrid()
+        )
+        self.assertNotIn(src_grid_key, [key[0] for key in regrid._REGRIDDERS])
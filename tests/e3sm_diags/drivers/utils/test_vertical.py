@@ -0,0 +1,106 @@
+from unittest import TestCase, mock
+
+import numpy as np
+import numpy.ma as ma
+
+from e3sm_diags.driver.utils import vertical
+from e3sm_diags.driver.utils.vertical import (
+    _interpolate,
+    compute_log_linear_weights,
+    get_hybrid_pressure,
+    get_log_linear_weights,
+)
+
+
+class TestComputeLogLinearWeights(TestCase):
+    def setUp(self):
+        # Two columns with 4 levels, from the top to the surface.
+        self.pressure = np.array(
+            [[100.0, 100.0], [300.0, 300.0], [700.0, 700.0], [1000.0, 800.0]]
+        )
+        self.data = ma.array([[1.0, 1.0], [2.0, 2.0], [3.0, 3.0], [4.0, 4.0]])
+
+    def test_interpolates_linearly_in_log_pressure(self):
+        weights = compute_log_linear_weights(self.pressure, [500.0])
+        result = _interpolate(self.data, *weights)
+
+        expected = 2.0 + np.log(500.0 / 300.0) / np.log(700.0 / 300.0)
+        np.testing.assert_allclose(result, [[expected, expected]], rtol=1e-12)
+
+    def test_returns_the_result_type_of_the_data_and_weights(self):
+        weights = compute_log_linear_weights(self.pressure, [500.0])
+
+        for dtype in [np.float32, np.float64, np.int32]:
+            data = self.data.astype(dtype)
+            result = _interpolate(data, *weights)
+
+            self.assertEqual(result.dtype, np.result_type(data, weights[1]))
+
+    def test_returns_the_data_on_a_level_equal_to_a_pressure_level(self):
+        weights = compute_log_linear_weights(self.pressure, [300.0, 100.0])
+        result = _interpolate(self.data, *weights)
+
+        np.testing.assert_allclose(result, [[2.0, 2.0], [1.0, 1.0]])
+
+    def test_masks_pressure_levels_below_the_surface(self):
+        weights = compute_log_linear_weights(self.pressure, [900.0])
+        result = _interpolate(self.data, *weights)
+
+        self.assertFalse(result.mask[0, 0])
+        self.assertTrue(result.mask[0, 1])
+
+    def test_masks_levels_next_to_masked_data(self):
+        self.data[1, 0] = ma.masked
+        weights = compute_log_linear_weights(self.pressure, [500.0, 850.0])
+        result = _interpolate(self.data, *weights)
+
+        np.testing.assert_array_equal(result.mask, [[True, False], [False, True]])
+
+    def test_applies_weights_of_a_single_column_to_all_columns(self):
+        weights = compute_log_linear_weights(self.pressure[:, :1], [500.0])
+        result = _interpolate(self.data, *weights)
+
+        self.assertEqual(result.shape, (1, 2))
+        np.testing.assert_allclose(result[0, 0], result[0, 1])
+
+
+class TestGetLogLinearWeights(TestCase):
+    def setUp(self):
+        vertical._WEIGHTS.clear()
+        self.pressure = np.array([[100.0], [300.0], [700.0], [1000.0]])
+        self.get_pressure = mock.Mock(return_value=self.pressure)
+
+    def tearDown(self):
+        vertical._WEIGHTS.clear()
+
+    def test_only_gets_the_pressure_field_if_the_weights_arent_cached(self):
+        weights = get_log_linear_weights("key", self.get_pressure, [500.0])
+        cached_weights = get_log_linear_weights("key", self.get_pressure, [500.0])
+
+        self.get_pressure.assert_called_once()
+        self.assertIs(cached_weights, weights)
+        for result, expected in zip(
+            weights, compute_log_linear_weights(self.pressure, [500.0])
+        ):
+            np.testing.assert_array_equal(result, expected)
+
+    def test_evicts_the_least_recently_used_weights(self):
+        for i in range(vertical.MAX_CACHED_WEIGHTS + 1):
+            get_log_linear_weights(f"key{i}", self.get_pressure, [500.0])
+
+        self.assertNotIn("key0", vertical._WEIGHTS)
+        self.assertEqual(len(vertical._WEIGHTS), vertical.MAX_CACHED_WEIGHTS)
+
+
+class TestGetHybridPressure(TestCase):
+    def test_returns_the_pressure_of_the_hybrid_levels(self):
+        hyam = np.array([0.1, 0.05, 0.0])
+        hybm = np.array([0.0, 0.5, 1.0])
+        ps = np.array([[1000.0, 800.0]])
+
+        result = get_hybrid_pressure(hyam, hybm, ps, 1000.0)
+
+        self.assertEqual(result.shape, (3, 1, 2))
+        np.testing.assert_allclose(
+            result[:, 0], [[100.0, 100.0], [550.0, 450.0], [1000.0, 800.0]]
+        )
@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+import cdms2
+import numpy as np
+import numpy.ma as ma
+
+from e3sm_diags.metrics import corr, get_pair_stats, get_stats, mean, rmse, std
+
+
+def _create_variable(data, id):
+    lat = cdms2.createAxis(np.arange(-80.0, 90, 20))
+    lat.designateLatitude()
+    lat.id = "lat"
+    lat.units = "degrees_north"
+    lat.setBounds(np.stack([lat[:] - 10, lat[:] + 10], axis=1))
+    lon = cdms2.createAxis(np.arange(0.0, 360, 30))
+    lon.designateLongitude()
+    lon.id = "lon"
+    lon.units = "degrees_east"
+    lon.setBounds(np.stack([lon[:] - 15, lon[:] + 15], axis=1))
+
+    var = cdms2.createVariable(data, axes=[lat, lon], id=id)
+    var.units = "K"
+
+    return var
+
+
+class TestGetStats(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        model = rng.normal(size=(9, 12))
+        obs = 0.8 * model + rng.normal(scale=0.5, size=(9, 12))
+        # The masks are different, so the pair statistics use their union.
+        self.model = _create_variable(ma.masked_where(model > 1.2, model), "model")
+        self.obs = _create_variable(ma.masked_where(obs < -1.0, obs), "obs")
+
+    def test_matches_the_cdutil_and_genutil_statistics(self):
+        result = get_stats(self.model)
+
+        self.assertEqual(result["min"], float(self.model.min()))
+        self.assertEqual(result["max"], float(self.model.max()))
+        np.testing.assert_allclose(result["mean"], float(mean(self.model)))
+        np.testing.assert_allclose(result["std"], std(self.model))
+
+    def test_matches_the_genutil_pair_statistics(self):
+        result = get_pair_stats(self.model, self.obs)
+
+        np.testing.assert_allclose(result["rmse"], rmse(self.model, self.obs))
+        np.testing.assert_allclose(result["corr"], corr(self.model, self.obs))
+
+    def test_returns_nan_without_valid_values(self):
+        self.obs[:] = ma.masked
+
+        result = get_pair_stats(self.model, self.obs)
+
+        self.assertTrue(np.isnan(result["rmse"]))
+        self.assertTrue(np.isnan(result["corr"]))
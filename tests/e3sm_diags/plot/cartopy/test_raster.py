@@ -0,0 +1,129 @@
+import matplotlib
+import numpy as np
+import numpy.ma as ma
+import pytest
+
+matplotlib.use("Agg")
+import matplotlib.collections as mcollections  # isort:skip  # noqa: E402
+import matplotlib.colors as colors  # isort:skip  # noqa: E402
+import matplotlib.pyplot as plt  # isort:skip  # noqa: E402
+
+from e3sm_diags.plot.cartopy.raster import (  # isort:skip  # noqa: E402
+    block_mean,
+    get_band_colormap,
+    get_levels,
+)
+
+
+class TestBlockMean:
+    def test_averages_the_valid_values_of_each_block(self):
+        var = ma.masked_array(
+            [[1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 8.0]],
+            mask=[[False, True, False, False], [False, False, False, True]],
+        )
+
+        result = block_mean(var, 2, 2)
+
+        np.testing.assert_allclose(result, [[(1 + 5 + 6) / 3, (3 + 4 + 7) / 3]])
+
+    def test_masks_the_blocks_without_valid_values(self):
+        var = ma.masked_array(np.ones((4, 4)), mask=np.zeros((4, 4), dtype=bool))
+        var[2:, :2] = ma.masked
+
+        result = block_mean(var, 2, 2)
+
+        np.testing.assert_array_equal(
+            ma.getmaskarray(result), [[False, False], [True, False]]
+        )
+        np.testing.assert_allclose(result.compressed(), 1.0)
+
+    def test_averages_the_smaller_blocks_at_the_ends(self):
+        var = ma.masked_array(np.arange(35.0).reshape(5, 7))
+        var[4, 6] = ma.masked
+
+        result = block_mean(var, 2, 3)
+
+        assert result.shape == (3, 3)
+        for i, rows in enumerate([slice(0, 2), slice(2, 4), slice(4, 5)]):
+            for j, cols in enumerate([slice(0, 3), slice(3, 6), slice(6, 7)]):
+                if i == 2 and j == 2:
+                    assert result[i, j] is ma.masked
+                else:
+                    np.testing.assert_allclose(result[i, j], var[rows, cols].mean())
+
+    def test_averages_a_1d_var(self):
+        result = block_mean(np.arange(5.0), 2, 1)
+
+        np.testing.assert_allclose(result, [0.5, 2.5, 4.0])
+
+
+class TestGetBandColormap:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.fig, self.ax = plt.subplots()
+        yield
+        plt.close(self.fig)
+
+    def _get_contourf_colors(self, levels, norm, cmap):
+        x, y = np.meshgrid(np.arange(10), np.arange(10))
+        cs = self.ax.contourf(
+            x, y, x + y, levels=levels, norm=norm, cmap=cmap, extend="both"
+        )
+        if isinstance(cs, mcollections.Collection):
+            return cs.get_facecolor()
+
+        # Before matplotlib 3.8, each band is a collection.
+        return np.array([c.get_facecolor()[0] for c in cs.collections])
+
+    @pytest.mark.parametrize(
+        "levels, norm",
+        [
+            ([1, 4, 5, 9, 12, 16], None),
+            ([1, 4, 5, 9, 12, 16], colors.BoundaryNorm([1, 4, 5, 9, 12, 16], 256)),
+            ([-2, 0, 2, 4, 6], None),
+        ],
+    )
+    def test_gives_each_band_the_color_of_contourf(self, levels, norm):
+        cmap = plt.get_cmap("viridis").with_extremes(under="magenta", over="cyan")
+
+        band_cmap, band_norm = get_band_colormap(cmap, levels, norm)
+
+        # The values of each band, from under the first level to over the last.
+        values = np.concatenate(
+            [
+                [levels[0] - 5],
+                (np.array(levels[:-1]) + levels[1:]) / 2,
+                [levels[-1] + 5],
+            ]
+        )
+        np.testing.assert_allclose(
+            band_cmap(band_norm(values)),
+            self._get_contourf_colors(levels, norm, cmap),
+        )
+        assert band_cmap.colorbar_extend == "both"
+
+    def test_uses_the_under_and_over_colors_of_the_colormap(self):
+        levels = [0, 1, 2]
+        cmap = plt.get_cmap("viridis")
+
+        band_cmap, band_norm = get_band_colormap(
+            cmap, levels, colors.BoundaryNorm(levels, 256)
+        )
+
+        np.testing.assert_allclose(band_cmap(band_norm(-1)), cmap(0.0))
+        np.testing.assert_allclose(band_cmap(band_norm(3)), cmap(1.0))
+
+
+class TestGetLevels:
+    def test_returns_the_levels_of_contourf(self):
+        fig, ax = plt.subplots()
+        for var in [
+            np.linspace(-3.2, 17.9, 50),
+            np.linspace(0.01, 0.05, 50),
+            np.random.default_rng(0).normal(size=50),
+        ]:
+            x, y = np.meshgrid(np.arange(50), np.arange(2))
+            cs = ax.contourf(x, y, np.stack([var, var]), extend="both")
+
+            np.testing.assert_allclose(get_levels(var), cs.levels)
+        plt.close(fig)
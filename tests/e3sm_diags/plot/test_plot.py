@@ -0,0 +1,213 @@
+import json
+import multiprocessing
+import os
+
+import matplotlib
+import numpy as np
+import pytest
+
+matplotlib.use("Agg")
+import matplotlib.image as mimage  # isort:skip  # noqa: E402
+import matplotlib.pyplot as plt  # isort:skip  # noqa: E402
+from matplotlib.transforms import Bbox  # isort:skip  # noqa: E402
+
+import e3sm_diags  # isort:skip  # noqa: E402
+from e3sm_diags import plot  # isort:skip  # noqa: E402
+
+
+def _save_plot(ref, test, diff, metrics_dict, parameter):
+    np.save(os.path.join(parameter.results_dir, parameter.output_file), test)
+
+
+class Parameter:
+    def __init__(self, results_dir, output_file):
+        self.results_dir = results_dir
+        self.output_file = output_file
+        self.backend = "mpl"
+        self.debug = False
+        self.plot = _save_plot
+
+
+class TestRenderPool:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        yield
+        plot.stop_render_pool()
+
+    def test_renders_the_plots_submitted_to_the_pool(self, tmp_path):
+        plot.start_render_pool(2)
+        parameter = Parameter(str(tmp_path), "plot_0")
+        plot.plot("lat_lon", None, np.arange(3), None, {}, parameter)
+        # The arguments are pickled right away, so the parameter can change.
+        parameter.output_file = "plot_1"
+        plot.plot("lat_lon", None, np.arange(4), None, {}, parameter)
+
+        assert plot.stop_render_pool() == 0
+        np.testing.assert_array_equal(np.load(tmp_path / "plot_0.npy"), np.arange(3))
+        np.testing.assert_array_equal(np.load(tmp_path / "plot_1.npy"), np.arange(4))
+
+    def test_renders_the_plots_of_forked_processes(self, tmp_path):
+        plot.start_render_pool(1)
+
+        def run_diag(output_file):
+            parameter = Parameter(str(tmp_path), output_file)
+            plot.plot("lat_lon", None, np.arange(2), None, {}, parameter)
+
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=run_diag, args=(f"plot_{i}",)) for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert plot.stop_render_pool() == 0
+        assert sorted(os.listdir(tmp_path)) == [f"plot_{i}.npy" for i in range(3)]
+
+    def test_reports_the_plots_that_failed(self, tmp_path, caplog):
+        plot.start_render_pool(1)
+        parameter = Parameter(str(tmp_path), "plot_0")
+        del parameter.plot
+        parameter.backend = "invalid"
+        plot.plot("lat_lon", None, np.arange(3), None, {}, parameter)
+
+        assert plot.wait_for_plots() == 1
+        assert "Error while rendering a plot" in caplog.text
+        assert "Invalid backend" in caplog.text
+
+    def test_renders_the_plots_right_away_without_a_pool(self, tmp_path):
+        parameter = Parameter(str(tmp_path), "plot_0")
+        plot.plot("lat_lon", None, np.arange(3), None, {}, parameter)
+
+        assert os.listdir(tmp_path) == ["plot_0.npy"]
+
+
+class ManifestParameter:
+    def __init__(self, results_dir):
+        self.results_dir = results_dir
+        self.current_set = "lat_lon"
+        self.case_id = "model_vs_obs"
+        self.output_file = "TS-ANN-global"
+        self.output_format = ["png"]
+        self.output_format_subplot = ["png"]
+        self.backend = "mpl"
+        self.debug = False
+        self.main_title = "TS ANN"
+        self.num_workers = 4
+
+
+class TestPlotManifest:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        self.parameter = ManifestParameter(str(tmp_path))
+        self.output_dir = tmp_path / "lat_lon" / "model_vs_obs"
+        self.plotted = []
+
+        def plot_fcn(ref, test, diff, metrics_dict, parameter):
+            self.plotted.append(parameter.output_file)
+            for fnm in [parameter.output_file, parameter.output_file + ".0"]:
+                (self.output_dir / (fnm + ".png")).write_bytes(b"png")
+
+        monkeypatch.setattr(plot, "_get_plot_fcn", lambda backend, set_name: plot_fcn)
+
+    def _plot(self, test=(1.0, 2.0)):
+        plot.plot("lat_lon", None, np.array(test), None, {}, self.parameter)
+
+    def test_skips_the_plots_that_are_unchanged(self):
+        self._plot()
+        self._plot()
+
+        assert self.plotted == ["TS-ANN-global"]
+        with open(self.output_dir / ".plot_manifest" / "TS-ANN-global.json") as f:
+            manifest = json.load(f)
+        assert manifest["files"] == ["TS-ANN-global.png", "TS-ANN-global.0.png"]
+
+    def test_plots_again_when_the_data_or_parameters_change(self):
+        self._plot()
+        self._plot(test=(1.0, 3.0))
+        self.parameter.main_title = "TS JJA"
+        self._plot(test=(1.0, 3.0))
+        # The parameters that don't change the plots are ignored.
+        self.parameter.num_workers = 8
+        self._plot(test=(1.0, 3.0))
+
+        assert len(self.plotted) == 3
+
+    def test_plots_again_when_a_file_is_missing(self):
+        self._plot()
+        (self.output_dir / "TS-ANN-global.0.png").unlink()
+        self._plot()
+
+        assert len(self.plotted) == 2
+
+    def test_plots_again_when_the_package_changes(self, monkeypatch):
+        self._plot()
+        monkeypatch.setattr(plot, "_package_hash", "another version")
+        self._plot()
+
+        assert len(self.plotted) == 2
+
+    def test_plots_every_time_without_the_plot_cache(self):
+        self.parameter.no_plot_cache = True
+        self._plot()
+        self._plot()
+
+        assert len(self.plotted) == 2
+        assert not (self.output_dir / ".plot_manifest").exists()
+
+    def test_hashes_the_helper_modules_of_the_plots(self, tmp_path, monkeypatch):
+        package_dir = tmp_path / "e3sm_diags"
+        (package_dir / "plot" / "cartopy").mkdir(parents=True)
+        (package_dir / "__init__.py").write_text("")
+        resources = package_dir / "plot" / "cartopy" / "resources.py"
+        resources.write_text("DPI = 150\n")
+        monkeypatch.setattr(e3sm_diags, "__file__", str(package_dir / "__init__.py"))
+
+        monkeypatch.setattr(plot, "_package_hash", None)
+        package_hash = plot._get_package_hash()
+        resources.write_text("DPI = 300\n")
+        monkeypatch.setattr(plot, "_package_hash", None)
+
+        assert plot._get_package_hash() != package_hash
+
+
+class TestFigureSaver:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        # A figure with three panels of noise, so any offset changes pixels.
+        self.fig = plt.figure(figsize=(8.5, 11), dpi=150)
+        for i in range(3):
+            ax = self.fig.add_axes([0.1, 0.05 + 0.31 * i, 0.8, 0.25])
+            ax.imshow(np.random.default_rng(i).random((40, 60)), aspect="auto")
+        yield
+        plt.close(self.fig)
+
+    @pytest.mark.parametrize(
+        "extent",
+        [
+            None,
+            (0.6, 7.5, 8.2, 10.6),
+            (0.6, 7.5, 8.2, 10.61),
+            (0.5, 0.0, 8.0, 3.0),
+            (1.0, 4.0, 7.6, 6.9),
+        ],
+    )
+    def test_saves_the_same_pixels_as_savefig(self, tmp_path, extent):
+        if extent is not None:
+            extent = Bbox.from_extents(*extent)
+
+        plot.FigureSaver(self.fig).save(str(tmp_path / "crop.png"), extent)
+        self.fig.savefig(str(tmp_path / "savefig.png"), bbox_inches=extent)
+
+        crop = mimage.imread(tmp_path / "crop.png")
+        expected = mimage.imread(tmp_path / "savefig.png")
+        assert crop.shape == expected.shape
+        np.testing.assert_array_equal(crop, expected)
+
+    def test_saves_the_other_formats_with_savefig(self, tmp_path):
+        extent = Bbox.from_extents(0.6, 7.5, 8.2, 10.6)
+
+        plot.FigureSaver(self.fig).save(str(tmp_path / "crop.pdf"), extent)
+
+        assert (tmp_path / "crop.pdf").read_bytes().startswith(b"%PDF")
@@ -1,12 +1,45 @@
+import concurrent.futures
+import os
+
 import pytest
 
-from e3sm_diags.e3sm_diags_driver import _run_serially, _run_with_dask, run_diag
+from e3sm_diags import e3sm_diags_driver
+from e3sm_diags.e3sm_diags_driver import (
+    _estimate_task_cost,
+    _expand_tasks,
+    _merge_task_results,
+    _run_in_parallel,
+    _run_serially,
+    run_diag,
+)
 from e3sm_diags.logger import custom_logger
 from e3sm_diags.parameter.core_parameter import CoreParameter
 
 logger = custom_logger("e3sm_diags.e3sm_diags_driver", propagate=True)
 
 
+def _run_diag_with_title(parameter):
+    """Set the main title to the variable."""
+    var = parameter.variables[0]
+    parameter.main_title = var
+    parameter.viewer_descr[var] = f"{var} long name"
+    return [parameter]
+
+
+def _as_completed_in_reverse(futures, timeout=None):
+    """Yield the futures in the reverse order of their submission."""
+    futures = list(futures)
+    concurrent.futures.wait(futures, timeout=timeout)
+    return reversed(futures)
+
+
+def _run_diag_or_kill_worker(parameter):
+    """Kill the worker for the variable U, which breaks the process pool."""
+    if parameter.variables[0] == "U":
+        os._exit(1)
+    return [parameter]
+
+
 class TestRunDiag:
     def test_returns_parameter_with_results(self):
         parameter = CoreParameter()
@@ -58,11 +91,11 @@ class TestRunDiag:
         # tests validates the results.
         assert results == expected
 
-    def test_run_diag_with_dask_returns_parameters_with_results(self):
+    def test_run_diag_in_parallel_returns_parameters_with_results(self):
         parameter = CoreParameter()
         parameter.sets = ["lat_lon"]
 
-        results = _run_with_dask([parameter])
+        results = _run_in_parallel([parameter])
 
         expected_parameter = CoreParameter()
         expected_parameter.sets = ["lat_lon"]
@@ -77,7 +110,41 @@ class TestRunDiag:
         # tests validates the results.
         assert results[0].__dict__ == expected[0].__dict__
 
-    def test_run_diag_with_dask_raises_error_if_num_workers_attr_not_set(
+    def test_run_diag_in_parallel_merges_the_tasks_in_order(self, monkeypatch):
+        monkeypatch.setattr(e3sm_diags_driver, "run_diag", _run_diag_with_title)
+        monkeypatch.setattr(
+            concurrent.futures, "as_completed", _as_completed_in_reverse
+        )
+        parameter = CoreParameter()
+        parameter.sets = ["lat_lon"]
+        parameter.variables = ["T", "U", "V"]
+        parameter.seasons = ["ANN"]
+        parameter.num_workers = 3
+
+        results = _run_in_parallel([parameter])
+
+        # The task of T completes last, but it's still the base of the merge.
+        assert len(results) == 1
+        assert results[0].main_title == "T"
+        assert list(results[0].viewer_descr) == ["T", "U", "V"]
+
+    def test_run_diag_in_parallel_logs_the_tasks_of_a_broken_pool(
+        self, monkeypatch, caplog
+    ):
+        monkeypatch.setattr(e3sm_diags_driver, "run_diag", _run_diag_or_kill_worker)
+        parameter = CoreParameter()
+        parameter.sets = ["lat_lon"]
+        parameter.variables = ["T", "U"]
+        parameter.seasons = ["ANN"]
+        parameter.num_workers = 2
+
+        results = _run_in_parallel([parameter])
+
+        assert results == []
+        assert "Error in the task for the lat_lon set" in caplog.text
+        assert "BrokenProcessPool" in caplog.text
+
+    def test_run_diag_in_parallel_raises_error_if_num_workers_attr_not_set(
         self,
     ):
         parameter = CoreParameter()
@@ -85,4 +152,111 @@ class TestRunDiag:
         del parameter.num_workers
 
         with pytest.raises(ValueError):
-            _run_with_dask([parameter])
+            _run_in_parallel([parameter])
+
+
+class TestExpandTasks:
+    def test_expands_granulated_attrs_for_each_set(self):
+        parameter = CoreParameter()
+        parameter.sets = ["lat_lon", "polar"]
+        parameter.variables = ["T", "U"]
+        parameter.seasons = ["ANN", "JJA"]
+        parameter.plevs = [200.0, 850.0]
+        parameter.regions = ["global"]
+
+        tasks = _expand_tasks([parameter])
+
+        assert len(tasks) == 2 * 2 * 2 * 2
+        for param_idx, set_name, task_param in tasks:
+            assert param_idx == 0
+            assert task_param.sets == [set_name]
+            assert len(task_param.variables) == 1
+            assert len(task_param.seasons) == 1
+            assert len(task_param.plevs) == 1
+
+        # The original parameter is not modified.
+        assert parameter.seasons == ["ANN", "JJA"]
+
+    def test_does_not_expand_attrs_that_are_not_granulated(self):
+        parameter = CoreParameter()
+        parameter.sets = ["zonal_mean_2d"]
+        parameter.variables = ["T"]
+        parameter.seasons = ["ANN"]
+        parameter.plevs = [200.0, 850.0]
+        parameter.granulate.remove("plevs")
+
+        tasks = _expand_tasks([parameter])
+
+        assert len(tasks) == 1
+        assert tasks[0][2].plevs == [200.0, 850.0]
+
+    def test_keeps_the_seasons_together_for_the_sets_that_batch_them(self):
+        parameter = CoreParameter()
+        parameter.sets = ["lat_lon", "diurnal_cycle"]
+        parameter.variables = ["PRECT"]
+        parameter.seasons = ["ANN", "JJA"]
+
+        tasks = _expand_tasks([parameter])
+
+        assert [(set_name, task.seasons) for _, set_name, task in tasks] == [
+            ("lat_lon", ["ANN"]),
+            ("lat_lon", ["JJA"]),
+            ("diurnal_cycle", ["ANN", "JJA"]),
+        ]
+
+    def test_keeps_the_seasons_together_for_timeseries_inputs(self):
+        parameter = CoreParameter()
+        parameter.sets = ["lat_lon"]
+        parameter.variables = ["T", "U"]
+        parameter.seasons = ["ANN", "JJA"]
+        parameter.test_timeseries_input = True
+
+        tasks = _expand_tasks([parameter])
+
+        assert [task.variables for _, _, task in tasks] == [["T"], ["U"]]
+        assert all(task.seasons == ["ANN", "JJA"] for _, _, task in tasks)
+
+
+class TestEstimateTaskCost:
+    def test_3d_task_costs_more_than_2d_task(self):
+        task_2d = CoreParameter()
+        task_2d.sets = ["lat_lon"]
+        task_2d.variables = ["PRECT"]
+        task_2d.seasons = ["ANN"]
+
+        task_3d = CoreParameter()
+        task_3d.sets = ["lat_lon"]
+        task_3d.variables = ["T"]
+        task_3d.seasons = ["ANN"]
+        task_3d.plevs = [850.0]
+
+        assert _estimate_task_cost(task_3d) > _estimate_task_cost(task_2d)
+
+
+class TestMergeTaskResults:
+    def test_restores_granulated_attrs_and_merges_viewer_descr(self):
+        parameter = CoreParameter()
+        parameter.sets = ["lat_lon"]
+        parameter.variables = ["T", "U"]
+        parameter.seasons = ["ANN"]
+
+        results = []
+        for _, _, task_param in _expand_tasks([parameter]):
+            var = task_param.variables[0]
+            task_param.viewer_descr[var] = f"{var} long name"
+            results.append([task_param])
+
+        merged = _merge_task_results(parameter, "lat_lon", results)
+
+        assert merged is not None
+        assert merged.variables == ["T", "U"]
+        assert merged.current_set == "lat_lon"
+        assert merged.viewer_descr == {"T": "T long name", "U": "U long name"}
+
+    def test_returns_none_if_a_task_failed(self):
+        parameter = CoreParameter()
+        parameter.sets = ["lat_lon"]
+
+        merged = _merge_task_results(parameter, "lat_lon", [[parameter], []])
+
+        assert merged is None